@@ -2,8 +2,11 @@
 Kre8VidMems - Video-based AI Memory using QR codes and semantic search
 """
 from .api.memory import Kre8VidMemory
-from .core import chunk_text, Vectorizer
-from .storage import VideoStore, VectorStore
+from .api.registry import MemoryRegistry, get_registry
+from .api.segmented import SegmentedMemory
+from .core import chunk_text, Vectorizer, get_vectorizer
+from .storage import VideoStore, VectorStore, FederatedIndex
 
 __version__ = "0.1.0"
-__all__ = ['Kre8VidMemory', 'chunk_text', 'Vectorizer', 'VideoStore', 'VectorStore']
+__all__ = ['Kre8VidMemory', 'MemoryRegistry', 'get_registry', 'SegmentedMemory', 'chunk_text', 'Vectorizer',
+           'get_vectorizer', 'VideoStore', 'VectorStore', 'FederatedIndex']
@@ -2,5 +2,7 @@
 API components for Kre8VidMems
 """
 from .memory import Kre8VidMemory
+from .registry import MemoryRegistry, get_registry
+from .segmented import SegmentedMemory
 
-__all__ = ['Kre8VidMemory']
+__all__ = ['Kre8VidMemory', 'MemoryRegistry', 'get_registry', 'SegmentedMemory']
@@ -2,145 +2,434 @@
 Main Memory API for Kre8VidMems
 """
 import json
+import time
+import threading
+import numpy as np
 from pathlib import Path
-from typing import List, Optional, Dict
-from kre8vidmems.core import chunk_text, encode_to_qr, decode_qr, qr_to_numpy, Vectorizer
-from kre8vidmems.storage import VideoStore, VectorStore
-from kre8vidmems.config import FRAME_WIDTH, FRAME_HEIGHT
+from typing import List, Optional, Dict, Tuple
+from kre8vidmems.core import (chunk_text, iter_file_chunks, decode_qr, iter_qr_frames, Vectorizer, get_vectorizer,
+                              get_embedding_cache, get_frame_cache)
+from kre8vidmems.storage import VideoStore, VectorStore, LexicalIndex
+from kre8vidmems.storage.vector_store import index_file, angular_distance
+from kre8vidmems.storage.metadata_store import write_sources, load_sources, SOURCES_SUFFIX
+from kre8vidmems.storage.chunk_store import get_chunk_store, chunk_store_dir
+from kre8vidmems.config import (RETRIEVAL_MODE, RETRIEVAL_MODES, EMBEDDING_CACHE_FILENAME, EMBEDDING_CACHE_PATH,
+                                HYBRID_LEXICAL_WEIGHT, HYBRID_CANDIDATES, EMBED_BATCH_SIZE, VIDEO_PROFILE,
+                                USE_CHUNK_STORE)
 
 class Kre8VidMemory:
     """Main interface for creating and querying video memories"""
     
-    def __init__(self):
+    def __init__(self, vectorizer: Optional[Vectorizer] = None, retrieval_mode: str = RETRIEVAL_MODE):
+        if retrieval_mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{retrieval_mode}'. Use one of: {', '.join(RETRIEVAL_MODES)}")
+        self.retrieval_mode = retrieval_mode
         self.chunks = []
-        self.vectorizer = Vectorizer()
-        self.video_store = VideoStore()
+        self.chunk_sources: Dict[int, Tuple[str, int, int]] = {}  # chunk index -> (file, start byte, end byte)
+        self.sources: Optional[List[Optional[Dict]]] = None  # Provenance of a loaded memory
+        # Share one embedding model across memories unless told otherwise
+        self.vectorizer = vectorizer or get_vectorizer()
+        self._video_store = None
         self.vector_store = VectorStore()
+        self._lexical_index = None
+        self._lexical_lock = threading.Lock()
         self.video_path = None
         self.index_path = None
         
+    @property
+    def video_store(self) -> VideoStore:
+        """Created on first use so text-mode serving doesn't need FFmpeg"""
+        if self._video_store is None:
+            self._video_store = VideoStore()
+        return self._video_store
+        
+    @property
+    def lexical_index(self) -> Optional[LexicalIndex]:
+        """
+        BM25 index over the chunk text, saved next to the index at save().
+
+        Memories saved before it existed get one built in memory on first use
+        (once, even under concurrent searches); searches never write to disk.
+        write_lexical_index() persists it for such memories.
+        """
+        if self._lexical_index is None and self.index_path:
+            with self._lexical_lock:
+                if self._lexical_index is None:
+                    if LexicalIndex.exists(self.index_path):
+                        self._lexical_index = LexicalIndex.load(self.index_path)
+                    else:
+                        metadata = list(self.vector_store.metadata)
+                        self._lexical_index = LexicalIndex.build((m['text'] for m in metadata),
+                                                                 (m['chunk_id'] for m in metadata))
+        return self._lexical_index
+        
     def add(self, text: str, chunk_size: int = 1000, overlap: int = 50):
         """Add text to memory"""
         new_chunks = chunk_text(text, chunk_size, overlap)
         self.chunks.extend(new_chunks)
         print(f"Added {len(new_chunks)} chunks (Total: {len(self.chunks)})")
         
-    def add_file(self, file_path: str, chunk_size: int = 1000, overlap: int = 50):
-        """Add text file to memory"""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            self.add(f.read(), chunk_size, overlap)
+    def add_chunks(self, chunks: List[str]):
+        """Add pre-chunked text to memory (one chunk per item)"""
+        self.chunks.extend(chunk for chunk in chunks if chunk)
+        
+    def add_file(self, file_path: str, chunk_size: int = 1000, overlap: int = 50) -> int:
+        """
+        Add a UTF-8 text file to memory.
+
+        The file is read and chunked incrementally (never loaded whole), and
+        each chunk remembers its source file and byte range; search results
+        of the saved memory include them as 'source'. The chunk texts are
+        kept in self.chunks until save().
+        """
+        added = 0
+        for chunk in iter_file_chunks(file_path, chunk_size, overlap):
+            self.chunk_sources[len(self.chunks)] = (chunk.source, chunk.start, chunk.end)
+            self.chunks.append(chunk.text)
+            added += 1
+        print(f"Added {added} chunks from {file_path} (Total: {len(self.chunks)})")
+        return added
             
-    def save(self, name: str, show_progress: bool = True):
-        """Build and save video memory"""
+    def save(self, name: str, show_progress: bool = True, embeddings: Optional[np.ndarray] = None,
+             embedding_cache: Optional[str] = None, use_embedding_cache: bool = True,
+             video_profile: str = VIDEO_PROFILE, use_chunk_store: bool = USE_CHUNK_STORE,
+             build_video: bool = True):
+        """
+        Build and save video memory.
+
+        Chunks are embedded EMBED_BATCH_SIZE at a time and fed to the index
+        batch by batch. QR frames are encoded across a process pool and
+        streamed straight into FFmpeg, so peak memory stays bounded by
+        BUILD_MAX_PENDING frames. The returned stats include per-stage
+        timings in seconds.
+
+        Peak memory is bounded for reading, embedding and video encoding,
+        not for the index build: the vector index, metadata and BM25 index
+        are built in RAM, so every chunk's text and vector (one float32
+        array per batch) is held until they are saved.
+
+        Embeddings are looked up in a persistent cache keyed by model name and
+        chunk content hash, so a rebuild only embeds new or changed chunks;
+        stats['embedding_cache'] reports the hit rate.
+
+        Chunk text is written to the content-addressed ChunkStore shared by
+        the memories in the same directory, so text another memory already
+        holds is stored once (stats['chunk_store']). Repeated chunks within
+        the memory share one QR frame.
+
+        embeddings: precomputed vectors for self.chunks (skips the encoder,
+        e.g. when compacting segments whose vectors are already known)
+        embedding_cache: cache file (default: EMBEDDING_CACHE_PATH, or a
+        shared file next to the memory)
+        video_profile: 'default', 'intra' or 'gop'; the fixed-GOP profiles
+        trade file size for faster random frame reads
+        use_chunk_store: False keeps the text in the memory's own .chunks file
+        build_video: False saves only the index, metadata and BM25 files
+        (no QR encoding or FFmpeg); the memory then serves 'text' mode only
+        """
         if not self.chunks:
             raise ValueError("No chunks to save. Use add() first.")
             
         base_path = Path(name)
         video_path = base_path.with_suffix('.mp4')
         index_path = base_path.with_suffix('.idx')
+        timings = {}
         
         if show_progress:
             print(f"\n🎬 Creating Kre8VidMem: {name}")
             print(f"   Chunks: {len(self.chunks)}")
             
-        # 1. Generate embeddings
+        # 1. Generate embeddings, feeding the index one batch at a time
         if show_progress:
             print("   [1/3] Generating embeddings...")
-        embeddings = self.vectorizer.encode(self.chunks)
+        if embeddings is not None and len(embeddings) != len(self.chunks):
+            raise ValueError(f"Got {len(embeddings)} embeddings for {len(self.chunks)} chunks")
+        cache = None
+        cache_stats = None
+        if embeddings is None and use_embedding_cache:
+            cache_path = embedding_cache or EMBEDDING_CACHE_PATH or base_path.parent / EMBEDDING_CACHE_FILENAME
+            cache = get_embedding_cache(str(cache_path))
+            cache_stats = {'chunks': 0, 'hits': 0, 'misses': 0, 'embedded': 0}
+        timings['embed'] = 0.0
+        timings['index'] = 0.0
+        frame_ids: Dict[str, int] = {}  # text -> frame of its first occurrence
+        frame_chunks = []               # (chunk_id, text) encoded as frames, in frame order
+        for start in range(0, len(self.chunks), EMBED_BATCH_SIZE):
+            batch = self.chunks[start:start + EMBED_BATCH_SIZE]
+            t0 = time.perf_counter()
+            if embeddings is not None:
+                vectors = embeddings[start:start + len(batch)]
+            elif cache is not None:
+                vectors, batch_stats = cache.encode(self.vectorizer, batch)
+                for key in ('chunks', 'hits', 'misses', 'embedded'):
+                    cache_stats[key] += batch_stats[key]
+            else:
+                vectors = self.vectorizer.encode(batch)
+            t1 = time.perf_counter()
+            self.vector_store.add_items(range(start, start + len(batch)), vectors)
+            for i, chunk in enumerate(batch, start):
+                frame_id = frame_ids.setdefault(chunk, len(frame_ids))
+                if frame_id == len(frame_chunks):
+                    frame_chunks.append((i, chunk))
+                self.vector_store.add_metadata(i, frame_id, chunk)
+            timings['embed'] += t1 - t0
+            timings['index'] += time.perf_counter() - t1
+        if cache_stats is not None:
+            cache_stats['hit_rate'] = cache_stats['hits'] / cache_stats['chunks']
         
-        # 2. Build vector index
+        # 2. Build vector and lexical indexes
         if show_progress:
             print("   [2/3] Building vector index...")
-        for i in range(len(self.chunks)):
-            self.vector_store.add_items([i], embeddings[i:i+1])
-            self.vector_store.add_metadata(i, i, self.chunks[i])
+        t0 = time.perf_counter()
         self.vector_store.build()
-        self.vector_store.save(str(index_path))
+        chunk_store = get_chunk_store(str(chunk_store_dir(index_path))) if use_chunk_store else None
+        store_stats = self.vector_store.save(str(index_path), chunk_store)
+        self._lexical_index = LexicalIndex.build(self.chunks)
+        self._lexical_index.save(str(index_path))
+        if self.chunk_sources:
+            write_sources(str(index_path), [self.chunk_sources.get(i) for i in range(len(self.chunks))])
+            self.sources = load_sources(str(index_path))
+        elif index_path.with_suffix(SOURCES_SUFFIX).exists():
+            index_path.with_suffix(SOURCES_SUFFIX).unlink()  # left by an earlier build
+        timings['index'] += time.perf_counter() - t0
         
-        # 3. Create video
-        if show_progress:
-            print("   [3/3] Creating video...")
-        frames = []
-        for i, chunk in enumerate(self.chunks):
-            # Create QR code with chunk data
-            chunk_data = json.dumps({
-                'id': i,
-                'text': chunk
-            })
-            qr_img = encode_to_qr(chunk_data)
-            frame = qr_to_numpy(qr_img, (FRAME_WIDTH, FRAME_HEIGHT))
-            frames.append(frame)
-            
-        stats = self.video_store.create_video(frames, str(video_path), show_progress=False)
+        # 3. Create video (QR encoding overlaps with FFmpeg encoding)
+        if build_video:
+            if show_progress:
+                print("   [3/3] Creating video...")
+            t0 = time.perf_counter()
+            frames = iter_qr_frames(frame_chunks, total=len(frame_chunks))
+            stats = self.video_store.create_video(frames, str(video_path), show_progress=False,
+                                                  total=len(frame_chunks), profile=video_profile)
+            timings['video'] = time.perf_counter() - t0
+            timings['qr_encode_wait'] = stats['timings']['frames']
+            timings['ffmpeg_write'] = stats['timings']['ffmpeg_write']
+            timings['ffmpeg_finalize'] = stats['timings']['ffmpeg_finalize']
+        else:
+            if video_path.exists():
+                video_path.unlink()  # left by an earlier build; would not match the new index
+            stats = {'size_mb': 0.0}
+        stats['timings'] = timings
+        if cache_stats is not None:
+            stats['embedding_cache'] = cache_stats
+        if store_stats is not None:
+            stats['chunk_store'] = store_stats
         
-        self.video_path = str(video_path)
+        self.video_path = str(video_path) if build_video else None
         self.index_path = str(index_path)
         
         if show_progress:
             print(f"\n✓ Memory created successfully!")
-            print(f"   Video: {video_path} ({stats['size_mb']:.2f} MB)")
+            if build_video:
+                print(f"   Video: {video_path} ({stats['size_mb']:.2f} MB)")
             print(f"   Index: {index_path}")
+            print(f"   Timings: " + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in timings.items()))
+            if cache_stats is not None:
+                print(f"   Embedding cache: {cache_stats['hits']}/{cache_stats['chunks']} hits "
+                      f"({cache_stats['hit_rate']:.0%}), {cache_stats['embedded']} embedded")
+            if store_stats is not None:
+                print(f"   Chunk store: {store_stats['written']} new, {store_stats['reused']} shared "
+                      f"({store_stats['unique']} distinct of {store_stats['chunks']})")
             
         return stats
         
     @classmethod
-    def load(cls, name: str) -> 'Kre8VidMemory':
-        """Load existing video memory"""
-        memory = cls()
+    def load(cls, name: str, vectorizer: Optional[Vectorizer] = None,
+             retrieval_mode: str = RETRIEVAL_MODE) -> 'Kre8VidMemory':
+        """
+        Load existing video memory.
+
+        In 'text' retrieval mode the video is optional, since chunk text is
+        served from the local chunk store; 'video' and 'verify' need the MP4.
+        """
+        memory = cls(vectorizer=vectorizer, retrieval_mode=retrieval_mode)
         
         base_path = Path(name)
         video_path = base_path.with_suffix('.mp4')
         index_path = base_path.with_suffix('.idx')
         
-        if not video_path.exists():
+        if retrieval_mode != 'text' and not video_path.exists():
             raise FileNotFoundError(f"Video not found: {video_path}")
-        if not index_path.exists():
-            raise FileNotFoundError(f"Index not found: {index_path}")
+        if not cls.exists(name):
+            raise FileNotFoundError(f"Index not found: {index_path.with_suffix('.ann')}")
             
-        memory.video_path = str(video_path)
+        memory.video_path = str(video_path) if video_path.exists() else None
         memory.index_path = str(index_path)
         memory.vector_store.load(str(index_path))
+        memory.sources = load_sources(str(index_path))
         
         print(f"✓ Loaded memory: {name}")
         print(f"   Chunks: {len(memory.vector_store.metadata)}")
         
         return memory
         
-    def search(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Search memory for relevant chunks"""
-        if not self.video_path:
-            raise RuntimeError("Memory not loaded. Use load() first.")
-            
+    @staticmethod
+    def exists(name: str) -> bool:
+        """True if a memory index (Annoy or exact) has been saved at ``name``"""
+        return index_file(name) is not None and Path(name).with_suffix('.meta').exists()
+        
+    def search(self, query: str, top_k: int = 5, retrieval_mode: Optional[str] = None,
+               lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> List[Dict]:
+        """
+        Search memory for relevant chunks.
+
+        Vector similarity is fused with BM25 over the chunk text (see
+        search_hybrid); lexical_weight=0 ranks (and scores) by cosine alone.
+
+        retrieval_mode overrides the memory's mode for this call:
+          'text'   - return text from the chunk store (no video decode)
+          'video'  - decode each hit's QR frame from the MP4
+          'verify' - decode from video and flag hits that differ from the store
+        """
         # Generate query embedding
-        query_embedding = self.vectorizer.encode([query])[0]
+        query_embedding = self.vectorizer.encode_queries([query])[0]
+        return self.search_hybrid(query, query_embedding, top_k, retrieval_mode, lexical_weight)
+        
+    def search_many(self, queries: List[str], top_k: int = 5, retrieval_mode: Optional[str] = None,
+                    lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> List[List[Dict]]:
+        """
+        Search several queries at once, returning one result list per query.
+
+        All queries are embedded in a single batched forward pass, then the
+        ANN lookups run back to back.
+        """
+        if not queries:
+            return []
+        query_embeddings = self.vectorizer.encode_queries(list(queries))
+        return [self.search_hybrid(query, embedding, top_k, retrieval_mode, lexical_weight)
+                for query, embedding in zip(queries, query_embeddings)]
+        
+    def search_hybrid(self, query: str, query_embedding: np.ndarray, top_k: int = 5,
+                      retrieval_mode: Optional[str] = None,
+                      lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> List[Dict]:
+        """
+        Fuse vector and BM25 rankings.
+
+        Both retrievers contribute top_k * HYBRID_CANDIDATES candidates; each
+        candidate is scored as (1 - w) * cosine + w * BM25 / max BM25. The
+        score keeps that scale when the query has no lexical hits (BM25 = 0),
+        so results from different calls and memories can be merged on it.
+        Results also carry 'vector_score' (the usual 1 / (1 + distance), as
+        in search_by_vector) and 'lexical_score'.
+        """
+        self._check_mode(retrieval_mode)
+        lexical = self.lexical_index if lexical_weight > 0 else None
+        lexical_hits = dict(lexical.search(query, top_k * HYBRID_CANDIDATES)) if lexical is not None else {}
+            
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        query_embedding = query_embedding / (np.linalg.norm(query_embedding) or 1.0)
+        if not lexical_hits:
+            distances = dict(self.vector_store.search(query_embedding, top_k))
+        else:
+            distances = dict(self.vector_store.search(query_embedding, top_k * HYBRID_CANDIDATES))
+            for chunk_id in lexical_hits.keys() - distances.keys():
+                vector = np.asarray(self.vector_store.get_item_vector(chunk_id), dtype=np.float32)
+                similarity = float(vector @ query_embedding) / (float(np.linalg.norm(vector)) or 1.0)
+                distances[chunk_id] = float(angular_distance(similarity))
+            missing = [c for c in distances if c not in lexical_hits]
+            lexical_hits.update(lexical.scores(query, missing))
+        
+        max_lexical = max(lexical_hits.values(), default=0.0) or 1.0
+        fused = []
+        for chunk_id, distance in distances.items():
+            cosine = 1.0 - distance * distance / 2.0
+            lexical_score = lexical_hits.get(chunk_id, 0.0)
+            score = (1.0 - lexical_weight) * cosine + lexical_weight * lexical_score / max_lexical
+            fused.append((chunk_id, score, {'vector_score': 1.0 / (1.0 + distance),
+                                            'lexical_score': lexical_score}))
+        fused.sort(key=lambda item: item[1], reverse=True)
+        return self._format_results(fused[:top_k], retrieval_mode)
         
+    def lookup(self, query: str, top_k: Optional[int] = None,
+               retrieval_mode: Optional[str] = None) -> List[Dict]:
+        """
+        Exact lexical lookup: chunks containing every query term (e.g. a full
+        player or team name), ranked by BM25. Returns [] when nothing matches.
+        """
+        lexical = self.lexical_index
+        if lexical is None:
+            return []
+        hits = lexical.lookup(query)
+        if top_k is not None:
+            hits = hits[:top_k]
+        return self._format_results([(chunk_id, score, {}) for chunk_id, score in hits], retrieval_mode)
+        
+    def search_by_vector(self, query_embedding: np.ndarray, top_k: int = 5,
+                         retrieval_mode: Optional[str] = None) -> List[Dict]:
+        """Search with a precomputed (normalized) query embedding"""
+        self._check_mode(retrieval_mode)
         # Search vector store
         results = self.vector_store.search(query_embedding, top_k)
+        # Convert distance to similarity
+        return self._format_results([(chunk_id, 1.0 / (1.0 + distance), {}) for chunk_id, distance in results],
+                                    retrieval_mode)
+        
+    def _check_mode(self, retrieval_mode: Optional[str]) -> str:
+        if not self.index_path:
+            raise RuntimeError("Memory not loaded. Use load() first.")
+        mode = retrieval_mode or self.retrieval_mode
+        if mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{mode}'. Use one of: {', '.join(RETRIEVAL_MODES)}")
+        if mode != 'text' and not self.video_path:
+            raise RuntimeError(f"Retrieval mode '{mode}' requires the memory video")
+        return mode
         
-        # Retrieve actual text from video
+    def _format_results(self, ranked: List[Tuple[int, float, Dict]],
+                        retrieval_mode: Optional[str] = None) -> List[Dict]:
+        """Result dicts for (chunk_id, score, extra fields) tuples"""
+        mode = self._check_mode(retrieval_mode)
+        hits = [(self.vector_store.get_metadata(chunk_id), chunk_id, score, extra)
+                for chunk_id, score, extra in ranked]
+        video_texts = {}
+        if mode != 'text':
+            video_texts = self._read_frame_texts(metadata['frame_id'] for metadata, *_ in hits if metadata)
         output = []
-        for chunk_id, distance in results:
-            metadata = self.vector_store.get_metadata(chunk_id)
+        for metadata, chunk_id, score, extra in hits:
             if metadata:
-                # Extract frame from video
-                frame_id = metadata['frame_id']
-                frame = self.video_store.extract_frame(self.video_path, frame_id)
-                
-                # Decode QR
-                decoded = decode_qr(frame)
-                if decoded:
-                    try:
-                        chunk_data = json.loads(decoded)
-                        text = chunk_data['text']
-                    except:
-                        text = metadata['text']  # Fallback
-                else:
-                    text = metadata['text']  # Fallback
-                    
-                output.append({
-                    'text': text,
-                    'score': 1.0 / (1.0 + distance),  # Convert distance to similarity
+                result = {
+                    'text': metadata['text'],
+                    'score': score,
                     'chunk_id': chunk_id
-                })
+                }
+                result.update(extra)
+                if self.sources and chunk_id < len(self.sources) and self.sources[chunk_id]:
+                    result['source'] = self.sources[chunk_id]
+                if mode != 'text':
+                    video_text = video_texts.get(metadata['frame_id'])
+                    if video_text is not None:
+                        result['text'] = video_text
+                    if mode == 'verify':
+                        result['verified'] = video_text == metadata['text']
+                output.append(result)
                 
         return output
+        
+    def _read_frame_texts(self, frame_ids) -> Dict[int, Optional[str]]:
+        """
+        Decode chunk texts from their QR frames (None if unreadable).
+
+        Payloads come from the process-wide FrameCache where possible; the
+        rest are read in one capture session in frame order and cached.
+        """
+        cache = get_frame_cache()
+        version = cache.version(self.video_path)
+        texts, missing = cache.get_many(self.video_path, dict.fromkeys(frame_ids), version)
+        if missing:
+            decoded = {}
+            for frame_id, frame in self.video_store.iter_frames(self.video_path, missing):
+                decoded[frame_id] = self._frame_text(frame)
+            cache.put_many(self.video_path, decoded, version)
+            texts.update(decoded)
+        return texts
+        
+    @staticmethod
+    def _frame_text(frame: Optional[np.ndarray]) -> Optional[str]:
+        if frame is None:
+            return None
+        decoded = decode_qr(frame)
+        if not decoded:
+            return None
+        try:
+            return json.loads(decoded)['text']
+        except (ValueError, KeyError, TypeError):
+            return None
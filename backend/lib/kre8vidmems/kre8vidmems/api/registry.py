@@ -0,0 +1,127 @@
+"""
+Process-wide registry of loaded memories
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+from kre8vidmems.api.memory import Kre8VidMemory
+from kre8vidmems.core import Vectorizer, get_vectorizer
+from kre8vidmems.config import REGISTRY_MAX_BYTES, MEMORY_FILE_SUFFIXES
+
+class MemoryRegistry:
+    """
+    Keeps loaded memories alive between searches.
+
+    All memories share one Vectorizer, an index is reloaded only when the
+    mtime/size of its files changes, and the least recently used memories
+    are evicted once their on-disk footprint exceeds ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes: int = REGISTRY_MAX_BYTES,
+                 vectorizer: Optional[Vectorizer] = None):
+        self.max_bytes = max_bytes
+        self._vectorizer = vectorizer
+        self._entries: 'OrderedDict[str, Tuple[Kre8VidMemory, tuple, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.loads = 0
+        self.evictions = 0
+
+    @property
+    def vectorizer(self) -> Vectorizer:
+        if self._vectorizer is None:
+            self._vectorizer = get_vectorizer()
+        return self._vectorizer
+
+    @staticmethod
+    def _key(name: Union[str, Path]) -> str:
+        return str(Path(name).resolve())
+
+    @staticmethod
+    def _signature(name: Union[str, Path]) -> Tuple[tuple, int]:
+        """(mtime, size) of every memory file plus their total size"""
+        base_path = Path(name)
+        signature = []
+        total = 0
+        for suffix in MEMORY_FILE_SUFFIXES:
+            try:
+                stat = os.stat(base_path.with_suffix(suffix))
+            except FileNotFoundError:
+                signature.append((suffix, None, None))
+                continue
+            signature.append((suffix, stat.st_mtime_ns, stat.st_size))
+            if suffix != '.idx':  # .idx is usually a symlink to .ann
+                total += stat.st_size
+        return tuple(signature), total
+
+    def get(self, name: Union[str, Path]) -> Kre8VidMemory:
+        """Return a loaded memory, loading or reloading it when needed"""
+        key = self._key(name)
+        signature, size = self._signature(name)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == signature:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+
+        # Load outside the lock so slow loads don't block cached lookups
+        memory = Kre8VidMemory.load(str(name), vectorizer=self.vectorizer)
+
+        with self._lock:
+            self._entries[key] = (memory, signature, size)
+            self._entries.move_to_end(key)
+            self.loads += 1
+            self._evict()
+        return memory
+
+    def _evict(self):
+        """Drop least recently used memories until under the byte budget"""
+        while len(self._entries) > 1 and self.resident_bytes > self.max_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(size for _, _, size in self._entries.values())
+
+    def invalidate(self, name: Union[str, Path]):
+        """Forget a memory (e.g. after it was deleted or rebuilt)"""
+        with self._lock:
+            self._entries.pop(self._key(name), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def loaded(self) -> List[str]:
+        with self._lock:
+            return list(self._entries.keys())
+
+    def stats(self) -> Dict:
+        with self._lock:
+            stats = {
+                'loaded': len(self._entries),
+                'resident_bytes': self.resident_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'loads': self.loads,
+                'evictions': self.evictions
+            }
+        if self._vectorizer is not None:
+            stats['query_cache'] = self._vectorizer.query_cache.stats()
+        return stats
+
+_default_registry: Optional[MemoryRegistry] = None
+_default_lock = threading.Lock()
+
+def get_registry() -> MemoryRegistry:
+    """Return the process-wide MemoryRegistry"""
+    global _default_registry
+    with _default_lock:
+        if _default_registry is None:
+            _default_registry = MemoryRegistry()
+        return _default_registry
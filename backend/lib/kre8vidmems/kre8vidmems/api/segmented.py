@@ -0,0 +1,237 @@
+"""
+Segmented memories: cheap appends on top of immutable Annoy indexes
+"""
+import json
+import os
+import shutil
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional
+from kre8vidmems.api.memory import Kre8VidMemory
+from kre8vidmems.core import Vectorizer, get_vectorizer
+from kre8vidmems.config import SEGMENT_MAX_DELTAS
+
+MANIFEST_NAME = 'manifest.json'
+
+class SegmentedMemory:
+    """
+    A memory made of one base segment plus small delta segments.
+
+    Annoy indexes can't be modified once built, so append() saves new
+    chunks as their own small segment instead of rebuilding everything;
+    write cost depends only on the number of new chunks. Searches fan out
+    over all segments. Once SEGMENT_MAX_DELTAS deltas exist, a background
+    compactor merges every segment into a new base, reusing the stored
+    vectors instead of re-embedding.
+
+    Chunks may carry a key (e.g. a bet id). A chunk appended later with the
+    same key supersedes the earlier one in search results and compaction.
+
+    Segments keep their text in their own ``.chunks`` files rather than the
+    directory's shared ChunkStore: the store's blob is append-only, so text
+    of compacted-away segments would stay in it forever. Deleting a merged
+    segment's files frees its text, keeping disk use bounded. Segments are
+    saved without a video: they are only ever read in 'text' mode.
+
+    Layout: ``<name>.segments/manifest.json`` plus ``seg-<n>.*`` files.
+    """
+
+    def __init__(self, name: str, max_deltas: int = SEGMENT_MAX_DELTAS,
+                 vectorizer: Optional[Vectorizer] = None, background: bool = True):
+        self.root = Path(f"{name}.segments")
+        self.max_deltas = max_deltas
+        self._vectorizer = vectorizer
+        self.background = background
+        self._lock = threading.RLock()
+        self._compacting = False
+        self._compactor: Optional[threading.Thread] = None
+        self._manifest = self._read_manifest()
+        self._segments: Dict[str, Kre8VidMemory] = {}
+
+    @property
+    def vectorizer(self) -> Vectorizer:
+        if self._vectorizer is None:
+            self._vectorizer = get_vectorizer()
+        return self._vectorizer
+
+    # ---------- manifest ----------
+
+    def _read_manifest(self) -> Dict:
+        manifest_path = self.root / MANIFEST_NAME
+        if manifest_path.exists():
+            with open(manifest_path, 'r') as f:
+                return json.load(f)
+        return {'next_id': 0, 'segments': []}
+
+    def _write_manifest(self, manifest: Dict):
+        self.root.mkdir(parents=True, exist_ok=True)
+        manifest_path = self.root / MANIFEST_NAME
+        tmp_path = manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, manifest_path)
+        self._manifest = manifest
+
+    def _segment(self, entry: Dict) -> Kre8VidMemory:
+        """
+        Loaded segment (call with the lock held, or while compacting).
+
+        Compaction deletes merged segments' files under the same lock, so a
+        segment resolved here stays readable: its files are memory-mapped.
+        """
+        with self._lock:
+            memory = self._segments.get(entry['name'])
+            if memory is None:
+                memory = Kre8VidMemory.load(str(self.root / entry['name']), vectorizer=self.vectorizer,
+                                            retrieval_mode='text')
+                memory.lexical_index  # open .lex.npz now, before a compaction can delete it
+                self._segments[entry['name']] = memory
+            return memory
+
+    # ---------- writes ----------
+
+    def _reserve_name(self) -> str:
+        """Claim the next segment name; appends and compaction share one counter"""
+        with self._lock:
+            segment_name = f"seg-{self._manifest['next_id']:06d}"
+            self._manifest['next_id'] += 1
+            return segment_name
+
+    def __len__(self) -> int:
+        return sum(entry['count'] for entry in self._manifest['segments'])
+
+    @property
+    def delta_count(self) -> int:
+        return max(0, len(self._manifest['segments']) - 1)
+
+    def append(self, chunks: List[str], keys: Optional[List[Optional[str]]] = None,
+               embeddings: Optional[np.ndarray] = None) -> Dict:
+        """Save chunks as a new delta segment; may trigger compaction"""
+        if not chunks:
+            raise ValueError("No chunks to append")
+        if keys is None:
+            keys = [None] * len(chunks)
+        if len(keys) != len(chunks):
+            raise ValueError(f"Got {len(keys)} keys for {len(chunks)} chunks")
+
+        segment_name = self._reserve_name()
+        self.root.mkdir(parents=True, exist_ok=True)
+        memory = Kre8VidMemory(vectorizer=self.vectorizer, retrieval_mode='text')
+        memory.add_chunks(chunks)
+        stats = memory.save(str(self.root / segment_name), show_progress=False, embeddings=embeddings,
+                            use_chunk_store=False, build_video=False)
+
+        with self._lock:
+            # Read segments under the lock: other appends or a compaction may have finished meanwhile
+            entry = {'name': segment_name, 'count': len(chunks), 'keys': keys}
+            self._write_manifest(dict(self._manifest, segments=list(self._manifest['segments']) + [entry]))
+            self._segments[segment_name] = memory
+
+        if self.delta_count >= self.max_deltas:
+            self.compact(wait=not self.background)
+        return stats
+
+    def compact(self, wait: bool = True):
+        """Merge all current segments into a new base segment"""
+        with self._lock:
+            if self._compacting or len(self._manifest['segments']) <= 1:
+                return
+            self._compacting = True
+            snapshot = list(self._manifest['segments'])
+
+        if wait:
+            self._compact(snapshot)
+        else:
+            self._compactor = threading.Thread(target=self._compact, args=(snapshot,), daemon=True)
+            self._compactor.start()
+
+    def _compact(self, snapshot: List[Dict]):
+        try:
+            latest = self._latest_positions(snapshot)
+            chunks, keys, vectors = [], [], []
+            for position, entry in enumerate(snapshot):
+                segment = self._segment(entry)
+                for meta, key in zip(segment.vector_store.metadata, entry['keys']):
+                    if key is not None and latest[key] != position:
+                        continue  # superseded by a later segment
+                    chunks.append(meta['text'])
+                    keys.append(key)
+                    vectors.append(segment.vector_store.get_item_vector(meta['chunk_id']))
+
+            segment_name = self._reserve_name()
+            memory = Kre8VidMemory(vectorizer=self.vectorizer, retrieval_mode='text')
+            memory.add_chunks(chunks)
+            memory.save(str(self.root / segment_name), show_progress=False,
+                        embeddings=np.asarray(vectors, dtype=np.float32), use_chunk_store=False,
+                        build_video=False)
+
+            with self._lock:
+                merged = {entry['name'] for entry in snapshot}
+                remaining = [e for e in self._manifest['segments'] if e['name'] not in merged]
+                base = {'name': segment_name, 'count': len(chunks), 'keys': keys}
+                self._write_manifest(dict(self._manifest, segments=[base] + remaining))
+                self._segments[segment_name] = memory
+                for name in merged:
+                    self._segments.pop(name, None)
+                # Under the lock: searches resolve their segments in the same critical section
+                for name in merged:
+                    for path in self.root.glob(f"{name}.*"):
+                        path.unlink()
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def wait_for_compaction(self, timeout: Optional[float] = None):
+        if self._compactor is not None:
+            self._compactor.join(timeout)
+
+    @staticmethod
+    def _latest_positions(segments: List[Dict]) -> Dict[str, int]:
+        """Map each key to the index of the newest segment that holds it"""
+        latest = {}
+        for position, entry in enumerate(segments):
+            for key in entry['keys']:
+                if key is not None:
+                    latest[key] = position
+        return latest
+
+    def clear(self):
+        """Delete every segment"""
+        self.wait_for_compaction()
+        with self._lock:
+            shutil.rmtree(self.root, ignore_errors=True)
+            self._manifest = {'next_id': 0, 'segments': []}
+            self._segments.clear()
+
+    # ---------- reads ----------
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict]:
+        """Search base and delta segments together"""
+        query_embedding = self.vectorizer.encode_queries([query])[0]
+        return self.search_hybrid(query, query_embedding, top_k)
+
+    def search_hybrid(self, query: str, query_embedding: np.ndarray, top_k: int = 5) -> List[Dict]:
+        """
+        Search every segment with a precomputed query embedding.
+
+        Each segment is searched with Kre8VidMemory.search_hybrid, so scores
+        are on the same fused cosine/BM25 scale as whole-memory searches.
+        """
+        with self._lock:
+            # Resolve segments with the manifest: compaction can't delete them in between
+            segments = [(entry, self._segment(entry)) for entry in self._manifest['segments']]
+        latest = self._latest_positions([entry for entry, _ in segments])
+
+        output = []
+        for position, (entry, segment) in enumerate(segments):
+            for result in segment.search_hybrid(query, query_embedding, top_k * 2):
+                chunk_id = result['chunk_id']
+                key = entry['keys'][chunk_id] if chunk_id < len(entry['keys']) else None
+                if key is not None and latest[key] != position:
+                    continue
+                result.update(segment=entry['name'], key=key)
+                output.append(result)
+
+        output.sort(key=lambda r: r['score'], reverse=True)
+        return output[:top_k]
@@ -19,33 +19,121 @@ QR_BACK_COLOR = "white"
 # Chunking
 DEFAULT_CHUNK_SIZE = 1000
 DEFAULT_OVERLAP = 50
+FILE_READ_SIZE = 64 * 1024  # Characters read per step when streaming files
+EMBED_BATCH_SIZE = int(os.environ.get('KRE8VIDMEMS_EMBED_BATCH_SIZE', '256'))  # Chunks per encode call
 
 # Embedding
 EMBEDDING_MODEL = "all-MiniLM-L6-v2"
 EMBEDDING_DIMENSION = 384
 
+# Query embedding cache (LRU, optionally persisted as .npz across restarts)
+QUERY_CACHE_SIZE = int(os.environ.get('KRE8VIDMEMS_QUERY_CACHE_SIZE', '4096'))
+QUERY_CACHE_PATH = os.environ.get('KRE8VIDMEMS_QUERY_CACHE_PATH')  # None = in-memory only
+
+# Chunk embedding cache (SQLite, keyed by model name + chunk content hash)
+# Defaults to a file next to the memory being saved, shared by its siblings
+EMBEDDING_CACHE_FILENAME = '.embedding_cache.sqlite'
+EMBEDDING_CACHE_PATH = os.environ.get('KRE8VIDMEMS_EMBEDDING_CACHE_PATH')
+
+# Content-addressed chunk store: chunk text is stored once per directory and
+# memories keep (hash, byte range) references into it
+CHUNK_STORE_DIRNAME = '.chunk_store'  # Subdirectory of the memories dir
+USE_CHUNK_STORE = os.environ.get('KRE8VIDMEMS_CHUNK_STORE', '1') != '0'
+
 # Vector Index (Annoy)
 ANNOY_METRIC = 'angular'
 ANNOY_TREES = 15  # More trees = more accurate, slower build
 
+# Vector backend: 'annoy', 'exact' (brute-force float16 NumPy matrix),
+# 'int8' (scalar-quantized matrix, opt-in) or 'auto'
+# ('exact' up to EXACT_SEARCH_MAX_CHUNKS vectors, Annoy above). Exact search
+# keeps a float32 copy in RAM and costs ~0.1 ms per 1000 chunks (384-d), so
+# it stays on par with Annoy's ~0.1-0.2 ms up to about 2000 chunks
+VECTOR_BACKENDS = ('auto', 'annoy', 'exact', 'int8')
+VECTOR_BACKEND = os.environ.get('KRE8VIDMEMS_VECTOR_BACKEND', 'auto')
+EXACT_SEARCH_MAX_CHUNKS = int(os.environ.get('KRE8VIDMEMS_EXACT_MAX_CHUNKS', '2000'))
+EXACT_SEARCH_BLOCK = 4096  # Rows upcast to float32 per step
+# int8 search re-ranks top_k * INT8_RESCORE_FACTOR candidates with the
+# full-precision vectors (0 = return quantized scores as is)
+INT8_RESCORE_FACTOR = int(os.environ.get('KRE8VIDMEMS_INT8_RESCORE', '4'))
+
+# Hybrid retrieval (BM25 over chunk text fused with vector similarity)
+# Fused score = (1 - w) * cosine + w * BM25 / max BM25 among the candidates; 0 = vector only
+HYBRID_LEXICAL_WEIGHT = float(os.environ.get('KRE8VIDMEMS_HYBRID_LEXICAL_WEIGHT', '0.3'))
+HYBRID_CANDIDATES = 4  # Candidates per retriever: top_k * HYBRID_CANDIDATES
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Retrieval
+# 'text' serves chunk text from the local chunk store (fast, default for serving),
+# 'video' decodes QR frames from the MP4, 'verify' decodes and checks against the store
+RETRIEVAL_MODES = ('text', 'video', 'verify')
+RETRIEVAL_MODE = os.environ.get('KRE8VIDMEMS_RETRIEVAL_MODE', 'text')
+# Decoded QR payloads kept in memory, keyed by (video file, frame), so repeated
+# video/verify lookups skip the decoder
+FRAME_CACHE_SIZE = int(os.environ.get('KRE8VIDMEMS_FRAME_CACHE_SIZE', '4096'))
+
+# Memory Registry (process-wide cache of loaded memories)
+REGISTRY_MAX_BYTES = int(os.environ.get('KRE8VIDMEMS_REGISTRY_MAX_MB', '512')) * 1024 * 1024
+MEMORY_FILE_SUFFIXES = ('.ann', '.vectors.npy', '.q8.npy', '.full.npy', '.meta', '.idx', '.ids.npy', '.offsets.npy', '.chunks', '.spans.npy', '.hashes.npy', '.lex.npz', '.sources.json')
+
+# Segmented memories (append-only deltas merged into a base segment)
+SEGMENT_MAX_DELTAS = int(os.environ.get('KRE8VIDMEMS_SEGMENT_MAX_DELTAS', '16'))
+
+# Federated index (all memories' vectors in one Annoy index)
+FEDERATED_INDEX_DIRNAME = 'federated'  # Subdirectory of the memories dir
+FEDERATED_OVERFETCH = 4  # Candidate multiplier for memory-filtered searches
+# Staleness is rechecked when the memories dir changes, or at most this often
+# (catches memories rebuilt in place, which don't touch the directory mtime)
+FEDERATED_STALE_CHECK_SECONDS = float(os.environ.get('KRE8VIDMEMS_FEDERATED_STALE_CHECK_SECONDS', '5'))
+
+# Metadata storage (.meta header + .ids.npy/.offsets.npy/.chunks arrays)
+METADATA_FORMAT_VERSION = 2
+
+# Build pipeline (QR encoding process pool, streamed into FFmpeg)
+BUILD_WORKERS = int(os.environ.get('KRE8VIDMEMS_BUILD_WORKERS', os.cpu_count() or 1))
+BUILD_MAX_PENDING = 64  # Frames in flight (bounds peak memory)
+BUILD_PARALLEL_MIN_CHUNKS = 32  # Below this, encode in-process
+
 # Video Encoding
 VIDEO_FPS = 15
 FRAME_WIDTH = 256
 FRAME_HEIGHT = 256
 
-def get_ffmpeg_codec_args():
-    """Get optimized FFmpeg arguments based on platform"""
+# Encoding profiles: 'default' (encoder's own GOP, smallest files),
+# 'intra' (every frame a keyframe, fastest random reads) and
+# 'gop' (closed GOP of VIDEO_GOP_SIZE frames, no B-frames)
+VIDEO_PROFILES = ('default', 'intra', 'gop')
+VIDEO_PROFILE = os.environ.get('KRE8VIDMEMS_VIDEO_PROFILE', 'default')
+VIDEO_GOP_SIZE = int(os.environ.get('KRE8VIDMEMS_VIDEO_GOP_SIZE', '8'))
+
+def get_gop_size(profile: str = VIDEO_PROFILE):
+    """Fixed keyframe interval for a profile (None = chosen by the encoder)"""
+    if profile not in VIDEO_PROFILES:
+        raise ValueError(f"Unknown video profile '{profile}'. Use one of: {', '.join(VIDEO_PROFILES)}")
+    return {'intra': 1, 'gop': VIDEO_GOP_SIZE}.get(profile)
+
+def get_ffmpeg_codec_args(profile: str = VIDEO_PROFILE):
+    """Get optimized FFmpeg arguments based on platform and encoding profile"""
+    gop = get_gop_size(profile)
     if IS_MAC:
         # Use VideoToolbox hardware acceleration on Mac
-        return [
+        args = [
             '-c:v', 'hevc_videotoolbox',
             '-q:v', '50',  # Quality (0-100, higher is better for videotoolbox)
             '-allow_sw', '1'
         ]
+        if gop:
+            args += ['-g', str(gop), '-bf', '0']
+        return args
     else:
         # Fallback to software encoding (x265)
-        return [
+        args = [
             '-c:v', 'libx265',
             '-crf', '24',  # Quality (0-51, lower is better for x265)
             '-preset', 'medium'
         ]
+        if gop:
+            # Fixed, closed GOPs without B-frames so keyframes land on every gop-th frame
+            args += ['-x265-params', f'keyint={gop}:min-keyint={gop}:scenecut=0:open-gop=0:bframes=0']
+        return args
@@ -1,8 +1,13 @@
 """
 Core components for Kre8VidMems
 """
-from .chunker import chunk_text
-from .qr_generator import encode_to_qr, decode_qr, qr_to_numpy
-from .vectorizer import Vectorizer
+from .chunker import chunk_text, iter_chunks, iter_file_chunks, Chunk
+from .qr_generator import encode_to_qr, decode_qr, qr_to_numpy, chunk_to_frame, iter_qr_frames
+from .vectorizer import Vectorizer, get_vectorizer
+from .query_cache import QueryCache
+from .embedding_cache import EmbeddingCache, get_embedding_cache, content_hash
+from .frame_cache import FrameCache, get_frame_cache
 
-__all__ = ['chunk_text', 'encode_to_qr', 'decode_qr', 'qr_to_numpy', 'Vectorizer']
+__all__ = ['chunk_text', 'iter_chunks', 'iter_file_chunks', 'Chunk', 'encode_to_qr', 'decode_qr', 'qr_to_numpy', 'chunk_to_frame', 'iter_qr_frames', 'Vectorizer', 'get_vectorizer',
+           'QueryCache', 'EmbeddingCache', 'get_embedding_cache', 'content_hash',
+           'FrameCache', 'get_frame_cache']
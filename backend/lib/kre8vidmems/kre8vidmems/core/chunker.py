@@ -1,7 +1,20 @@
 """
 Text chunking logic
 """
-from typing import List
+from typing import Iterator, List, NamedTuple, Optional
+from kre8vidmems.config import FILE_READ_SIZE
+
+class Chunk(NamedTuple):
+    """A chunk of a source file with its UTF-8 byte range [start, end)"""
+    text: str
+    source: Optional[str]
+    start: int
+    end: int
+
+def iter_chunks(text: str, chunk_size: int = 1000, overlap: int = 50) -> Iterator[str]:
+    """Generator version of chunk_text"""
+    for chunk in _iter_spans(iter([text]), chunk_size, overlap, source=None):
+        yield chunk.text
 
 def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 50) -> List[str]:
     """
@@ -10,33 +23,81 @@ def chunk_text(text: str, chunk_size: int = 1000, overlap: int = 50) -> List[str
     """
     if not text:
         return []
-        
-    chunks = []
-    start = 0
-    text_len = len(text)
-    
-    while start < text_len:
-        end = start + chunk_size
-        
+    return list(iter_chunks(text, chunk_size, overlap))
+
+def iter_file_chunks(file_path: str, chunk_size: int = 1000, overlap: int = 50,
+                     read_size: int = FILE_READ_SIZE) -> Iterator[Chunk]:
+    """
+    Chunk a UTF-8 text file while reading it incrementally.
+
+    Produces the same chunks as chunk_text(file contents) but holds at most
+    read_size + chunk_size characters at a time, and tags each chunk with
+    its file and byte offsets.
+    """
+    def pieces():
+        # newline='' keeps \r\n as-is so byte offsets match the file
+        with open(file_path, 'r', encoding='utf-8', newline='') as f:
+            while True:
+                piece = f.read(read_size)
+                if not piece:
+                    return
+                yield piece
+    return _iter_spans(pieces(), chunk_size, overlap, source=str(file_path))
+
+def _iter_spans(pieces: Iterator[str], chunk_size: int, overlap: int,
+                source: Optional[str]) -> Iterator[Chunk]:
+    """
+    chunk_text's algorithm over a stream of text pieces.
+
+    ``buffer[pos:]`` is the text from the current chunk start onwards and
+    ``pos_offset`` the byte offset of ``buffer[pos]``. The consumed prefix is
+    dropped once it outgrows a read block and the rest of the buffer, so each
+    character is copied a bounded number of times.
+    """
+    buffer = ''
+    pos = 0
+    pos_offset = 0
+    exhausted = False
+
+    while True:
+        # Need one character past the chunk to know whether text continues
+        while not exhausted and len(buffer) - pos <= chunk_size:
+            piece = next(pieces, None)
+            if piece is None:
+                exhausted = True
+            else:
+                if pos:
+                    buffer, pos = buffer[pos:], 0
+                buffer += piece
+        if pos >= len(buffer):
+            return
+
+        end = pos + chunk_size
         # If we are not at the end of text, try to find a sentence break
-        if end < text_len:
+        if end < len(buffer):
             # Look for the last period in the chunk
-            chunk_slice = text[start:end]
-            last_period = chunk_slice.rfind('.')
-            
+            last_period = buffer.rfind('.', pos, end)
+
             # If a period is found reasonably close to the end (last 20%), break there
-            if last_period > chunk_size * 0.8:
-                end = start + last_period + 1
-        
-        chunk = text[start:end].strip()
+            if last_period - pos > chunk_size * 0.8:
+                end = last_period + 1
+
+        raw = buffer[pos:end]
+        chunk = raw.strip()
         if chunk:
-            chunks.append(chunk)
-            
+            lead = len(raw) - len(raw.lstrip())
+            start_byte = pos_offset + len(raw[:lead].encode('utf-8'))
+            yield Chunk(chunk, source, start_byte, start_byte + len(chunk.encode('utf-8')))
+
         # Move start forward, minus overlap
         start = end - overlap
-        
+
         # Ensure we make forward progress
         if start >= end:
             start = end
-            
-    return chunks
+        if exhausted and start >= len(buffer):
+            return
+        pos_offset += len(buffer[pos:start].encode('utf-8'))
+        pos = start
+        if pos >= FILE_READ_SIZE and 2 * pos >= len(buffer):
+            buffer, pos = buffer[pos:], 0
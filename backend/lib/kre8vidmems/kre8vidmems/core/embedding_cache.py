@@ -0,0 +1,119 @@
+"""
+Persistent content-hash cache of chunk embeddings
+"""
+import hashlib
+import sqlite3
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+def content_hash(text: str) -> str:
+    """SHA-256 of a chunk's UTF-8 text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class EmbeddingCache:
+    """
+    SQLite map of (model name, chunk content hash) -> embedding.
+
+    Rebuilding a memory only embeds chunks whose text is new or changed;
+    everything else is read back from the cache. Entries are shared by all
+    memories that point at the same cache file.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " hash TEXT NOT NULL,"
+            " dimension INTEGER NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " PRIMARY KEY (model, hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, model_name: str, hashes: List[str]) -> Dict[str, np.ndarray]:
+        """Cached vectors for the given hashes (missing hashes are left out)"""
+        found = {}
+        unique = list(dict.fromkeys(hashes))
+        with self._lock:
+            # Stay under SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                placeholders = ','.join('?' * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT hash, dimension, vector FROM embeddings WHERE model = ? AND hash IN ({placeholders})",
+                    [model_name, *batch]
+                )
+                for digest, dimension, blob in rows:
+                    vector = np.frombuffer(blob, dtype=np.float32)
+                    if len(vector) == dimension:
+                        found[digest] = vector
+        return found
+
+    def put_many(self, model_name: str, items: List[Tuple[str, np.ndarray]]):
+        rows = [(model_name, digest, len(vector), np.asarray(vector, dtype=np.float32).tobytes())
+                for digest, vector in items]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, hash, dimension, vector) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self._conn.commit()
+
+    def encode(self, vectorizer, texts: List[str]) -> Tuple[np.ndarray, Dict]:
+        """
+        Embed texts through the cache.
+
+        Returns the embeddings (in input order) and hit/miss counts. Only
+        cache misses go through the model, in one batched call.
+        """
+        model_name = vectorizer.model_name
+        hashes = [content_hash(text) for text in texts]
+        vectors = self.get_many(model_name, hashes)
+
+        missing = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors and digest not in missing:
+                missing[digest] = text
+        if missing:
+            fresh = vectorizer.encode(list(missing.values()))
+            fresh = np.asarray(fresh, dtype=np.float32)
+            self.put_many(model_name, list(zip(missing.keys(), fresh)))
+            vectors.update(zip(missing.keys(), fresh))
+
+        hits = sum(1 for digest in hashes if digest not in missing)
+        stats = {
+            'chunks': len(texts),
+            'hits': hits,
+            'misses': len(texts) - hits,
+            'embedded': len(missing),
+            'hit_rate': hits / len(texts) if texts else 0.0
+        }
+        embeddings = np.stack([vectors[digest] for digest in hashes]) if hashes else np.zeros((0, 0), dtype=np.float32)
+        return embeddings, stats
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_open_caches: Dict[str, EmbeddingCache] = {}
+_open_lock = threading.Lock()
+
+def get_embedding_cache(path: str) -> EmbeddingCache:
+    """Return the process-wide EmbeddingCache for a file, opening it on first use"""
+    key = str(Path(path).resolve())
+    with _open_lock:
+        cache = _open_caches.get(key)
+        if cache is None:
+            cache = EmbeddingCache(key)
+            _open_caches[key] = cache
+        return cache
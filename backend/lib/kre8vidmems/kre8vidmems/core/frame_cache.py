@@ -0,0 +1,95 @@
+"""
+LRU cache of decoded QR frame payloads
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+from kre8vidmems.config import FRAME_CACHE_SIZE
+
+class FrameCache:
+    """
+    Bounded LRU map of (video path, frame) -> decoded chunk text.
+
+    Keys also carry the video's modification time, so a rebuilt memory
+    never serves stale payloads (old entries just age out). Frames that
+    failed to decode are cached as None, so they aren't retried either.
+    """
+
+    def __init__(self, capacity: int = FRAME_CACHE_SIZE):
+        self.capacity = capacity
+        self._entries: 'OrderedDict[Tuple[str, int, int], Optional[str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def version(video_path: str) -> int:
+        """Modification time of the video (0 if missing)"""
+        try:
+            return os.stat(video_path).st_mtime_ns
+        except OSError:
+            return 0
+
+    def get_many(self, video_path: str, frames: Iterable[int],
+                 version: Optional[int] = None) -> Tuple[Dict[int, Optional[str]], List[int]]:
+        """Cached payloads for frames, and the frames that still need decoding"""
+        if version is None:
+            version = self.version(video_path)
+        found, missing = {}, []
+        with self._lock:
+            for frame in frames:
+                key = (video_path, version, frame)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[frame] = self._entries[key]
+                    self.hits += 1
+                else:
+                    missing.append(frame)
+                    self.misses += 1
+        return found, missing
+
+    def put_many(self, video_path: str, payloads: Dict[int, Optional[str]],
+                 version: Optional[int] = None):
+        if self.capacity <= 0:
+            return
+        if version is None:
+            version = self.version(video_path)
+        with self._lock:
+            for frame, text in payloads.items():
+                key = (video_path, version, frame)
+                self._entries[key] = text
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+_frame_cache: Optional[FrameCache] = None
+_frame_cache_lock = threading.Lock()
+
+def get_frame_cache() -> FrameCache:
+    """Process-wide frame cache shared by every loaded memory"""
+    global _frame_cache
+    with _frame_cache_lock:
+        if _frame_cache is None:
+            _frame_cache = FrameCache()
+        return _frame_cache
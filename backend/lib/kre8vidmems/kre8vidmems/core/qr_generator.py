@@ -3,14 +3,18 @@ QR Code generation and decoding
 """
 import qrcode
 import cv2
+import json
 import numpy as np
 import gzip
 import base64
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
-from typing import Optional, Tuple
+from typing import Iterable, Iterator, Optional, Tuple
 from kre8vidmems.config import (
     QR_VERSION, QR_ERROR_CORRECTION, QR_BOX_SIZE, 
-    QR_BORDER, QR_FILL_COLOR, QR_BACK_COLOR
+    QR_BORDER, QR_FILL_COLOR, QR_BACK_COLOR,
+    FRAME_WIDTH, FRAME_HEIGHT, BUILD_WORKERS, BUILD_MAX_PENDING, BUILD_PARALLEL_MIN_CHUNKS
 )
 
 def encode_to_qr(data: str) -> Image.Image:
@@ -63,3 +67,37 @@ def decode_qr(image: np.ndarray) -> Optional[str]:
                 return None # Decompression failed
         return data
     return None
+
+def chunk_to_frame(item: Tuple[int, str]) -> np.ndarray:
+    """Render one (chunk_id, text) pair as a QR video frame"""
+    chunk_id, text = item
+    chunk_data = json.dumps({
+        'id': chunk_id,
+        'text': text
+    })
+    qr_img = encode_to_qr(chunk_data)
+    return qr_to_numpy(qr_img, (FRAME_WIDTH, FRAME_HEIGHT))
+
+def iter_qr_frames(items: Iterable[Tuple[int, str]], total: Optional[int] = None,
+                   workers: int = BUILD_WORKERS,
+                   max_pending: int = BUILD_MAX_PENDING) -> Iterator[np.ndarray]:
+    """
+    Yield QR frames for (chunk_id, text) pairs, in order.
+
+    Encoding is spread over a process pool; at most ``max_pending`` frames
+    are in flight at once, so memory stays bounded however many chunks
+    there are. Small inputs are encoded in-process to skip pool startup.
+    """
+    if workers <= 1 or (total is not None and total < BUILD_PARALLEL_MIN_CHUNKS):
+        for item in items:
+            yield chunk_to_frame(item)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(chunk_to_frame, item))
+            if len(pending) >= max_pending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
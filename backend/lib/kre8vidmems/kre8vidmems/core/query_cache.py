@@ -0,0 +1,90 @@
+"""
+LRU cache of query embeddings
+"""
+import os
+import threading
+import numpy as np
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional
+
+def normalize_query(query: str) -> str:
+    """Cache key for a query: surrounding/repeated whitespace removed"""
+    return ' '.join(query.split())
+
+class QueryCache:
+    """
+    Bounded LRU map of normalized query string -> embedding.
+
+    Counts hits and misses, and can be persisted to a .npz file so warm
+    restarts skip re-embedding popular queries.
+    """
+
+    def __init__(self, capacity: int, model_name: str = ''):
+        self.capacity = capacity
+        self.model_name = model_name
+        self._entries: 'OrderedDict[str, np.ndarray]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray):
+        if self.capacity <= 0:
+            return
+        with self._lock:
+            self._entries[key] = vector
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'capacity': self.capacity,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+    def save(self, path: str):
+        """Write entries (least to most recently used) to a .npz file"""
+        with self._lock:
+            keys = list(self._entries.keys())
+            vectors = np.stack(list(self._entries.values())) if keys else np.zeros((0, 0), dtype=np.float32)
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(tmp_path, keys=np.array(keys, dtype=str), vectors=vectors,
+                 model_name=np.array(self.model_name))
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> int:
+        """Load entries saved for the same model; returns how many were loaded"""
+        with np.load(path, allow_pickle=False) as data:
+            if str(data['model_name']) != self.model_name:
+                return 0
+            keys, vectors = data['keys'], data['vectors']
+            for key, vector in zip(keys[-self.capacity:], vectors[-self.capacity:]):
+                self.put(str(key), vector)
+        return min(len(keys), self.capacity)
@@ -1,16 +1,65 @@
 """
 Vector embedding generation
 """
+import atexit
+import threading
+from pathlib import Path
 from sentence_transformers import SentenceTransformer
 import numpy as np
-from typing import List, Union
-from kre8vidmems.config import EMBEDDING_MODEL
+from typing import Dict, List, Optional, Union
+from kre8vidmems.config import EMBEDDING_MODEL, QUERY_CACHE_SIZE, QUERY_CACHE_PATH
+from kre8vidmems.core.query_cache import QueryCache, normalize_query
+
+_shared_vectorizers: Dict[str, 'Vectorizer'] = {}
+_shared_lock = threading.Lock()
 
 class Vectorizer:
-    def __init__(self, model_name: str = EMBEDDING_MODEL):
+    def __init__(self, model_name: str = EMBEDDING_MODEL, query_cache_size: int = QUERY_CACHE_SIZE,
+                 query_cache_path: Optional[str] = QUERY_CACHE_PATH):
+        self.model_name = model_name
         self.model = SentenceTransformer(model_name)
+        self.query_cache = QueryCache(query_cache_size, model_name)
+        self.query_cache_path = query_cache_path
+        if query_cache_path:
+            if Path(query_cache_path).exists():
+                try:
+                    self.query_cache.load(query_cache_path)
+                except (OSError, ValueError, KeyError):
+                    pass  # Corrupt or foreign cache file - start cold
+            atexit.register(self.save_query_cache)
         
     def encode(self, texts: Union[str, List[str]]) -> np.ndarray:
         """Generate embeddings for text(s)"""
         embeddings = self.model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
         return embeddings
+        
+    def encode_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed search queries through the LRU query cache.
+
+        Cache misses are embedded together in one forward pass.
+        """
+        keys = [normalize_query(q) for q in queries]
+        vectors = [self.query_cache.get(key) for key in keys]
+        missing = sorted({key for key, vector in zip(keys, vectors) if vector is None})
+        if missing:
+            fresh = dict(zip(missing, self.encode(missing)))
+            for key, vector in fresh.items():
+                self.query_cache.put(key, vector)
+            vectors = [fresh[key] if vector is None else vector for key, vector in zip(keys, vectors)]
+        return np.stack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+        
+    def save_query_cache(self, path: Optional[str] = None):
+        """Persist the query cache (defaults to query_cache_path)"""
+        path = path or self.query_cache_path
+        if path and len(self.query_cache):
+            self.query_cache.save(path)
+
+def get_vectorizer(model_name: str = EMBEDDING_MODEL) -> Vectorizer:
+    """Return the process-wide Vectorizer for a model, loading it on first use"""
+    with _shared_lock:
+        vectorizer = _shared_vectorizers.get(model_name)
+        if vectorizer is None:
+            vectorizer = Vectorizer(model_name)
+            _shared_vectorizers[model_name] = vectorizer
+        return vectorizer
@@ -3,5 +3,11 @@ Storage components for Kre8VidMems
 """
 from .video_store import VideoStore
 from .vector_store import VectorStore
+from .metadata_store import MetadataStore
+from .federated_index import FederatedIndex
+from .lexical_index import LexicalIndex
+from .chunk_store import ChunkStore, get_chunk_store
+from .report import storage_report
 
-__all__ = ['VideoStore', 'VectorStore']
+__all__ = ['VideoStore', 'VectorStore', 'MetadataStore', 'FederatedIndex', 'LexicalIndex', 'ChunkStore',
+           'get_chunk_store', 'storage_report']
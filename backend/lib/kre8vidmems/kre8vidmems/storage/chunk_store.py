@@ -0,0 +1,219 @@
+"""
+Content-addressed chunk text store shared by the memories in a directory
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from kre8vidmems.config import CHUNK_STORE_DIRNAME
+
+BLOB_FILENAME = 'chunks.dat'       # UTF-8 text of every distinct chunk, append-only
+INDEX_FILENAME = 'index.sqlite'    # SHA-256 -> (offset, length) in the blob
+# Per-memory files referencing the store, next to each memory's index
+SPANS_SUFFIX = '.spans.npy'        # int64 (N, 2): [start, end) byte range in the store's blob
+HASHES_SUFFIX = '.hashes.npy'      # uint8 (N, 32): SHA-256 of each chunk's text
+
+def chunk_digest(data: bytes) -> bytes:
+    """Raw SHA-256 of a chunk's UTF-8 text (hex form = content_hash)"""
+    return hashlib.sha256(data).digest()
+
+def chunk_store_dir(path: str) -> Path:
+    """Chunk store used by the memory at ``path`` (shared with its siblings)"""
+    return Path(path).parent / CHUNK_STORE_DIRNAME
+
+class ChunkStore:
+    """
+    Append-only blob of distinct chunk texts plus a SQLite hash index.
+
+    Identical chunks saved by any memory in the directory are written once;
+    each memory keeps per-chunk hashes and byte ranges into the blob, so
+    reads stay a memory-mapped slice. Writers serialize on a SQLite write
+    transaction, so concurrent builds in separate processes are safe.
+    Bytes appended by a build that dies before committing are never
+    referenced. Chunks of deleted or rebuilt memories stay in the blob
+    until gc().
+    """
+
+    def __init__(self, root: str):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.blob_path = self.root / BLOB_FILENAME
+        self.blob_path.touch(exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / INDEX_FILENAME), check_same_thread=False,
+                                     isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            " hash BLOB PRIMARY KEY,"
+            " offset INTEGER NOT NULL,"
+            " length INTEGER NOT NULL) WITHOUT ROWID"
+        )
+
+    def _lookup(self, digests: List[bytes]) -> Dict[bytes, Tuple[int, int]]:
+        found = {}
+        # Stay under SQLite's bound-parameter limit
+        for start in range(0, len(digests), 500):
+            batch = digests[start:start + 500]
+            placeholders = ','.join('?' * len(batch))
+            rows = self._conn.execute(
+                f"SELECT hash, offset, length FROM chunks WHERE hash IN ({placeholders})", batch
+            )
+            for digest, offset, length in rows:
+                found[bytes(digest)] = (offset, length)
+        return found
+
+    def put_many(self, texts: List[str], path: Optional[str] = None) -> Tuple[np.ndarray, np.ndarray, Dict]:
+        """
+        Store texts not already present.
+
+        Returns each text's [start, end) byte range in the blob, its raw
+        SHA-256 (uint8 (N, 32)) and counts of what was newly written. With
+        a memory ``path`` its .spans.npy/.hashes.npy are written inside the
+        same transaction, so gc() never runs between the two.
+        """
+        encoded = [text.encode('utf-8') for text in texts]
+        digests = [chunk_digest(data) for data in encoded]
+        written = 0
+        written_bytes = 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                known = self._lookup(list(dict.fromkeys(digests)))
+                rows = []
+                with open(self.blob_path, 'ab') as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    for digest, data in zip(digests, encoded):
+                        if digest in known:
+                            continue
+                        f.write(data)
+                        known[digest] = (offset, len(data))
+                        rows.append((digest, offset, len(data)))
+                        offset += len(data)
+                        written_bytes += len(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                spans = np.array([[known[d][0], known[d][0] + known[d][1]] for d in digests],
+                                 dtype=np.int64).reshape(-1, 2)
+                hashes = np.frombuffer(b''.join(digests), dtype=np.uint8).reshape(-1, 32)
+                if path is not None:
+                    np.save(Path(path).with_suffix(SPANS_SUFFIX), spans)
+                    np.save(Path(path).with_suffix(HASHES_SUFFIX), hashes)
+                self._conn.executemany("INSERT INTO chunks (hash, offset, length) VALUES (?, ?, ?)", rows)
+                self._conn.execute("COMMIT")
+                written = len(rows)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+        stats = {
+            'chunks': len(texts),
+            'unique': len(set(digests)),
+            'written': written,
+            'written_bytes': written_bytes,
+            'reused': len(set(digests)) - written
+        }
+        return spans, hashes, stats
+
+    def gc(self) -> Dict:
+        """
+        Drop chunks that no memory references any more.
+
+        The live chunks are the hashes in the .hashes.npy files next to the
+        store. They are copied to a new blob in their current order, then
+        the new blob replaces the old one and every memory's .spans.npy is
+        rewritten, all under the write transaction that saves also take.
+        Memories already open keep reading the old blob and spans they have
+        mapped; the registry reloads them once their spans change. Returns
+        counts of kept and removed chunks and bytes.
+        """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            temp_paths = []
+            try:
+                hash_files = sorted(self.root.parent.glob(f"*{HASHES_SUFFIX}"))
+                live = set()
+                for hashes_path in hash_files:
+                    live.update(row.tobytes() for row in np.load(hashes_path))
+
+                rows = self._conn.execute("SELECT hash, offset, length FROM chunks ORDER BY offset").fetchall()
+                blob = self.blob()
+                blob_size = len(blob)
+                kept: Dict[bytes, Tuple[int, int]] = {}
+                new_blob = self.blob_path.with_name(BLOB_FILENAME + '.gc')
+                temp_paths.append(new_blob)
+                with open(new_blob, 'wb') as f:
+                    offset = 0
+                    for digest, old_offset, length in rows:
+                        digest = bytes(digest)
+                        if digest in live:
+                            f.write(bytes(blob[old_offset:old_offset + length]))
+                            kept[digest] = (offset, length)
+                            offset += length
+                    f.flush()
+                    os.fsync(f.fileno())
+                stats = {'chunks': len(kept), 'removed': len(rows) - len(kept),
+                         'bytes': offset, 'removed_bytes': blob_size - offset}
+                if offset == blob_size:
+                    new_blob.unlink()
+                    self._conn.execute("COMMIT")
+                    return stats
+
+                # Remap each memory's spans by hash, into temporary files first
+                new_spans = []
+                for hashes_path in hash_files:
+                    spans_path = hashes_path.with_name(hashes_path.name[:-len(HASHES_SUFFIX)] + SPANS_SUFFIX)
+                    if not spans_path.exists():
+                        continue
+                    ranges = [kept[row.tobytes()] for row in np.load(hashes_path)]
+                    spans = np.array([[start, start + length] for start, length in ranges],
+                                     dtype=np.int64).reshape(-1, 2)
+                    temp_path = spans_path.with_name(spans_path.name + '.gc')
+                    temp_paths.append(temp_path)
+                    with open(temp_path, 'wb') as f:
+                        np.save(f, spans)
+                    new_spans.append((temp_path, spans_path))
+
+                self._conn.execute("DELETE FROM chunks")
+                self._conn.executemany("INSERT INTO chunks (hash, offset, length) VALUES (?, ?, ?)",
+                                       [(digest, start, length) for digest, (start, length) in kept.items()])
+                os.replace(new_blob, self.blob_path)
+                for temp_path, spans_path in new_spans:
+                    os.replace(temp_path, spans_path)
+                self._conn.execute("COMMIT")
+                return stats
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                for temp_path in temp_paths:
+                    if temp_path.exists():
+                        temp_path.unlink()
+                raise
+
+    def blob(self):
+        """Memory-mapped view of the blob as it is now (b'' while empty)"""
+        if not self.blob_path.stat().st_size:
+            return b''
+        return np.memmap(self.blob_path, dtype=np.uint8, mode='r')
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+_open_stores: Dict[str, ChunkStore] = {}
+_open_lock = threading.Lock()
+
+def get_chunk_store(root: str) -> ChunkStore:
+    """Return the process-wide ChunkStore for a directory, opening it on first use"""
+    key = str(Path(root).resolve())
+    with _open_lock:
+        store = _open_stores.get(key)
+        if store is None:
+            store = ChunkStore(key)
+            _open_stores[key] = store
+        return store
@@ -0,0 +1,276 @@
+"""
+Federated Annoy index spanning many memories
+"""
+import json
+import os
+import time
+import numpy as np
+from fnmatch import fnmatch
+from annoy import AnnoyIndex
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+from kre8vidmems.config import (EMBEDDING_DIMENSION, ANNOY_METRIC, ANNOY_TREES, FEDERATED_OVERFETCH,
+                                FEDERATED_STALE_CHECK_SECONDS, HYBRID_LEXICAL_WEIGHT, HYBRID_CANDIDATES)
+from kre8vidmems.storage.lexical_index import LexicalIndex
+from kre8vidmems.storage.metadata_store import MetadataStore, load_metadata
+from kre8vidmems.storage.vector_store import VectorStore, INDEX_SUFFIXES, index_file, memory_name
+
+TAGS_SUFFIX = '.tags.npy'     # int64 (N, 2): memory number, chunk_id within that memory
+MANIFEST_SUFFIX = '.fed.json'
+
+def memory_tags(name: str) -> Dict[str, str]:
+    """Split 'nfl-player-passing-stats' into sport 'nfl' and category 'player-passing-stats'"""
+    sport, _, category = name.partition('-')
+    return {'name': name, 'sport': sport, 'category': category}
+
+def list_memories(memories_dir: str) -> List[str]:
+    """Names of the memories in a directory that have a vector index"""
+    names = set()
+    for suffix in INDEX_SUFFIXES:
+        for path in Path(memories_dir).glob(f'*{suffix}'):
+            name = memory_name(path)
+            if (path.parent / f"{name}.meta").exists():
+                names.add(name)
+    return sorted(names)
+
+def _source_signature(memories_dir: Path, name: str) -> List:
+    path = index_file(str(memories_dir / name))
+    if path is None:
+        raise FileNotFoundError(f"No index for memory {name}")
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+def match_memories(names: Sequence[str], patterns: Optional[Sequence[str]]) -> List[str]:
+    """Filter names by explicit names or shell-style patterns ('nfl-*')"""
+    if not patterns:
+        return list(names)
+    return [n for n in names if any(n == p or fnmatch(n, p) for p in patterns)]
+
+class FederatedIndex:
+    """
+    One Annoy index over the vectors of every memory in a directory.
+
+    Each item is tagged with its source memory (name, sport, category) and
+    local chunk id, so a single ANN query replaces N per-memory queries.
+    Filtered searches over-fetch and drop items from other memories. Chunk
+    text and BM25 scores come from each memory's own metadata store and
+    lexical index.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+        self.dimension = dimension
+        self.index: Optional[AnnoyIndex] = None
+        self.tags: Optional[np.ndarray] = None
+        self.memories: List[Dict] = []
+        self.memories_dir: Optional[Path] = None
+        self._numbers: Dict[str, int] = {}
+        self._metadata: Dict[int, MetadataStore] = {}
+        self._lexical: Dict[int, LexicalIndex] = {}
+        self._stale_check: Optional[Tuple[int, float, bool]] = None  # (dir mtime, checked at, stale)
+
+    @classmethod
+    def build(cls, memories_dir: str, output_path: str, n_trees: int = ANNOY_TREES,
+              show_progress: bool = True) -> 'FederatedIndex':
+        """Build from the per-memory index/.meta files and save to output_path"""
+        memories_dir = Path(memories_dir)
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        fed = cls()
+        fed.memories_dir = memories_dir
+        index = AnnoyIndex(fed.dimension, ANNOY_METRIC)
+        tags = []
+
+        for name in list_memories(memories_dir):
+            source = VectorStore()
+            try:
+                source.load(str(memories_dir / name))
+            except (OSError, ValueError, KeyError) as e:
+                if show_progress:
+                    print(f"   ⚠ Skipping {name}: {e}")
+                continue
+            if source.dimension != fed.dimension or source.metric != ANNOY_METRIC:
+                if show_progress:
+                    print(f"   ⚠ Skipping {name}: incompatible index ({source.dimension}d {source.metric})")
+                continue
+
+            memory_number = len(fed.memories)
+            added = 0
+            for meta in source.metadata:
+                chunk_id = meta['chunk_id']
+                if chunk_id >= source.index.get_n_items():
+                    continue
+                index.add_item(len(tags), source.get_item_vector(chunk_id))
+                tags.append((memory_number, chunk_id))
+                added += 1
+
+            entry = memory_tags(name)
+            entry['count'] = added
+            entry['source'] = _source_signature(memories_dir, name)
+            fed.memories.append(entry)
+            if show_progress:
+                print(f"   + {name}: {added} chunks")
+
+        index.build(n_trees)
+        index.save(str(output_path.with_suffix('.ann')))
+        np.save(output_path.with_suffix(TAGS_SUFFIX), np.array(tags, dtype=np.int64).reshape(-1, 2))
+        with open(output_path.with_suffix(MANIFEST_SUFFIX), 'w') as f:
+            json.dump({
+                'memories_dir': str(memories_dir),
+                'dimension': fed.dimension,
+                'metric': ANNOY_METRIC,
+                'memories': fed.memories
+            }, f, indent=2)
+
+        return cls.load(str(output_path))
+
+    @classmethod
+    def load(cls, path: str, memories_dir: Optional[str] = None) -> 'FederatedIndex':
+        path = Path(path)
+        with open(path.with_suffix(MANIFEST_SUFFIX), 'r') as f:
+            manifest = json.load(f)
+        fed = cls(manifest['dimension'])
+        fed.memories = manifest['memories']
+        fed._numbers = {m['name']: i for i, m in enumerate(fed.memories)}
+        fed.memories_dir = Path(memories_dir or manifest['memories_dir'])
+        fed.index = AnnoyIndex(fed.dimension, manifest['metric'])
+        fed.index.load(str(path.with_suffix('.ann')))
+        fed.tags = np.load(path.with_suffix(TAGS_SUFFIX), mmap_mode='r')
+        return fed
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        path = Path(path)
+        return all(path.with_suffix(s).exists() for s in ('.ann', TAGS_SUFFIX, MANIFEST_SUFFIX))
+
+    def is_stale(self, max_age: float = FEDERATED_STALE_CHECK_SECONDS) -> bool:
+        """
+        True if memories were added, removed or rebuilt since the build.
+
+        The answer is cached: the memories are only re-listed and re-stat'ed
+        when the directory's mtime changes or max_age seconds have passed.
+        Once stale, an index stays stale.
+        """
+        try:
+            dir_mtime = os.stat(self.memories_dir).st_mtime_ns
+        except FileNotFoundError:
+            return True
+        now = time.monotonic()
+        cached = self._stale_check
+        if cached is not None and (cached[2] or (cached[0] == dir_mtime and now - cached[1] < max_age)):
+            return cached[2]
+        stale = self._check_sources()
+        self._stale_check = (dir_mtime, now, stale)
+        return stale
+
+    def _check_sources(self) -> bool:
+        current = list_memories(self.memories_dir)
+        if current != [m['name'] for m in self.memories]:
+            return True
+        try:
+            return any(_source_signature(self.memories_dir, m['name']) != m['source'] for m in self.memories)
+        except FileNotFoundError:
+            return True
+
+    @property
+    def names(self) -> List[str]:
+        return [m['name'] for m in self.memories]
+
+    def search(self, vector: np.ndarray, k: int = 5,
+               memories: Optional[Sequence[str]] = None) -> List[Tuple[str, int, float]]:
+        """
+        Return (memory name, chunk_id, distance) for the k nearest chunks.
+
+        memories: explicit names and/or patterns like 'nfl-*'; None = all.
+        """
+        total = self.index.get_n_items()
+        if memories:
+            allowed = set(match_memories(self.names, memories))
+            if not allowed:
+                return []
+            allowed_numbers = {i for i, m in enumerate(self.memories) if m['name'] in allowed}
+        else:
+            allowed_numbers = None
+
+        # Over-fetch for filtered searches, widening until k matches are found
+        fetch = k if allowed_numbers is None else k * FEDERATED_OVERFETCH
+        while True:
+            fetch = min(fetch, total)
+            ids, distances = self.index.get_nns_by_vector(vector, fetch, include_distances=True)
+            results = []
+            for item, distance in zip(ids, distances):
+                memory_number, chunk_id = self.tags[item]
+                if allowed_numbers is None or memory_number in allowed_numbers:
+                    results.append((self.memories[memory_number]['name'], int(chunk_id), distance))
+                    if len(results) == k:
+                        return results
+            if fetch >= total:
+                return results
+            fetch *= FEDERATED_OVERFETCH
+
+    def get_text(self, name: str, chunk_id: int) -> Optional[str]:
+        meta = self._metadata_store(name).get(chunk_id)
+        return meta['text'] if meta else None
+
+    def search_hybrid(self, query: str, vector: np.ndarray, k: int = 5,
+                      memories: Optional[Sequence[str]] = None,
+                      lexical_weight: float = HYBRID_LEXICAL_WEIGHT) -> List[Dict]:
+        """
+        ANN search, then a BM25 pass over the candidates.
+
+        k * HYBRID_CANDIDATES candidates are fetched and scored as in
+        Kre8VidMemory.search_hybrid: (1 - w) * cosine + w * BM25 / max BM25,
+        with the max taken over each memory's candidates, so scores can be
+        merged with per-memory results. Chunks that only match lexically are
+        not recalled. Returns dicts with memory, chunk_id, text, score,
+        vector_score and lexical_score.
+        """
+        candidates = self.search(vector, k * HYBRID_CANDIDATES if lexical_weight > 0 else k, memories)
+        lexical_hits: Dict[str, Dict[int, float]] = {}
+        if lexical_weight > 0:
+            by_memory: Dict[str, List[int]] = {}
+            for name, chunk_id, _ in candidates:
+                by_memory.setdefault(name, []).append(chunk_id)
+            for name, chunk_ids in by_memory.items():
+                lexical_hits[name] = self.lexical_index(name).scores(query, chunk_ids)
+
+        results = []
+        for name, chunk_id, distance in candidates:
+            hits = lexical_hits.get(name, {})
+            max_lexical = max(hits.values(), default=0.0) or 1.0
+            lexical_score = hits.get(chunk_id, 0.0)
+            results.append({
+                'memory': name,
+                'chunk_id': chunk_id,
+                'score': (1.0 - lexical_weight) * (1.0 - distance * distance / 2.0)
+                         + lexical_weight * lexical_score / max_lexical,
+                'vector_score': 1.0 / (1.0 + distance),
+                'lexical_score': lexical_score
+            })
+        results.sort(key=lambda r: r['score'], reverse=True)
+        for result in results[:k]:
+            result['text'] = self.get_text(result['memory'], result['chunk_id']) or ''
+        return results[:k]
+
+    def _metadata_store(self, name: str) -> MetadataStore:
+        memory_number = self._numbers[name]
+        metadata = self._metadata.get(memory_number)
+        if metadata is None:
+            _, metadata = load_metadata(str(self.memories_dir / name))
+            self._metadata[memory_number] = metadata
+        return metadata
+
+    def lexical_index(self, name: str) -> LexicalIndex:
+        """A memory's BM25 index (built in memory if it was saved without one)"""
+        memory_number = self._numbers[name]
+        lexical = self._lexical.get(memory_number)
+        if lexical is None:
+            path = str(self.memories_dir / name)
+            if LexicalIndex.exists(path):
+                lexical = LexicalIndex.load(path)
+            else:
+                entries = list(self._metadata_store(name))
+                lexical = LexicalIndex.build((m['text'] for m in entries), (m['chunk_id'] for m in entries))
+            self._lexical[memory_number] = lexical
+        return lexical
+
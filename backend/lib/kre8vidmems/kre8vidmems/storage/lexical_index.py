@@ -0,0 +1,173 @@
+"""
+BM25 inverted index over chunk text
+"""
+import re
+import unicodedata
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from kre8vidmems.config import BM25_K1, BM25_B
+from kre8vidmems.storage.metadata_store import load_metadata
+
+LEXICAL_SUFFIX = '.lex.npz'
+
+MONTHS = ('january', 'february', 'march', 'april', 'may', 'june', 'july',
+          'august', 'september', 'october', 'november', 'december')
+STOPWORDS = frozenset(('a', 'an', 'and', 'at', 'by', 'for', 'from', 'in', 'of', 'on',
+                       'or', 'the', 'to', 'vs', 'with'))
+
+_ISO_DATE = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b')
+_TOKEN = re.compile(r'[a-z0-9]+')
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercased word tokens tuned for player/team names.
+
+    Accents are folded ("Jokić" -> "jokic"), in-word apostrophes and periods
+    are dropped ("O'Neal" -> "oneal", "C.J." -> "cj"), and ISO dates also
+    emit their month name so "Lakers December" matches "2025-12-25".
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = re.sub(r"(?<=\w)['’.](?=\w)", '', text)
+    tokens = [t for t in _TOKEN.findall(text) if t not in STOPWORDS]
+    for _, month, _ in _ISO_DATE.findall(text):
+        if 1 <= int(month) <= 12:
+            tokens.append(MONTHS[int(month) - 1])
+    return tokens
+
+class LexicalIndex:
+    """
+    Inverted index with BM25 scoring.
+
+    Posting lists are stored CSR-style: one sorted array of doc (chunk) ids
+    and term frequencies per term, sliced by offsets. Exact entity lookups
+    intersect the posting lists of every query term.
+    """
+
+    def __init__(self, terms: np.ndarray, offsets: np.ndarray, doc_ids: np.ndarray,
+                 tfs: np.ndarray, doc_lengths: np.ndarray, chunk_ids: np.ndarray):
+        self.terms = terms
+        self.offsets = offsets
+        self.doc_ids = doc_ids          # positions into chunk_ids
+        self.tfs = tfs
+        self.doc_lengths = doc_lengths
+        self.chunk_ids = chunk_ids
+        self.avg_length = float(doc_lengths.mean()) if len(doc_lengths) else 0.0
+        self._term_ids = {str(term): i for i, term in enumerate(terms)}
+        self._positions: Optional[Dict[int, int]] = None
+
+    @classmethod
+    def build(cls, texts: Iterable[str], chunk_ids: Optional[Iterable[int]] = None) -> 'LexicalIndex':
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = []
+        for doc, text in enumerate(texts):
+            tokens = tokenize(text)
+            lengths.append(len(tokens))
+            for token in tokens:
+                counts = postings.setdefault(token, {})
+                counts[doc] = counts.get(doc, 0) + 1
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(postings[t]) for t in terms], out=offsets[1:])
+        doc_ids = np.empty(offsets[-1], dtype=np.int32)
+        tfs = np.empty(offsets[-1], dtype=np.float32)
+        for i, term in enumerate(terms):
+            docs = sorted(postings[term].items())
+            doc_ids[offsets[i]:offsets[i + 1]] = [d for d, _ in docs]
+            tfs[offsets[i]:offsets[i + 1]] = [c for _, c in docs]
+
+        chunk_ids = np.arange(len(lengths)) if chunk_ids is None else np.fromiter(chunk_ids, dtype=np.int64)
+        return cls(np.array(terms, dtype=str), offsets, doc_ids, tfs,
+                   np.array(lengths, dtype=np.int32), chunk_ids.astype(np.int64))
+
+    def save(self, path: str):
+        np.savez(Path(path).with_suffix(LEXICAL_SUFFIX), terms=self.terms, offsets=self.offsets,
+                 doc_ids=self.doc_ids, tfs=self.tfs, doc_lengths=self.doc_lengths,
+                 chunk_ids=self.chunk_ids)
+
+    @classmethod
+    def load(cls, path: str) -> 'LexicalIndex':
+        with np.load(Path(path).with_suffix(LEXICAL_SUFFIX), allow_pickle=False) as data:
+            return cls(data['terms'], data['offsets'], data['doc_ids'], data['tfs'],
+                       data['doc_lengths'], data['chunk_ids'])
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        return Path(path).with_suffix(LEXICAL_SUFFIX).exists()
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    def _postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return self.doc_ids[:0], self.tfs[:0]
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        return self.doc_ids[start:end], self.tfs[start:end]
+
+    def _bm25(self, tokens: List[str]) -> np.ndarray:
+        scores = np.zeros(len(self), dtype=np.float32)
+        n = len(self)
+        for token in set(tokens):
+            docs, tfs = self._postings(token)
+            if not len(docs):
+                continue
+            idf = np.log(1.0 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = BM25_K1 * (1.0 - BM25_B + BM25_B * self.doc_lengths[docs] / max(self.avg_length, 1e-9))
+            scores[docs] += idf * tfs * (BM25_K1 + 1.0) / (tfs + norm)
+        return scores
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[int, float]]:
+        """Top k (chunk_id, BM25 score) pairs; chunks with no query term are skipped"""
+        scores = self._bm25(tokenize(query))
+        k = min(k, int(np.count_nonzero(scores)))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind='stable')]
+        return [(int(self.chunk_ids[d]), float(scores[d])) for d in top]
+
+    def scores(self, query: str, chunk_ids: Iterable[int]) -> Dict[int, float]:
+        """BM25 scores for specific chunks"""
+        scores = self._bm25(tokenize(query))
+        if self._positions is None:
+            self._positions = {int(c): i for i, c in enumerate(self.chunk_ids)}
+        return {c: float(scores[self._positions[c]]) for c in chunk_ids if c in self._positions}
+
+    def lookup(self, query: str) -> List[Tuple[int, float]]:
+        """
+        Chunks containing every query term (posting-list intersection),
+        ranked by BM25. Returns [] if any term is unknown.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        lists = [self._postings(token)[0] for token in tokens]
+        lists.sort(key=len)  # intersect from the rarest term
+        docs = lists[0]
+        for other in lists[1:]:
+            if not len(docs):
+                break
+            docs = np.intersect1d(docs, other, assume_unique=True)
+        if not len(docs):
+            return []
+        scores = self._bm25(tokens)[docs]
+        order = np.argsort(-scores, kind='stable')
+        return [(int(self.chunk_ids[docs[i]]), float(scores[i])) for i in order]
+
+def write_lexical_index(path: str) -> Optional[LexicalIndex]:
+    """
+    Build and save the BM25 index of a memory saved before it existed.
+
+    Returns None if the memory already has one. Meant for migration
+    scripts; Kre8VidMemory only builds missing indexes in memory.
+    """
+    if LexicalIndex.exists(path):
+        return None
+    _, metadata = load_metadata(path)
+    entries = list(metadata)
+    index = LexicalIndex.build((m['text'] for m in entries), (m['chunk_id'] for m in entries))
+    index.save(path)
+    return index
@@ -0,0 +1,218 @@
+"""
+Array-backed chunk metadata storage
+"""
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+from kre8vidmems.config import METADATA_FORMAT_VERSION
+from kre8vidmems.storage.chunk_store import (ChunkStore, chunk_store_dir, get_chunk_store, BLOB_FILENAME,
+                                             SPANS_SUFFIX, HASHES_SUFFIX)
+
+IDS_SUFFIX = '.ids.npy'          # int64 (N, 2): chunk_id, frame_id
+OFFSETS_SUFFIX = '.offsets.npy'  # int64 (N + 1,): byte offsets into the text blob
+TEXT_SUFFIX = '.chunks'          # UTF-8 chunk text, concatenated
+SOURCES_SUFFIX = '.sources.json' # Source file + byte range per chunk (file ingestion only)
+# With a shared ChunkStore the text lives in the store (SPANS_SUFFIX, HASHES_SUFFIX)
+# instead of .offsets.npy/.chunks
+
+class MetadataStore:
+    """
+    Chunk metadata as fixed-width id/frame arrays plus a text blob.
+
+    Saved stores are opened with mmap, so loading costs the same regardless
+    of chunk count, lookups are O(1), and pages are shared between processes
+    through the OS page cache. Text is either the memory's own blob or byte
+    ranges into the directory's shared ChunkStore.
+    """
+
+    def __init__(self):
+        self._pending: List[Dict] = []
+        self._ids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._spans: Optional[np.ndarray] = None
+        self._text = None
+        self._positions: Optional[Dict[int, int]] = None
+        self._identity = True
+
+    def append(self, chunk_id: int, frame_id: int, text: str):
+        """Add metadata for a new chunk (kept in memory until save())"""
+        self._pending.append({
+            'chunk_id': chunk_id,
+            'frame_id': frame_id,
+            'text': text
+        })
+
+    def __len__(self) -> int:
+        stored = 0 if self._ids is None else len(self._ids)
+        return stored + len(self._pending)
+
+    def __iter__(self) -> Iterator[Dict]:
+        for position in range(len(self)):
+            yield self._at(position)
+
+    def _at(self, position: int) -> Dict:
+        stored = 0 if self._ids is None else len(self._ids)
+        if position >= stored:
+            return self._pending[position - stored]
+        if self._spans is not None:
+            start, end = self._spans[position]
+        else:
+            start, end = self._offsets[position], self._offsets[position + 1]
+        return {
+            'chunk_id': int(self._ids[position, 0]),
+            'frame_id': int(self._ids[position, 1]),
+            'text': bytes(self._text[start:end]).decode('utf-8')
+        }
+
+    def _position(self, chunk_id: int) -> Optional[int]:
+        if self._identity and 0 <= chunk_id < len(self):
+            return chunk_id
+        if self._positions is None:
+            self._positions = {meta['chunk_id']: i for i, meta in enumerate(self)}
+        return self._positions.get(chunk_id)
+
+    def get(self, chunk_id: int) -> Optional[Dict]:
+        """Retrieve metadata by chunk ID"""
+        position = self._position(chunk_id)
+        if position is None:
+            return None
+        return self._at(position)
+
+    def save(self, path: str, chunk_store: Optional[ChunkStore] = None) -> Optional[Dict]:
+        """
+        Write the arrays and text next to the index at ``path``.
+
+        With a chunk_store, text goes into the shared store (only chunks it
+        doesn't already hold are written) and the store's counts are returned.
+        """
+        path = Path(path)
+        entries = list(self)
+        ids = np.array([[m['chunk_id'], m['frame_id']] for m in entries], dtype=np.int64).reshape(-1, 2)
+        stats = None
+        if chunk_store is not None:
+            _, _, stats = chunk_store.put_many([m['text'] for m in entries], str(path))
+            stale = (TEXT_SUFFIX, OFFSETS_SUFFIX)
+        else:
+            encoded = [m['text'].encode('utf-8') for m in entries]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            with open(path.with_suffix(TEXT_SUFFIX), 'wb') as f:
+                for blob in encoded:
+                    f.write(blob)
+            np.save(path.with_suffix(OFFSETS_SUFFIX), offsets)
+            stale = (SPANS_SUFFIX, HASHES_SUFFIX)
+        np.save(path.with_suffix(IDS_SUFFIX), ids)
+        # Drop the other layout's files, left by an earlier build
+        for suffix in stale:
+            if path.with_suffix(suffix).exists():
+                os.remove(path.with_suffix(suffix))
+        return stats
+
+    @classmethod
+    def load(cls, path: str) -> 'MetadataStore':
+        """Open a saved store with memory-mapped arrays"""
+        path = Path(path)
+        store = cls()
+        store._ids = np.load(path.with_suffix(IDS_SUFFIX), mmap_mode='r')
+        if path.with_suffix(SPANS_SUFFIX).exists():
+            store._spans = np.load(path.with_suffix(SPANS_SUFFIX), mmap_mode='r')
+            text_path = chunk_store_dir(path) / BLOB_FILENAME
+        else:
+            store._offsets = np.load(path.with_suffix(OFFSETS_SUFFIX), mmap_mode='r')
+            text_path = path.with_suffix(TEXT_SUFFIX)
+        if text_path.stat().st_size:
+            store._text = np.memmap(text_path, dtype=np.uint8, mode='r')
+        else:
+            store._text = b''
+        store._identity = bool(np.array_equal(store._ids[:, 0], np.arange(len(store._ids))))
+        return store
+
+    @classmethod
+    def from_entries(cls, entries: List[Dict]) -> 'MetadataStore':
+        store = cls()
+        store._pending = list(entries)
+        store._identity = all(m['chunk_id'] == i for i, m in enumerate(entries))
+        return store
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        path = Path(path)
+        if path.with_suffix(SPANS_SUFFIX).exists():
+            return path.with_suffix(IDS_SUFFIX).exists() and (chunk_store_dir(path) / BLOB_FILENAME).exists()
+        return all(path.with_suffix(s).exists() for s in (IDS_SUFFIX, OFFSETS_SUFFIX, TEXT_SUFFIX))
+
+def write_sources(path: str, sources: List[Optional[Tuple[str, int, int]]]):
+    """Save per-chunk (file, start byte, end byte) provenance; None = no source"""
+    files: Dict[str, int] = {}
+    spans = []
+    for source in sources:
+        if source is None:
+            spans.append(None)
+        else:
+            file_path, start, end = source
+            spans.append([files.setdefault(file_path, len(files)), start, end])
+    with open(Path(path).with_suffix(SOURCES_SUFFIX), 'w') as f:
+        json.dump({'files': list(files), 'spans': spans}, f)
+
+def load_sources(path: str) -> Optional[List[Optional[Dict]]]:
+    """Provenance saved by write_sources, as {'file', 'start', 'end'} dicts"""
+    sources_path = Path(path).with_suffix(SOURCES_SUFFIX)
+    if not sources_path.exists():
+        return None
+    with open(sources_path, 'r') as f:
+        data = json.load(f)
+    files = data['files']
+    return [None if span is None else {'file': files[span[0]], 'start': span[1], 'end': span[2]}
+            for span in data['spans']]
+
+def write_header(path: str, dimension: int, metric: str, count: int, backend: str = 'annoy',
+                 extra: Optional[Dict] = None):
+    """Write the small JSON .meta header atomically (extra: backend parameters)"""
+    meta_path = Path(path).with_suffix('.meta')
+    tmp_path = meta_path.with_suffix('.meta.tmp')
+    header = {
+        'format': METADATA_FORMAT_VERSION,
+        'dimension': dimension,
+        'metric': metric,
+        'count': count,
+        'backend': backend
+    }
+    header.update(extra or {})
+    with open(tmp_path, 'w') as f:
+        json.dump(header, f, indent=2)
+    os.replace(tmp_path, meta_path)
+
+def migrate_legacy_metadata(path: str, header: Dict) -> MetadataStore:
+    """
+    Convert a legacy .meta (full JSON chunk list) to the array-backed format.
+
+    The compact files are written first and the header replaced last, so an
+    interrupted migration leaves the original .meta intact. If the directory
+    is read-only the store is served from memory instead.
+    """
+    store = MetadataStore.from_entries(header['metadata'])
+    try:
+        store.save(path)
+        write_header(path, header['dimension'], header['metric'], len(store))
+    except OSError:
+        return store
+    return MetadataStore.load(path)
+
+def load_metadata(path: str) -> Tuple[Dict, MetadataStore]:
+    """Read the .meta header and open (or migrate) the chunk metadata"""
+    with open(Path(path).with_suffix('.meta'), 'r') as f:
+        header = json.load(f)
+    if 'metadata' in header:
+        # Legacy JSON chunk list - convert to the array-backed format
+        return header, migrate_legacy_metadata(path, header)
+    return header, MetadataStore.load(path)
+
+def move_to_chunk_store(path: str) -> Dict:
+    """
+    Rewrite a saved memory's chunk text into its directory's ChunkStore
+    (legacy .meta files are migrated first). Returns the store's counts.
+    """
+    _, store = load_metadata(path)
+    return MetadataStore.from_entries(list(store)).save(path, get_chunk_store(str(chunk_store_dir(path))))
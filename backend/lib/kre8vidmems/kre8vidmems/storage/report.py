@@ -0,0 +1,97 @@
+"""
+Disk usage and chunk dedup report for a memories directory
+"""
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict
+from kre8vidmems.config import CHUNK_STORE_DIRNAME, MEMORY_FILE_SUFFIXES
+from kre8vidmems.storage.chunk_store import chunk_digest, BLOB_FILENAME
+from kre8vidmems.storage.federated_index import list_memories
+from kre8vidmems.storage.metadata_store import MetadataStore, SPANS_SUFFIX, HASHES_SUFFIX
+
+def storage_report(memories_dir: str) -> Dict:
+    """
+    Disk usage and chunk dedup per memory in a directory.
+
+    For each memory: its own files on disk, the text bytes its chunks
+    reference, and the share of the chunk store attributed to it (each
+    distinct chunk's bytes split between the memories that reference it).
+    dedup_ratio = text bytes / attributed bytes. Memories still keeping
+    their own .chunks file are reported as they would be in the store.
+    The total's unreferenced_bytes are blob bytes no memory references
+    any more (left by deleted or rebuilt memories); ChunkStore.gc()
+    reclaims them.
+    """
+    memories_dir = Path(memories_dir)
+    memories = {}
+    for name in list_memories(memories_dir):
+        base = memories_dir / name
+        in_store = base.with_suffix(SPANS_SUFFIX).exists()
+        if in_store:
+            spans = np.load(base.with_suffix(SPANS_SUFFIX))
+            digests = [row.tobytes() for row in np.load(base.with_suffix(HASHES_SUFFIX))]
+            lengths = (spans[:, 1] - spans[:, 0]).tolist()
+        else:
+            # Read without migrating legacy .meta files
+            with open(base.with_suffix('.meta'), 'r') as f:
+                header = json.load(f)
+            entries = header['metadata'] if 'metadata' in header else MetadataStore.load(str(base))
+            encoded = [m['text'].encode('utf-8') for m in entries]
+            digests = [chunk_digest(data) for data in encoded]
+            lengths = [len(data) for data in encoded]
+        own_bytes = 0
+        for suffix in MEMORY_FILE_SUFFIXES + ('.mp4', '.kf.json'):
+            path = base.with_suffix(suffix)
+            if path.exists() and not path.is_symlink():  # .idx is usually a link to .ann
+                own_bytes += path.stat().st_size
+        memories[name] = {'in_store': in_store, 'own_bytes': own_bytes,
+                          'chunks': dict(zip(digests, lengths)), 'text_bytes': sum(lengths),
+                          'chunk_count': len(digests)}
+
+    references: Dict[bytes, int] = {}
+    for memory in memories.values():
+        for digest in memory['chunks']:
+            references[digest] = references.get(digest, 0) + 1
+
+    report = {}
+    for name, memory in memories.items():
+        chunks = memory['chunks']
+        attributed = sum(length / references[digest] for digest, length in chunks.items())
+        report[name] = {
+            'chunks': memory['chunk_count'],
+            'distinct_chunks': len(chunks),
+            'shared_chunks': sum(1 for digest in chunks if references[digest] > 1),
+            'text_bytes': memory['text_bytes'],
+            'attributed_bytes': int(round(attributed)),
+            'dedup_ratio': memory['text_bytes'] / attributed if attributed else 1.0,
+            'in_chunk_store': memory['in_store'],
+            'disk_bytes': memory['own_bytes'] + (int(round(attributed)) if memory['in_store'] else 0)
+        }
+
+    store_dir = memories_dir / CHUNK_STORE_DIRNAME
+    store_bytes = sum(p.stat().st_size for p in store_dir.iterdir() if p.is_file()) if store_dir.is_dir() else 0
+    distinct_lengths: Dict[bytes, int] = {}
+    stored_lengths: Dict[bytes, int] = {}
+    for memory in memories.values():
+        distinct_lengths.update(memory['chunks'])
+        if memory['in_store']:
+            stored_lengths.update(memory['chunks'])
+    blob_path = store_dir / BLOB_FILENAME
+    blob_bytes = blob_path.stat().st_size if blob_path.exists() else 0
+    text_bytes = sum(m['text_bytes'] for m in memories.values())
+    distinct_bytes = sum(distinct_lengths.values())
+    return {
+        'memories': report,
+        'total': {
+            'memories': len(report),
+            'chunks': sum(m['chunks'] for m in report.values()),
+            'distinct_chunks': len(distinct_lengths),
+            'text_bytes': text_bytes,
+            'distinct_bytes': distinct_bytes,
+            'dedup_ratio': text_bytes / distinct_bytes if distinct_bytes else 1.0,
+            'chunk_store_bytes': store_bytes,
+            'unreferenced_bytes': max(blob_bytes - sum(stored_lengths.values()), 0),
+            'disk_bytes': sum(m['own_bytes'] for m in memories.values()) + store_bytes
+        }
+    }
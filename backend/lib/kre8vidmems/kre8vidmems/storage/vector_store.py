@@ -1,90 +1,288 @@
 """
-Annoy-based vector storage and search
+Vector storage and search (Annoy or exact NumPy backend)
 """
+import os
 from annoy import AnnoyIndex
 import numpy as np
-import json
 from pathlib import Path
-from typing import List, Tuple, Optional
-from kre8vidmems.config import EMBEDDING_DIMENSION, ANNOY_METRIC, ANNOY_TREES
+from typing import Dict, List, Tuple, Optional
+from kre8vidmems.config import (EMBEDDING_DIMENSION, ANNOY_METRIC, ANNOY_TREES,
+                                VECTOR_BACKEND, VECTOR_BACKENDS, EXACT_SEARCH_MAX_CHUNKS,
+                                EXACT_SEARCH_BLOCK, INT8_RESCORE_FACTOR)
+from kre8vidmems.storage.chunk_store import ChunkStore
+from kre8vidmems.storage.metadata_store import MetadataStore, write_header, load_metadata
+
+VECTORS_SUFFIX = '.vectors.npy'  # float16 (N, dimension), L2-normalized rows
+QUANTIZED_SUFFIX = '.q8.npy'     # int8 (N, dimension), per-dimension scaled
+FULL_SUFFIX = '.full.npy'        # float32 (N, dimension), rescoring rows for int8
+INDEX_SUFFIXES = ('.ann', VECTORS_SUFFIX, QUANTIZED_SUFFIX)
+
+def index_file(path: str) -> Optional[Path]:
+    """The vector index file saved at ``path`` (.ann, .vectors.npy or .q8.npy), if any"""
+    path = Path(path)
+    for suffix in INDEX_SUFFIXES:
+        candidate = path.with_suffix(suffix)
+        if candidate.exists():
+            return candidate
+    return None
+
+def memory_name(index_path: Path) -> str:
+    """Memory name of an index file ('nfl-teams.vectors.npy' -> 'nfl-teams')"""
+    name = index_path.name
+    for suffix in INDEX_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return index_path.stem
+
+def angular_distance(similarity: np.ndarray) -> np.ndarray:
+    """Annoy's angular distance, sqrt(2 - 2 cos), so scores match either backend"""
+    return np.sqrt(np.maximum(2.0 - 2.0 * similarity, 0.0))
+
+def _normalized_matrix(batches: List[Tuple[np.ndarray, np.ndarray]], dimension: int,
+                       dtype=np.float32) -> np.ndarray:
+    """Matrix with row i = normalized vector of item i, filled one (ids, vectors) batch at a time"""
+    size = max((int(ids.max()) for ids, _ in batches if len(ids)), default=-1) + 1
+    matrix = np.zeros((size, dimension), dtype=dtype)
+    for ids, vectors in batches:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        matrix[ids] = np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+    return matrix
+
+def _normalized_query(vector: np.ndarray) -> np.ndarray:
+    query = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(query)
+    return query / norm if norm > 0 else query
+
+def _blocked_dot(matrix: np.ndarray, query: np.ndarray) -> np.ndarray:
+    """matrix @ query, upcasting EXACT_SEARCH_BLOCK rows at a time to float32"""
+    # NumPy has no fast float16/int8 matmul; blocks bound the scratch memory
+    result = np.empty(len(matrix), dtype=np.float32)
+    for start in range(0, len(matrix), EXACT_SEARCH_BLOCK):
+        block = np.asarray(matrix[start:start + EXACT_SEARCH_BLOCK], dtype=np.float32)
+        np.dot(block, query, out=result[start:start + len(block)])
+    return result
+
+def _top_k(similarity: np.ndarray, k: int) -> np.ndarray:
+    """Indices of the k largest similarities, best first"""
+    k = min(k, len(similarity))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    top = np.argpartition(-similarity, k - 1)[:k] if k < len(similarity) else np.arange(len(similarity))
+    return top[np.argsort(-similarity[top], kind='stable')]
+
+class ExactIndex:
+    """
+    Brute-force cosine search over a float16 matrix of normalized vectors.
+
+    Saved matrices are memory-mapped. Up to EXACT_SEARCH_MAX_CHUNKS rows are
+    also kept as a float32 copy in RAM, so a query is one BLAS matrix-vector
+    product (upcasting float16 per query costs more than the product itself)
+    followed by argpartition for the top k.
+    """
+
+    def __init__(self, vectors: np.ndarray):
+        self.vectors = vectors
+        self.matrix = (np.asarray(vectors, dtype=np.float32) if len(vectors) <= EXACT_SEARCH_MAX_CHUNKS
+                       else None)
+
+    @classmethod
+    def from_batches(cls, batches: List[Tuple[np.ndarray, np.ndarray]], dimension: int) -> 'ExactIndex':
+        return cls(_normalized_matrix(batches, dimension, np.float16))
+
+    def save(self, path: Path):
+        np.save(path.with_suffix(VECTORS_SUFFIX), self.vectors)
+
+    def header(self) -> Dict:
+        return {}
+
+    @classmethod
+    def load(cls, path: Path, header: Dict) -> 'ExactIndex':
+        return cls(np.load(path.with_suffix(VECTORS_SUFFIX), mmap_mode='r'))
+
+    def get_n_items(self) -> int:
+        return len(self.vectors)
+
+    def get_item_vector(self, i: int) -> List[float]:
+        return self.vectors[i].astype(np.float32).tolist()
+
+    def search(self, vector: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = _normalized_query(vector)
+        similarity = self.matrix @ query if self.matrix is not None else _blocked_dot(self.vectors, query)
+        top = _top_k(similarity, k)
+        return top, angular_distance(similarity[top])
+
+class Int8Index:
+    """
+    Scalar-quantized cosine search: int8 codes with one scale per dimension.
+
+    A vector is approximated as codes * scale, so the quantized dot product
+    is codes @ (query * scale). With rescore > 0 the top k * rescore
+    candidates are re-ranked against the float32 vectors, which stay on disk
+    (memory-mapped) and are only paged in for those rows.
+    """
+
+    def __init__(self, codes: np.ndarray, scale: np.ndarray, full: Optional[np.ndarray] = None,
+                 rescore: int = INT8_RESCORE_FACTOR):
+        self.codes = codes
+        self.scale = scale
+        self.full = full
+        self.rescore = rescore
+
+    @classmethod
+    def from_batches(cls, batches: List[Tuple[np.ndarray, np.ndarray]], dimension: int) -> 'Int8Index':
+        vectors = _normalized_matrix(batches, dimension)
+        scale = np.abs(vectors).max(axis=0) / 127.0 if len(vectors) else np.ones(dimension)
+        scale = np.where(scale > 0, scale, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(vectors / scale), -127, 127).astype(np.int8)
+        return cls(codes, scale, vectors)
+
+    def save(self, path: Path):
+        np.save(path.with_suffix(QUANTIZED_SUFFIX), self.codes)
+        np.save(path.with_suffix(FULL_SUFFIX), self.full)
+
+    def header(self) -> Dict:
+        return {'quantization': {'type': 'int8', 'scale': self.scale.tolist()}}
+
+    @classmethod
+    def load(cls, path: Path, header: Dict) -> 'Int8Index':
+        codes = np.load(path.with_suffix(QUANTIZED_SUFFIX), mmap_mode='r')
+        scale = np.array(header['quantization']['scale'], dtype=np.float32)
+        full_path = path.with_suffix(FULL_SUFFIX)
+        full = np.load(full_path, mmap_mode='r') if full_path.exists() else None
+        return cls(codes, scale, full)
+
+    def get_n_items(self) -> int:
+        return len(self.codes)
+
+    def get_item_vector(self, i: int) -> List[float]:
+        if self.full is not None:
+            return np.asarray(self.full[i], dtype=np.float32).tolist()
+        return (self.codes[i] * self.scale).tolist()
+
+    def search(self, vector: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        query = _normalized_query(vector)
+        similarity = _blocked_dot(self.codes, query * self.scale)
+        if self.rescore <= 0 or self.full is None:
+            top = _top_k(similarity, k)
+            return top, angular_distance(np.minimum(similarity[top], 1.0))
+
+        candidates = np.sort(_top_k(similarity, k * self.rescore))  # sorted for mmap locality
+        exact = np.asarray(self.full[candidates], dtype=np.float32) @ query
+        order = _top_k(exact, k)
+        return candidates[order], angular_distance(exact[order])
+
+MATRIX_INDEXES = {'exact': ExactIndex, 'int8': Int8Index}
+BACKEND_SUFFIXES = {
+    'annoy': ('.ann',),
+    'exact': (VECTORS_SUFFIX,),
+    'int8': (QUANTIZED_SUFFIX, FULL_SUFFIX)
+}
 
 class VectorStore:
-    """Memory-mapped vector index using Annoy"""
-    
-    def __init__(self, dimension: int = EMBEDDING_DIMENSION):
+    """
+    Memory-mapped vector index.
+
+    backend: 'annoy' (approximate forest), 'exact' (float16 NumPy matrix),
+    'int8' (quantized matrix, a quarter of float32 RAM) or 'auto', which uses
+    the exact backend for up to EXACT_SEARCH_MAX_CHUNKS vectors, where it is
+    both faster to build and exact.
+    """
+
+    def __init__(self, dimension: int = EMBEDDING_DIMENSION, backend: str = VECTOR_BACKEND):
+        if backend not in VECTOR_BACKENDS:
+            raise ValueError(f"Unknown vector backend '{backend}'. Use one of: {', '.join(VECTOR_BACKENDS)}")
         self.dimension = dimension
         self.metric = ANNOY_METRIC
-        self.index = AnnoyIndex(dimension, self.metric)
-        self.metadata = []  # Stores chunk IDs and text
+        self.backend = backend
+        self.index = None  # AnnoyIndex, ExactIndex or Int8Index once built/loaded
+        self._batches: List[Tuple[np.ndarray, np.ndarray]] = []  # (ids, float32 vectors) per add_items()
+        self.metadata = MetadataStore()  # Stores chunk IDs, frame IDs and text
         self.built = False
-        
+
     def add_items(self, ids: List[int], vectors: np.ndarray):
-        """Add vectors to index"""
+        """Add vectors to index (kept as one float32 array per call until build())"""
         if self.built:
             raise RuntimeError("Cannot add items to a built index")
-            
-        for idx, vector in zip(ids, vectors):
-            self.index.add_item(idx, vector)
-            
+
+        ids = np.fromiter(ids, dtype=np.int64)
+        vectors = np.array(vectors, dtype=np.float32, ndmin=2)[:len(ids)]
+        self._batches.append((ids[:len(vectors)], vectors))
+
     def build(self, n_trees: int = ANNOY_TREES):
         """Build the index"""
-        self.index.build(n_trees)
+        if self.backend == 'auto':
+            count = sum(len(ids) for ids, _ in self._batches)
+            self.backend = 'exact' if count <= EXACT_SEARCH_MAX_CHUNKS else 'annoy'
+        if self.backend in MATRIX_INDEXES:
+            self.index = MATRIX_INDEXES[self.backend].from_batches(self._batches, self.dimension)
+        else:
+            self.index = AnnoyIndex(self.dimension, self.metric)
+            for ids, vectors in self._batches:
+                for idx, vector in zip(ids.tolist(), vectors):
+                    self.index.add_item(idx, vector)
+            self.index.build(n_trees)
+        self._batches = []
         self.built = True
-        
-    def save(self, path: str):
-        """Save index and metadata"""
+
+    def save(self, path: str, chunk_store: Optional[ChunkStore] = None) -> Optional[Dict]:
+        """Save index and metadata (chunk text into chunk_store, if given; returns its counts)"""
         path = Path(path)
-        
-        # Save annoy index
-        self.index.save(str(path.with_suffix('.ann')))
-        
-        # Save metadata
-        metadata_file = {
-            'metadata': self.metadata,
-            'dimension': self.dimension,
-            'metric': self.metric
-        }
-        with open(path.with_suffix('.meta'), 'w') as f:
-            json.dump(metadata_file, f, indent=2)
-            
+
+        # Save the index, removing files left by a rebuild with another backend
+        extra = {}
+        if self.backend in MATRIX_INDEXES:
+            self.index.save(path)
+            extra = self.index.header()
+        else:
+            self.index.save(str(path.with_suffix('.ann')))
+        for backend, suffixes in BACKEND_SUFFIXES.items():
+            for suffix in suffixes:
+                if backend != self.backend and path.with_suffix(suffix).exists():
+                    os.remove(path.with_suffix(suffix))
+
+        # Save metadata arrays, then the small .meta header
+        stats = self.metadata.save(str(path), chunk_store)
+        write_header(str(path), self.dimension, self.metric, len(self.metadata), self.backend, extra)
+        return stats
+
     def load(self, path: str):
         """Load index and metadata"""
         path = Path(path)
-        
-        # Load metadata first to get dimension
-        with open(path.with_suffix('.meta'), 'r') as f:
-            metadata_file = json.load(f)
-            
+
+        # Load metadata first to get dimension (legacy .meta files are migrated)
+        metadata_file, self.metadata = load_metadata(str(path))
         self.dimension = metadata_file['dimension']
         self.metric = metadata_file['metric']
-        self.metadata = metadata_file['metadata']
-        
-        # Load annoy index
-        self.index = AnnoyIndex(self.dimension, self.metric)
-        self.index.load(str(path.with_suffix('.ann')))
+        self.backend = metadata_file.get('backend', 'annoy')
+
+        if self.backend in MATRIX_INDEXES:
+            self.index = MATRIX_INDEXES[self.backend].load(path, metadata_file)
+        else:
+            self.index = AnnoyIndex(self.dimension, self.metric)
+            self.index.load(str(path.with_suffix('.ann')))
         self.built = True
-        
+
     def search(self, vector: np.ndarray, k: int = 5) -> List[Tuple[int, float]]:
         """Search for k nearest neighbors"""
         if not self.built:
             raise RuntimeError("Index not built. Call build() first.")
-            
+
+        if self.backend in MATRIX_INDEXES:
+            ids, distances = self.index.search(vector, k)
+            return list(zip(ids.tolist(), distances.tolist()))
         ids, distances = self.index.get_nns_by_vector(
             vector, k, include_distances=True
         )
         return list(zip(ids, distances))
-        
+
+    def get_item_vector(self, chunk_id: int) -> List[float]:
+        """Stored vector for a chunk (normalized, and float16-rounded for 'exact')"""
+        return self.index.get_item_vector(chunk_id)
+
     def add_metadata(self, chunk_id: int, frame_id: int, text: str):
         """Store metadata for a chunk"""
-        self.metadata.append({
-            'chunk_id': chunk_id,
-            'frame_id': frame_id,
-            'text': text
-        })
-        
+        self.metadata.append(chunk_id, frame_id, text)
+
     def get_metadata(self, chunk_id: int) -> Optional[dict]:
-        """Retrieve metadata by chunk ID"""
-        for meta in self.metadata:
-            if meta['chunk_id'] == chunk_id:
-                return meta
-        return None
+        """Retrieve metadata by chunk ID (O(1))"""
+        return self.metadata.get(chunk_id)
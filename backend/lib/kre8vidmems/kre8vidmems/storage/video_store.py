@@ -1,20 +1,50 @@
 """
 Video storage using FFmpeg (Mac optimized)
 """
+import bisect
+import os
 import subprocess
 import cv2
 import json
 import tempfile
-import shutil
+import threading
+import time
 from pathlib import Path
-from typing import List
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 import numpy as np
 from tqdm import tqdm
-from kre8vidmems.config import get_ffmpeg_codec_args, VIDEO_FPS, FRAME_WIDTH, FRAME_HEIGHT
+from kre8vidmems.config import (get_ffmpeg_codec_args, get_gop_size, VIDEO_FPS, FRAME_WIDTH, FRAME_HEIGHT,
+                                VIDEO_PROFILE)
+
+KEYFRAMES_SUFFIX = '.kf.json'  # {'profile', 'gop', 'frames', 'keyframes'} next to the .mp4
+# OpenCV's frame seek lands on a keyframe and decodes up to the target anyway,
+# so nearby frames are cheaper to reach by decoding forward
+SEQUENTIAL_READ_GAP = 16
+
+def write_keyframe_index(video_path: str, profile: str, frame_count: int):
+    """Record the keyframe positions of a fixed-GOP video"""
+    gop = get_gop_size(profile)
+    index_path = Path(video_path).with_suffix(KEYFRAMES_SUFFIX)
+    if gop is None:
+        # Encoder-chosen keyframes aren't known; drop any index from a previous build
+        if index_path.exists():
+            os.remove(index_path)
+        return
+    with open(index_path, 'w') as f:
+        json.dump({
+            'profile': profile,
+            'gop': gop,
+            'frames': frame_count,
+            'keyframes': list(range(0, frame_count, gop))
+        }, f)
 
 class VideoStore:
     """Handles video encoding with native FFmpeg"""
     
+    _ffmpeg_verified = False
+    _keyframe_indexes: Dict[str, tuple] = {}  # video path -> (index mtime, sorted keyframes)
+    _keyframe_lock = threading.Lock()
+    
     def __init__(self):
         self.fps = VIDEO_FPS
         self.width = FRAME_WIDTH
@@ -22,9 +52,12 @@ class VideoStore:
         self._verify_ffmpeg()
         
     def _verify_ffmpeg(self):
-        """Check if FFmpeg is available"""
+        """Check if FFmpeg is available (once per process)"""
+        if VideoStore._ffmpeg_verified:
+            return
         try:
             subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True)
+            VideoStore._ffmpeg_verified = True
         except (subprocess.CalledProcessError, FileNotFoundError):
             raise RuntimeError(
                 "FFmpeg not found. Please install it:\n"
@@ -33,44 +66,78 @@ class VideoStore:
                 "  Windows: Download from ffmpeg.org"
             )
             
-    def create_video(self, frames: List[np.ndarray], output_path: str, show_progress: bool = True):
-        """Create video from frames using FFmpeg"""
+    def create_video(self, frames: Iterable[np.ndarray], output_path: str, show_progress: bool = True,
+                     total: Optional[int] = None, profile: str = VIDEO_PROFILE):
+        """
+        Create video from frames using FFmpeg.
+
+        Frames are piped as raw BGR video into FFmpeg's stdin as they arrive,
+        so ``frames`` can be a generator and nothing is buffered on disk.
+
+        profile: 'default', 'intra' or 'gop' (see VIDEO_PROFILES). The fixed
+        GOP profiles also write a keyframe index used by extract_frame.
+        """
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Create temporary directory for frames
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
+        # Build FFmpeg command
+        codec_args = get_ffmpeg_codec_args(profile)
+        cmd = [
+            'ffmpeg', '-y',
+            '-f', 'rawvideo',
+            '-pix_fmt', 'bgr24',
+            '-s', f'{self.width}x{self.height}',
+            '-framerate', str(self.fps),
+            '-i', '-',
+            *codec_args,
+            '-pix_fmt', 'yuv420p',
+            str(output_path)
+        ]
+        
+        if total is None and hasattr(frames, '__len__'):
+            total = len(frames)
+        if show_progress:
+            frames = tqdm(frames, total=total, desc="Encoding frames")
             
-            # Save frames as PNGs
-            if show_progress:
-                frame_iter = tqdm(enumerate(frames), total=len(frames), desc="Saving frames")
-            else:
-                frame_iter = enumerate(frames)
-                
-            for i, frame in frame_iter:
-                frame_path = temp_path / f"frame_{i:06d}.png"
-                cv2.imwrite(str(frame_path), frame)
+        timings = {'frames': 0.0, 'ffmpeg_write': 0.0, 'ffmpeg_finalize': 0.0}
+        frame_count = 0
+        
+        # stderr goes to a temp file so a chatty FFmpeg can't fill the pipe and stall
+        with tempfile.TemporaryFile() as stderr_file:
+            process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=stderr_file)
+            try:
+                frame_iter = iter(frames)
+                while True:
+                    t0 = time.perf_counter()
+                    frame = next(frame_iter, None)
+                    t1 = time.perf_counter()
+                    timings['frames'] += t1 - t0
+                    if frame is None:
+                        break
+                    if frame.shape[:2] != (self.height, self.width):
+                        frame = cv2.resize(frame, (self.width, self.height))
+                    process.stdin.write(np.ascontiguousarray(frame, dtype=np.uint8).tobytes())
+                    timings['ffmpeg_write'] += time.perf_counter() - t1
+                    frame_count += 1
+                process.stdin.close()
+            except BrokenPipeError:
+                pass
+            except BaseException:
+                process.kill()
+                process.wait()
+                raise
                 
-            # Build FFmpeg command
-            codec_args = get_ffmpeg_codec_args()
-            cmd = [
-                'ffmpeg', '-y',
-                '-framerate', str(self.fps),
-                '-i', str(temp_path / 'frame_%06d.png'),
-                *codec_args,
-                '-pix_fmt', 'yuv420p',
-                str(output_path)
-            ]
+            t0 = time.perf_counter()
+            returncode = process.wait()
+            timings['ffmpeg_finalize'] = time.perf_counter() - t0
             
-            # Run FFmpeg
-            if show_progress:
-                print(f"Encoding video with FFmpeg...")
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                raise RuntimeError(f"FFmpeg encoding failed:\n{result.stderr}")
+            if returncode != 0:
+                stderr_file.seek(0)
+                stderr = stderr_file.read().decode('utf-8', errors='replace')
+                raise RuntimeError(f"FFmpeg encoding failed:\n{stderr}")
                 
+        write_keyframe_index(str(output_path), profile, frame_count)
+        
         # Get file size
         size_mb = output_path.stat().st_size / (1024 * 1024)
         if show_progress:
@@ -78,16 +145,64 @@ class VideoStore:
             
         return {
             'path': str(output_path),
-            'frames': len(frames),
+            'frames': frame_count,
             'size_mb': size_mb,
-            'fps': self.fps
+            'fps': self.fps,
+            'profile': profile,
+            'timings': timings
         }
         
+    @classmethod
+    def keyframes(cls, video_path: str) -> Optional[List[int]]:
+        """Keyframe positions from the video's keyframe index (None if it has none)"""
+        index_path = Path(video_path).with_suffix(KEYFRAMES_SUFFIX)
+        try:
+            mtime = index_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+        with cls._keyframe_lock:
+            cached = cls._keyframe_indexes.get(str(video_path))
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+        with open(index_path, 'r') as f:
+            keyframes = json.load(f)['keyframes']
+        with cls._keyframe_lock:
+            cls._keyframe_indexes[str(video_path)] = (mtime, keyframes)
+        return keyframes
+        
+    def seek(self, cap: cv2.VideoCapture, video_path: str, frame_number: int,
+             position: Optional[int] = None):
+        """
+        Position ``cap`` so the next read() returns ``frame_number``.
+
+        position is the frame ``cap`` would read next, if known. Targets a
+        short way ahead of it are reached by grabbing (decoding without
+        converting) forward. Otherwise, with a keyframe index, seek to the
+        nearest keyframe at or before the frame and grab forward from there;
+        without one fall back to OpenCV's frame seek.
+        """
+        keyframes = self.keyframes(video_path)
+        keyframe = None
+        if keyframes:
+            keyframe = keyframes[max(bisect.bisect_right(keyframes, frame_number) - 1, 0)]
+        if position is not None and position <= frame_number:
+            # Same GOP (indexed) or close enough that a seek would decode as much
+            if (keyframe is not None and keyframe <= position) or frame_number - position <= SEQUENTIAL_READ_GAP:
+                for _ in range(frame_number - position):
+                    cap.grab()
+                return
+        if keyframe is None:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            return
+        cap.set(cv2.CAP_PROP_POS_FRAMES, keyframe)
+        for _ in range(frame_number - keyframe):
+            cap.grab()
+            
     def extract_frame(self, video_path: str, frame_number: int) -> np.ndarray:
         """Extract a single frame from video"""
         cap = cv2.VideoCapture(video_path)
         try:
-            cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)
+            self.seek(cap, video_path, frame_number)
             ret, frame = cap.read()
             if not ret:
                 raise ValueError(f"Could not read frame {frame_number}")
@@ -95,18 +210,25 @@ class VideoStore:
         finally:
             cap.release()
             
-    def extract_frames(self, video_path: str, frame_numbers: List[int]) -> List[np.ndarray]:
-        """Extract multiple frames from video"""
+    def iter_frames(self, video_path: str,
+                    frame_numbers: Iterable[int]) -> Iterator[Tuple[int, Optional[np.ndarray]]]:
+        """
+        Yield (frame number, frame or None) for the distinct frame numbers in
+        ascending order, all read through one capture. Nearby frames are
+        reached by decoding forward rather than seeking (see seek).
+        """
         cap = cv2.VideoCapture(video_path)
-        frames = []
-        
         try:
-            for frame_num in sorted(frame_numbers):
-                cap.set(cv2.CAP_PROP_POS_FRAMES, frame_num)
+            position = 0
+            for frame_num in sorted(set(frame_numbers)):
+                self.seek(cap, video_path, frame_num, position)
                 ret, frame = cap.read()
-                if ret:
-                    frames.append(frame)
+                yield frame_num, frame if ret else None
+                position = frame_num + 1
         finally:
             cap.release()
             
-        return frames
+    def extract_frames(self, video_path: str, frame_numbers: List[int]) -> List[np.ndarray]:
+        """Extract multiple frames from video"""
+        read = dict(self.iter_frames(video_path, frame_numbers))
+        return [read[n] for n in sorted(frame_numbers) if read[n] is not None]
@@ -33,6 +33,27 @@ def test_chunking():
         print(f"  ✗ Chunking failed: {e}")
         return False
 
+def test_file_chunking():
+    """Test streaming file chunking matches chunk_text and tracks byte offsets"""
+    print("\n✓ Testing file chunking...")
+    try:
+        from kre8vidmems.core import chunk_text, iter_file_chunks
+        
+        text = "Jokić scored 30. Über café.\r\n" * 200
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "doc.txt"
+            path.write_bytes(text.encode('utf-8'))
+            chunks = list(iter_file_chunks(str(path), chunk_size=100, overlap=10, read_size=37))
+            data = path.read_bytes()
+        
+        assert [c.text for c in chunks] == chunk_text(text, 100, 10), "Should match chunk_text"
+        assert all(data[c.start:c.end].decode('utf-8') == c.text for c in chunks), "Offsets should match"
+        print(f"  ✓ Streamed {len(chunks)} chunks with byte offsets")
+        return True
+    except Exception as e:
+        print(f"  ✗ File chunking failed: {e}")
+        return False
+
 def test_qr_codes():
     """Test QR code generation and decoding"""
     print("\n✓ Testing QR codes...")
@@ -103,6 +124,67 @@ def test_vector_store():
         traceback.print_exc()
         return False
 
+def test_metadata_store():
+    """Test array-backed metadata store and legacy .meta migration"""
+    print("\n✓ Testing metadata store...")
+    try:
+        import json
+        from kre8vidmems.storage import VectorStore
+        
+        texts = ["Lakers beat the Celtics", "Jalen Hurts threw for 300 yards", "Über café"]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            base = Path(temp_dir) / "legacy"
+            legacy = [{'chunk_id': i, 'frame_id': i, 'text': t} for i, t in enumerate(texts)]
+            with open(base.with_suffix('.meta'), 'w') as f:
+                json.dump({'metadata': legacy, 'dimension': 384, 'metric': 'angular'}, f)
+            
+            store = VectorStore(backend='annoy')
+            store.add_items([0], [[0.0] * 384])
+            store.build(n_trees=1)
+            store.index.save(str(base.with_suffix('.ann')))
+            
+            store = VectorStore()
+            store.load(str(base))
+            assert store.get_metadata(2) == legacy[2], "Lookup should match legacy entry"
+            assert store.get_metadata(5) is None, "Unknown chunk should return None"
+            with open(base.with_suffix('.meta')) as f:
+                assert json.load(f)['count'] == 3, "Header should be migrated"
+        print(f"  ✓ Metadata store lookup and migration successful")
+        return True
+    except Exception as e:
+        print(f"  ✗ Metadata store failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
+def test_chunk_store():
+    """Test content-addressed chunk storage shared between memories"""
+    print("\n✓ Testing chunk store...")
+    try:
+        from kre8vidmems.storage import MetadataStore, ChunkStore
+        
+        with tempfile.TemporaryDirectory() as temp_dir:
+            chunk_store = ChunkStore(Path(temp_dir) / ".chunk_store")
+            saved = {}
+            for name, texts in (("passing", ["Jalen Hurts: 300 yards", "Über café"]),
+                                ("fantasy", ["Jalen Hurts: 300 yards", "Saquon Barkley: 2 TD", "Über café"])):
+                store = MetadataStore.from_entries(
+                    [{'chunk_id': i, 'frame_id': i, 'text': t} for i, t in enumerate(texts)])
+                saved[name] = store.save(str(Path(temp_dir) / name), chunk_store)
+            assert saved["fantasy"]["written"] == 1, "Shared chunks should be stored once"
+            assert saved["fantasy"]["reused"] == 2, "Shared chunks should be reused"
+            assert len(chunk_store) == 3, "Store should hold each distinct chunk once"
+            
+            store = MetadataStore.load(str(Path(temp_dir) / "fantasy"))
+            assert [m['text'] for m in store] == ["Jalen Hurts: 300 yards", "Saquon Barkley: 2 TD", "Über café"]
+        print(f"  ✓ Chunk store dedup successful")
+        return True
+    except Exception as e:
+        print(f"  ✗ Chunk store failed: {e}")
+        import traceback
+        traceback.print_exc()
+        return False
+
 def test_ffmpeg():
     """Test FFmpeg availability"""
     print("\n✓ Testing FFmpeg...")
@@ -126,9 +208,12 @@ def main():
     # Run tests
     results.append(("Imports", test_imports()))
     results.append(("Chunking", test_chunking()))
+    results.append(("File Chunking", test_file_chunking()))
     results.append(("QR Codes", test_qr_codes()))
     results.append(("Vectorizer", test_vectorizer()))
     results.append(("Vector Store", test_vector_store()))
+    results.append(("Metadata Store", test_metadata_store()))
+    results.append(("Chunk Store", test_chunk_store()))
     results.append(("FFmpeg", test_ffmpeg()))
     
     # Summary
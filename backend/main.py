@@ -1,7 +1,8 @@
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
-from src.core.model import PredictionModel
+from src.core.model import PredictionModel, train_spread_model
+from src.core.training_jobs import TrainingJobManager
 from src.core.grok import GrokInsightGenerator
 from src.core.data_service import DataService
 
@@ -19,7 +20,7 @@ app.add_middleware(
 from src.services.odds_api import OddsAPIService
 from src.services.knowledge_base import KnowledgeBaseService
 from src.services.nfl_sgp_service import NFLSGPService
-from src.services.nba_sgp_service import NBASGPService
+from src.services.nba_sgp_service import NBASGPService, run_download_job, run_train_job
 from src.services.nba_service import NBADataService
 from src.services.nfl_service import NFLDataService
 from src.services.draftkings_odds_service import DraftKingsOddsService
@@ -39,17 +40,27 @@ nfl_service = NFLDataService()
 dk_odds_service = DraftKingsOddsService()
 openai_service = OpenAIInsightsService()
 nba_stats_collector = NBAStatsCollector()
+training_jobs = TrainingJobManager()
 
 class PredictionRequest(BaseModel):
     team_strength: float
     opponent_strength: float
     home_advantage: int
+    explain: bool = True  # False skips SHAP values for lower latency
 
 class PredictionResponse(BaseModel):
     predicted_spread_margin: float
     grok_insight: str
     shap_values: dict
 
+class PredictionBatchRequest(BaseModel):
+    matchups: list[PredictionRequest]
+    explain: bool = True  # False skips SHAP values for lower latency
+
+class PredictionBatchResponse(BaseModel):
+    predictions: list[PredictionResponse]
+    model_version: int
+
 class BetRequest(BaseModel):
     bet_type: str  # 'spread', 'moneyline', 'over_under', 'sgp'
     wager_amount: float
@@ -158,8 +169,15 @@ class IngestRequest(BaseModel):
 def ingest_video(request: IngestRequest):
     return kb_service.ingest_video(request.file_path)
 
+def _start_spread_training(training_data):
+    """Train the spread model in a separate process; concurrent triggers share one job"""
+    return training_jobs.submit(
+        "spread_model", train_spread_model, args=(training_data,),
+        on_success=model_service.set_model
+    )
+
 @app.post("/train")
-def train_model(background_tasks: BackgroundTasks):
+def train_model():
     # Pull data from Kre8VidMems Knowledge Base
     training_data = kb_service.get_training_data()
     
@@ -169,23 +187,37 @@ def train_model(background_tasks: BackgroundTasks):
     # In a real app, we'd merge this with the base dataset
     print(f"Found {len(training_data)} training examples from Knowledge Base.")
     
-    background_tasks.add_task(model_service.train, training_data)
-    return {"status": "training_started", "message": f"KC DaCRE8TOR is learning from {len(training_data)} past events..."}
+    job = _start_spread_training(training_data)
+    return {
+        "status": "training_started",
+        "message": f"KC DaCRE8TOR is learning from {len(training_data)} past events...",
+        "job": job
+    }
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(request: PredictionRequest):
-    if not model_service.model:
-        # Auto-train if no model exists (for demo purposes)
-        df = data_service.get_mock_training_data()
-        model_service.train(df)
-    
-    input_data = {
+def _prediction_input(request: PredictionRequest):
+    return {
         "team_strength": request.team_strength,
         "opponent_strength": request.opponent_strength,
         "home_advantage": request.home_advantage
     }
+
+def _ensure_model():
+    if model_service.model is None:
+        # Auto-train in the background if no model exists (for demo purposes)
+        job = training_jobs.active("spread_model") or _start_spread_training(data_service.get_mock_training_data())
+        raise HTTPException(
+            status_code=503,
+            detail={"message": "Model is training, retry shortly", "job": job},
+            headers={"Retry-After": "5"}
+        )
+
+@app.post("/predict", response_model=PredictionResponse)
+def predict(request: PredictionRequest):
+    _ensure_model()
     
-    prediction, shap_values = model_service.predict(input_data)
+    input_data = _prediction_input(request)
+    
+    prediction, shap_values = model_service.predict(input_data, explain=request.explain)
     
     if prediction is None:
         raise HTTPException(status_code=500, detail="Model prediction failed")
@@ -202,6 +234,48 @@ def predict(request: PredictionRequest):
         "shap_values": shap_values or {}
     }
 
+@app.post("/predict/batch", response_model=PredictionBatchResponse)
+def predict_batch(request: PredictionBatchRequest):
+    """Predict many matchups with one model call and one SHAP call."""
+    if len(request.matchups) > 1000:
+        raise HTTPException(status_code=400, detail="At most 1000 matchups per batch")
+    _ensure_model()
+
+    version = model_service.version
+    results = model_service.predict_batch(
+        [_prediction_input(matchup) for matchup in request.matchups],
+        explain=request.explain
+    )
+    if any(prediction is None for prediction, _ in results):
+        raise HTTPException(status_code=500, detail="Model prediction failed")
+
+    return {
+        "predictions": [
+            {
+                "predicted_spread_margin": prediction,
+                "grok_insight": grok_service.generate_insight(
+                    prediction, matchup.team_strength, matchup.opponent_strength
+                ),
+                "shap_values": shap_values or {}
+            }
+            for matchup, (prediction, shap_values) in zip(request.matchups, results)
+        ],
+        "model_version": version
+    }
+
+@app.get("/jobs")
+def list_training_jobs():
+    """Status of recent training and download jobs"""
+    return {"jobs": training_jobs.list()}
+
+@app.get("/jobs/{job_id}")
+def get_training_job(job_id: str):
+    """Status and progress of a training or download job"""
+    job = training_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job
+
 # ==================== KRE8VIDMEMS KNOWLEDGE BASE ENDPOINTS ====================
 
 class MemorySearchRequest(BaseModel):
@@ -209,6 +283,11 @@ class MemorySearchRequest(BaseModel):
     memories: list = []  # Empty = search all
     top_k: int = 5
 
+class MemoryBatchSearchRequest(BaseModel):
+    queries: list
+    memories: list = []  # Empty = search all
+    top_k: int = 5
+
 class YouTubeIngestRequest(BaseModel):
     url: str
     sport: str = "nfl"  # nfl or nba
@@ -246,6 +325,37 @@ def search_memories(request: MemorySearchRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
+@app.post("/memories/search/batch")
+def search_memories_batch(request: MemoryBatchSearchRequest):
+    """Run several memory searches in one call (queries embedded in one batch)."""
+    try:
+        # Validate queries
+        if not request.queries:
+            raise HTTPException(status_code=400, detail="At least one query is required")
+        if len(request.queries) > 50:
+            raise HTTPException(status_code=400, detail="At most 50 queries per batch")
+        if any(not isinstance(q, str) or len(q.strip()) == 0 for q in request.queries):
+            raise HTTPException(status_code=400, detail="Search queries cannot be empty")
+
+        # Validate top_k
+        if request.top_k <= 0 or request.top_k > 20:
+            raise HTTPException(status_code=400, detail="top_k must be between 1 and 20")
+
+        result = kb_service.search_memories_batch(
+            queries=request.queries,
+            memories=request.memories if request.memories else None,
+            top_k=request.top_k
+        )
+
+        if result.get('status') == 'error':
+            raise HTTPException(status_code=500, detail=result.get('message'))
+
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch search failed: {str(e)}")
+
 @app.get("/memories/list")
 def list_memories():
     """List all available Kre8VidMems memories."""
@@ -261,6 +371,21 @@ def list_memories():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list memories: {str(e)}")
 
+@app.get("/memories/storage")
+def memory_storage():
+    """Disk usage and chunk dedup ratio per Kre8VidMems memory."""
+    try:
+        result = kb_service.memory_storage_report()
+
+        if result.get('status') == 'error':
+            raise HTTPException(status_code=500, detail=result.get('message'))
+
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to read memory storage: {str(e)}")
+
 @app.post("/memories/create")
 def create_text_memory(request: TextMemoryRequest):
     """Create a new memory from text documents."""
@@ -619,29 +744,26 @@ class NBAParlayRequest(BaseModel):
     max_legs: int = 10
     min_ev: float = 0.05
 
-@app.post("/nba/sgp/download")
+@app.post("/nba/sgp/download", status_code=202)
 def download_nba_data(request: NBATrainRequest):
-    """Download NBA player data for a season"""
+    """Download NBA player data for a season in the background (poll /jobs/{job_id})"""
     try:
-        result = nba_sgp_service.download_season_data(request.season, request.force_download)
-        if result.get("status") == "error":
-            raise HTTPException(status_code=500, detail=result.get("message"))
-        return result
-    except HTTPException:
-        raise
+        return training_jobs.submit(
+            f"nba_download:{request.season}", run_download_job,
+            args=(nba_sgp_service.base_dir, request.season, request.force_download)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
-@app.post("/nba/sgp/train")
+@app.post("/nba/sgp/train", status_code=202)
 def train_nba_models(request: NBATrainRequest):
-    """Train NBA SGP prediction models"""
+    """Train NBA SGP prediction models in the background (poll /jobs/{job_id})"""
     try:
-        result = nba_sgp_service.train_models(request.season)
-        if result.get("status") == "error":
-            raise HTTPException(status_code=500, detail=result.get("message"))
-        return result
-    except HTTPException:
-        raise
+        return training_jobs.submit(
+            f"nba_train:{request.season}", run_train_job,
+            args=(nba_sgp_service.base_dir, request.season),
+            on_success=lambda result: nba_sgp_service.serve_models(result["version"])
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Training failed: {str(e)}")
 
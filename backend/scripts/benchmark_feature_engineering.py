@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark FeatureEngineer.engineer_features from one season to ten
+
+Replicates the NFL_Model_Data table into 1..N seasons (each copy shifted
+to a new season, stats jittered slightly) and times feature engineering
+on each. With --reference, the previous per-stat groupby/rolling lambda
+implementation is timed as well (up to --reference seasons, it is slow)
+and the rolling/season columns are compared against it.
+
+Usage:
+    python scripts/benchmark_feature_engineering.py
+    python scripts/benchmark_feature_engineering.py --seasons 1 2 5 10 --reference 2
+    python scripts/benchmark_feature_engineering.py --json report.json
+"""
+
+import io
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.core.feature_engineering import FeatureEngineer
+
+
+def load_seasons(db_path, seasons, seed=0):
+    """NFL_Model_Data with its seasons repeated until there are `seasons` of them"""
+    with sqlite3.connect(db_path) as conn:
+        base = pd.read_sql_query("SELECT * FROM NFL_Model_Data", conn)
+    base_seasons = sorted(base['season'].unique())
+    rng = np.random.default_rng(seed)
+    stat_cols = [c for c in FeatureEngineer().stat_cols if c in base.columns]
+
+    frames = []
+    for i in range(seasons):
+        source = base_seasons[i % len(base_seasons)]
+        frame = base[base['season'] == source].copy()
+        frame['season'] = base_seasons[0] + i
+        if i >= len(base_seasons):
+            frame[stat_cols] = frame[stat_cols] + rng.integers(-2, 3, size=(len(frame), len(stat_cols)))
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True)
+
+
+def reference_window_features(df, stats):
+    """Rolling and season columns as computed before vectorization"""
+    df = df.sort_values(['player_display_name', 'season', 'week']).reset_index(drop=True)
+    columns = {}
+    for window in [3, 5, 10]:
+        for stat in stats:
+            grouped = df.groupby('player_display_name')[stat]
+            columns[f'{stat}_roll{window}_mean'] = grouped.transform(
+                lambda x: x.rolling(window, min_periods=1).mean().shift(1))
+            columns[f'{stat}_roll{window}_max'] = grouped.transform(
+                lambda x: x.rolling(window, min_periods=1).max().shift(1))
+            columns[f'{stat}_roll{window}_std'] = grouped.transform(
+                lambda x: x.rolling(window, min_periods=1).std().shift(1))
+    for stat in stats:
+        columns[f'{stat}_season_mean'] = df.groupby(['player_display_name', 'season'])[stat].transform(
+            lambda x: x.expanding().mean().shift(1))
+    return pd.DataFrame(columns)
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time FeatureEngineer across growing numbers of seasons')
+    parser.add_argument('--db', default=str(backend_dir / 'data' / 'nfl_player_stats.db'))
+    parser.add_argument('--seasons', type=int, nargs='+', default=[1, 2, 5, 10])
+    parser.add_argument('--reference', type=int, default=0,
+                        help='Also time and check the old implementation up to this many seasons')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    engineer = FeatureEngineer()
+    results = []
+    print(f"{'seasons':>7} {'rows':>8} {'features s':>11} {'window s':>9} {'reference s':>12} {'max rel err':>12}")
+    for seasons in args.seasons:
+        df = load_seasons(args.db, seasons)
+        stats = [c for c in engineer.stat_cols if c in df.columns]
+        _, total_s = timed(engineer.engineer_features, df)
+        ordered = df.sort_values(['player_display_name', 'season', 'week']).reset_index(drop=True)
+        window, window_s = timed(engineer._window_features, ordered, stats, engineer.rolling_windows)
+
+        row = {'seasons': seasons, 'rows': len(df), 'features_s': total_s, 'window_s': window_s}
+        if seasons <= args.reference:
+            expected, row['reference_s'] = timed(reference_window_features, df, stats)
+            actual = pd.DataFrame(window)
+            assert list(actual.columns) == list(expected.columns), "column mismatch"
+            x = expected.to_numpy(np.float64)
+            y = actual.to_numpy(np.float64)
+            assert (np.isnan(x) == np.isnan(y)).all(), "NaN pattern mismatch"
+            row['max_rel_err'] = float(np.nanmax(np.abs(x - y) / np.maximum(np.abs(x), 1)))
+        results.append(row)
+
+        reference = f"{row['reference_s']:>12.2f}" if 'reference_s' in row else f"{'-':>12}"
+        error = f"{row['max_rel_err']:>12.1e}" if 'max_rel_err' in row else f"{'-':>12}"
+        print(f"{seasons:>7} {len(df):>8} {total_s:>11.3f} {window_s:>9.3f} {reference} {error}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
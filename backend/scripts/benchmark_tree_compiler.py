@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark compiled tree ensembles against sklearn/XGBoost/LightGBM scoring
+
+Trains each supported model type for one NFL prop on NFL_Model_Data,
+exports it with compile_model and compares single-row latency (the
+per-player request path: scaler + predict_proba on a 1xF row) and batch
+scoring, along with the largest probability difference.
+
+Usage:
+    python scripts/benchmark_tree_compiler.py
+    python scripts/benchmark_tree_compiler.py --prop anytime_td --rows 500 --json report.json
+"""
+
+import io
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import warnings
+import contextlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from sklearn.preprocessing import StandardScaler
+
+from src.core.feature_engineering import FeatureEngineer
+from src.core.model_trainer import _build_model, _model_names
+from src.core.tree_compiler import CompiledScaler, compile_model
+
+
+def median_ms(fn, repeats):
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return float(np.median(times) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Single-row latency: compiled trees vs. original models')
+    parser.add_argument('--db', default=str(backend_dir / 'data' / 'nfl_player_stats.db'))
+    parser.add_argument('--prop', default='receiving_75+')
+    parser.add_argument('--rows', type=int, default=200, help='Single-row predictions timed per model')
+    parser.add_argument('--batch', type=int, default=1500, help='Rows in the batch scoring test')
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+    warnings.filterwarnings('ignore')
+
+    engineer = FeatureEngineer()
+    with sqlite3.connect(args.db) as conn:
+        df = pd.read_sql_query("SELECT * FROM NFL_Model_Data", conn)
+    with contextlib.redirect_stdout(io.StringIO()):
+        df = engineer.create_prop_targets(engineer.engineer_features(df))
+    feature_cols = engineer.get_feature_columns(df)
+    X = df[feature_cols].fillna(0).to_numpy(dtype=np.float64)
+    y = df[args.prop].to_numpy()
+    scaler = StandardScaler().fit(X)
+    compiled_scaler = CompiledScaler.from_sklearn(scaler)
+    rng = np.random.default_rng(0)
+    rows = X[rng.integers(0, len(X), size=args.rows)]
+    batch = X[rng.integers(0, len(X), size=args.batch)]
+
+    results = []
+    print(f"{args.prop}: {len(X):,} rows, {len(feature_cols)} features\n")
+    print(f"{'model':<18} {'nodes':>8} {'1-row ms':>9} {'compiled':>9} {'speedup':>8} "
+          f"{'batch ms':>9} {'compiled':>9} {'max diff':>9}")
+    for name in _model_names():
+        if name == 'NeuralNetwork':
+            continue
+        model = _build_model(name, threads=1).fit(X, y)
+        forest = compile_model(model)
+
+        row_iter = iter(np.tile(rows, (2, 1)))
+        original_ms = median_ms(lambda: model.predict_proba(scaler.transform(next(row_iter).reshape(1, -1))),
+                                args.rows)
+        row_iter = iter(np.tile(rows, (2, 1)))
+        compiled_ms = median_ms(lambda: forest.predict_proba(compiled_scaler.transform(next(row_iter))), args.rows)
+        batch_ms = median_ms(lambda: model.predict_proba(scaler.transform(batch)), 3)
+        compiled_batch_ms = median_ms(lambda: forest.predict_proba(compiled_scaler.transform(batch)), 3)
+        max_diff = float(np.abs(model.predict_proba(scaler.transform(batch)) -
+                                forest.predict_proba(compiled_scaler.transform(batch))).max())
+
+        row = {'model': name, 'nodes': int(forest.value.size), 'row_ms': original_ms,
+               'compiled_row_ms': compiled_ms, 'batch_ms': batch_ms,
+               'compiled_batch_ms': compiled_batch_ms, 'max_diff': max_diff}
+        results.append(row)
+        print(f"{name:<18} {row['nodes']:>8} {original_ms:>9.3f} {compiled_ms:>9.3f} "
+              f"{original_ms / compiled_ms:>7.1f}x {batch_ms:>9.1f} {compiled_batch_ms:>9.1f} {max_diff:>9.1e}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'prop': args.prop, 'features': len(feature_cols), 'models': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Kre8VidMems vector backends on the real memories
+
+For every memory in data/memories, builds each backend from the stored
+vectors - Annoy forest, exact float16 matrix, int8 quantized matrix with
+and without full-precision rescoring - and compares build time, query
+latency, recall@k against float32 brute force, resident RAM and disk size.
+
+Queries (--query-source):
+  text     embed the opening words of sampled chunks with the memory model
+  vectors  midpoints of two sampled chunk vectors (no model needed)
+
+Usage:
+    python scripts/benchmark_vector_backends.py
+    python scripts/benchmark_vector_backends.py --queries 200 --top-k 10
+    python scripts/benchmark_vector_backends.py --memories 'nfl-*' --json report.json
+    python scripts/benchmark_vector_backends.py --markdown docs/VECTOR_BACKENDS_REPORT.md
+"""
+
+import sys
+import json
+import time
+import argparse
+import tempfile
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, str(backend_dir / 'lib' / 'kre8vidmems'))
+
+from annoy import AnnoyIndex
+from kre8vidmems.config import ANNOY_TREES, EXACT_SEARCH_MAX_CHUNKS, INT8_RESCORE_FACTOR
+from kre8vidmems.storage.federated_index import list_memories, match_memories
+from kre8vidmems.storage.metadata_store import MetadataStore
+from kre8vidmems.storage.vector_store import (ExactIndex, Int8Index, VECTORS_SUFFIX,
+                                              QUANTIZED_SUFFIX, FULL_SUFFIX)
+
+BACKENDS = ('annoy', 'exact', 'int8', 'int8+rescore')
+
+
+def read_memory(base: Path):
+    """Stored vectors and chunk texts, read without migrating legacy files"""
+    with open(base.with_suffix('.meta'), 'r') as f:
+        header = json.load(f)
+    if 'metadata' in header:
+        texts = [m['text'] for m in header['metadata']]
+    else:
+        texts = [m['text'] for m in MetadataStore.load(str(base))]
+
+    backend = header.get('backend', 'annoy')
+    if backend == 'exact':
+        vectors = np.load(base.with_suffix(VECTORS_SUFFIX)).astype(np.float32)
+    elif backend == 'int8':
+        vectors = np.load(base.with_suffix(FULL_SUFFIX)).astype(np.float32)
+    else:
+        source = AnnoyIndex(header['dimension'], header['metric'])
+        source.load(str(base.with_suffix('.ann')))
+        vectors = np.array([source.get_item_vector(i) for i in range(source.get_n_items())], dtype=np.float32)
+        source.unload()
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors, texts
+
+
+def make_queries(vectors, texts, n_queries, source, rng):
+    if source == 'text':
+        from kre8vidmems.core import get_vectorizer
+        sample = rng.choice(len(texts), size=min(n_queries, len(texts)), replace=False)
+        return get_vectorizer().encode_queries([' '.join(texts[i].split()[:6]) for i in sample])
+    pairs = rng.integers(0, len(vectors), size=(n_queries, 2))
+    queries = vectors[pairs[:, 0]] + vectors[pairs[:, 1]]
+    return queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+
+def timed_queries(search, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(search(query))
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies) * 1000, results
+
+
+def recall(results, truth, k):
+    return float(np.mean([len(set(r[:k]) & set(t[:k])) / len(t[:k]) for r, t in zip(results, truth) if len(t)]))
+
+
+def build_backends(vectors, base_name, temp_dir: Path, k: int):
+    """Build, save and reload every backend; returns {name: (search, build_s, ram, disk)}"""
+    built = {}
+    n, dimension = vectors.shape
+    batches = [(np.arange(n), vectors)]
+
+    start = time.perf_counter()
+    annoy = AnnoyIndex(dimension, 'angular')
+    for i, vector in enumerate(vectors):
+        annoy.add_item(i, vector)
+    annoy.build(ANNOY_TREES)
+    annoy_path = temp_dir / f"{base_name}.ann"
+    annoy.save(str(annoy_path))
+    annoy_build = time.perf_counter() - start
+    size = annoy_path.stat().st_size
+    # The forest is memory-mapped and touched across the whole file
+    built['annoy'] = (lambda q, k: annoy.get_nns_by_vector(q, k), annoy_build, size, size)
+
+    base = temp_dir / base_name
+    start = time.perf_counter()
+    ExactIndex.from_batches(batches, dimension).save(base)
+    exact_build = time.perf_counter() - start
+    exact = ExactIndex.load(base, {})
+    size = base.with_suffix(VECTORS_SUFFIX).stat().st_size
+    built['exact'] = (lambda q, k: exact.search(q, k)[0].tolist(), exact_build,
+                      exact.vectors.nbytes + (exact.matrix.nbytes if exact.matrix is not None else 0), size)
+
+    start = time.perf_counter()
+    quantized = Int8Index.from_batches(batches, dimension)
+    quantized.save(base)
+    int8_build = time.perf_counter() - start
+    header = quantized.header()
+    plain = Int8Index.load(base, header)
+    plain.rescore = 0
+    rescored = Int8Index.load(base, header)
+    rescored.rescore = INT8_RESCORE_FACTOR
+    codes_ram = plain.codes.nbytes + plain.scale.nbytes
+    disk = base.with_suffix(QUANTIZED_SUFFIX).stat().st_size
+    built['int8'] = (lambda q, k: plain.search(q, k)[0].tolist(), int8_build, codes_ram, disk)
+    # Rescoring pages in only the candidate rows of the float32 matrix
+    candidate_rows = min(n, k * INT8_RESCORE_FACTOR) * dimension * 4
+    built['int8+rescore'] = (lambda q, k: rescored.search(q, k)[0].tolist(), int8_build,
+                             codes_ram + candidate_rows, disk + base.with_suffix(FULL_SUFFIX).stat().st_size)
+    return built, annoy
+
+
+def benchmark_memory(base: Path, n_queries: int, k: int, query_source: str, rng, temp_dir: Path):
+    vectors, texts = read_memory(base)
+    n = len(vectors)
+    k = min(k, n)
+    queries = make_queries(vectors, texts, n_queries, query_source, rng)
+    truth = [np.argsort(-(vectors @ q))[:k].tolist() for q in queries]
+
+    built, annoy = build_backends(vectors, base.name, temp_dir, k)
+    row = {'memory': base.name, 'chunks': n, 'queries': len(queries), 'k': k,
+           'float32_bytes': int(vectors.nbytes)}
+    for name in BACKENDS:
+        search, build_s, ram, disk = built[name]
+        latencies, results = timed_queries(lambda q: search(q, k), queries)
+        row[name] = {
+            'build_s': build_s,
+            'ram_bytes': int(ram),
+            'disk_bytes': int(disk),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+            'recall': recall(results, truth, k)
+        }
+    annoy.unload()
+    return row
+
+
+def summarize(report, top_k):
+    weights = np.array([r['queries'] for r in report], dtype=float)
+    summary = {}
+    for backend in BACKENDS:
+        summary[backend] = {
+            'p50_ms': float(np.average([r[backend]['p50_ms'] for r in report], weights=weights)),
+            'p95_ms': float(np.average([r[backend]['p95_ms'] for r in report], weights=weights)),
+            'recall': float(np.average([r[backend]['recall'] for r in report], weights=weights)),
+            'ram_mb': sum(r[backend]['ram_bytes'] for r in report) / 1024 / 1024,
+            'disk_mb': sum(r[backend]['disk_bytes'] for r in report) / 1024 / 1024,
+            'build_s': sum(r[backend]['build_s'] for r in report)
+        }
+    summary['float32_mb'] = sum(r['float32_bytes'] for r in report) / 1024 / 1024
+    return summary
+
+
+def write_markdown(path, report, summary, args):
+    total = sum(r['chunks'] for r in report)
+    lines = [
+        "# Kre8VidMems Vector Backend Report",
+        "",
+        f"Generated {date.today().isoformat()} by `scripts/benchmark_vector_backends.py` "
+        f"on `{args.memories_dir}` ({len(report)} memories, {total} chunks).",
+        "",
+        f"- Queries: {args.queries} per memory, source `{args.query_source}`, recall@{args.top_k} "
+        "against float32 brute force",
+        f"- Annoy: {ANNOY_TREES} trees; int8 rescoring re-ranks top_k x {INT8_RESCORE_FACTOR} candidates",
+        "- RAM: bytes a loaded memory keeps resident for search (Annoy maps its whole forest; "
+        "exact adds its float32 search copy; int8+rescore adds the float32 rows of the candidates)",
+        "",
+        "## Summary",
+        "",
+        "| Backend | Recall | p50 (ms) | p95 (ms) | RAM (MB) | Disk (MB) | Build (s) |",
+        "|---|---|---|---|---|---|---|",
+    ]
+    for backend in BACKENDS:
+        s = summary[backend]
+        lines.append(f"| {backend} | {s['recall']:.3f} | {s['p50_ms']:.3f} | {s['p95_ms']:.3f} | "
+                     f"{s['ram_mb']:.2f} | {s['disk_mb']:.2f} | {s['build_s']:.2f} |")
+    lines += [
+        "",
+        f"Raw float32 vectors for comparison: {summary['float32_mb']:.2f} MB.",
+        "",
+        "## Per Memory",
+        "",
+        "| Memory | Chunks | " + " | ".join(f"{b} recall / p50" for b in BACKENDS) + " |",
+        "|---|---|" + "---|" * len(BACKENDS),
+    ]
+    for r in report:
+        cells = " | ".join(f"{r[b]['recall']:.3f} / {r[b]['p50_ms']:.3f}" for b in BACKENDS)
+        lines.append(f"| {r['memory']} | {r['chunks']} | {cells} |")
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the Kre8VidMems vector backends')
+    parser.add_argument('--memories-dir', default=str(backend_dir / 'data' / 'memories'))
+    parser.add_argument('--memories', nargs='*', help="Memory names or patterns (default: all)")
+    parser.add_argument('--queries', type=int, default=100, help='Queries per memory')
+    parser.add_argument('--top-k', type=int, default=5)
+    parser.add_argument('--query-source', choices=('text', 'vectors'), default='text')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Also write the per-memory results to this file')
+    parser.add_argument('--markdown', help='Also write a Markdown report to this file')
+    args = parser.parse_args()
+
+    memories_dir = Path(args.memories_dir)
+    names = match_memories(list_memories(memories_dir), args.memories)
+    if not names:
+        print(f"No memories found in {memories_dir}")
+        return 1
+
+    rng = np.random.default_rng(args.seed)
+    report = []
+
+    print(f"{'memory':<40} {'chunks':>6}  " + "  ".join(f"{b + ' rec/p50':>20}" for b in BACKENDS))
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for name in names:
+            row = benchmark_memory(memories_dir / name, args.queries, args.top_k,
+                                   args.query_source, rng, Path(temp_dir))
+            report.append(row)
+            print(f"{name:<40} {row['chunks']:>6}  " + "  ".join(
+                f"{row[b]['recall']:>10.3f}/{row[b]['p50_ms']:>7.3f}ms" for b in BACKENDS))
+
+    summary = summarize(report, args.top_k)
+    print()
+    for backend in BACKENDS:
+        s = summary[backend]
+        print(f"{backend:>13}: recall@{args.top_k} {s['recall']:.3f}, p50 {s['p50_ms']:.3f} ms, "
+              f"RAM {s['ram_mb']:.2f} MB, disk {s['disk_mb']:.2f} MB")
+    print(f"{'float32':>13}: {summary['float32_mb']:.2f} MB raw vectors")
+    auto_exact = sum(1 for r in report if r['chunks'] <= EXACT_SEARCH_MAX_CHUNKS)
+    print(f"\n'auto' picks exact for {auto_exact}/{len(report)} memories (threshold {EXACT_SEARCH_MAX_CHUNKS} chunks)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'memories': report, 'summary': summary}, f, indent=2)
+        print(f"Results written to {args.json}")
+    if args.markdown:
+        write_markdown(args.markdown, report, summary, args)
+        print(f"Report written to {args.markdown}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Kre8VidMems video encoding profiles for random frame access
+
+Encodes the QR frames of one memory's chunks with each profile - the
+encoder default, all-intra and a short fixed GOP with a keyframe index -
+and compares file size, encode time and per-frame random-read latency
+through VideoStore.extract_frame (a fresh capture per read, as a one-off
+lookup does) and VideoStore.extract_frames (sorted reads in one capture).
+
+Usage:
+    python scripts/benchmark_video_profiles.py
+    python scripts/benchmark_video_profiles.py --memory nba-schedule --frames 500 --reads 200
+    python scripts/benchmark_video_profiles.py --gop 4 --json report.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, str(backend_dir / 'lib' / 'kre8vidmems'))
+
+
+def read_chunks(base: Path):
+    """Chunk texts of a memory, read without migrating legacy files"""
+    from kre8vidmems.storage.metadata_store import MetadataStore
+    with open(base.with_suffix('.meta'), 'r') as f:
+        header = json.load(f)
+    if 'metadata' in header:
+        return [m['text'] for m in header['metadata']]
+    return [m['text'] for m in MetadataStore.load(str(base))]
+
+
+def percentile_ms(latencies, q):
+    return float(np.percentile(latencies, q) * 1000) if latencies else 0.0
+
+
+def benchmark_profile(store, chunks, profile, video_path, reads, batch, rng):
+    from kre8vidmems.core import iter_qr_frames
+
+    t0 = time.perf_counter()
+    store.create_video(iter_qr_frames(enumerate(chunks), total=len(chunks)), str(video_path),
+                       show_progress=False, total=len(chunks), profile=profile)
+    encode_s = time.perf_counter() - t0
+
+    targets = rng.integers(0, len(chunks), size=reads)
+    latencies = []
+    for frame_number in targets:
+        t0 = time.perf_counter()
+        frame = store.extract_frame(str(video_path), int(frame_number))
+        latencies.append(time.perf_counter() - t0)
+        if frame is None:
+            raise RuntimeError(f"{profile}: frame {frame_number} could not be read")
+
+    batch_targets = rng.choice(len(chunks), size=min(batch, len(chunks)), replace=False).tolist()
+    t0 = time.perf_counter()
+    store.extract_frames(str(video_path), batch_targets)
+    batch_s = time.perf_counter() - t0
+
+    return {
+        'profile': profile,
+        'size_kb': os.path.getsize(video_path) / 1024,
+        'encode_s': encode_s,
+        'read_p50_ms': percentile_ms(latencies, 50),
+        'read_p95_ms': percentile_ms(latencies, 95),
+        'batch_frames': len(batch_targets),
+        'batch_ms_per_frame': batch_s * 1000 / max(len(batch_targets), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the Kre8VidMems video encoding profiles')
+    parser.add_argument('--memories-dir', default=str(backend_dir / 'data' / 'memories'))
+    parser.add_argument('--memory', help='Memory whose chunks are encoded (default: the largest)')
+    parser.add_argument('--frames', type=int, default=300, help='Chunks (frames) to encode')
+    parser.add_argument('--reads', type=int, default=100, help='Random single-frame reads per profile')
+    parser.add_argument('--batch', type=int, default=20, help='Frames per extract_frames batch')
+    parser.add_argument('--gop', type=int, help="GOP size for the 'gop' profile (default: VIDEO_GOP_SIZE)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='Also write the results to this file')
+    args = parser.parse_args()
+
+    if args.gop:
+        os.environ['KRE8VIDMEMS_VIDEO_GOP_SIZE'] = str(args.gop)
+
+    from kre8vidmems import config
+    from kre8vidmems.storage import VideoStore
+    from kre8vidmems.storage.federated_index import list_memories
+
+    memories_dir = Path(args.memories_dir)
+    names = list_memories(memories_dir)
+    if args.memory:
+        names = [n for n in names if n == args.memory]
+    if not names:
+        print(f"No memory found in {memories_dir}")
+        return 1
+    corpora = {name: read_chunks(memories_dir / name) for name in names}
+    name = max(corpora, key=lambda n: len(corpora[n]))
+    chunks = corpora[name][:args.frames]
+
+    rng = np.random.default_rng(args.seed)
+    store = VideoStore()
+    results = []
+    print(f"{name}: {len(chunks)} frames, {args.reads} random reads, codec {config.get_ffmpeg_codec_args()[1]}, "
+          f"gop {config.VIDEO_GOP_SIZE}\n")
+    print(f"{'profile':<8} {'size KB':>9} {'encode s':>9} {'read p50':>10} {'read p95':>10} {'batch/frame':>12}")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for profile in config.VIDEO_PROFILES:
+            row = benchmark_profile(store, chunks, profile, Path(temp_dir) / f"{profile}.mp4",
+                                    args.reads, args.batch, rng)
+            results.append(row)
+            print(f"{profile:<8} {row['size_kb']:>9.0f} {row['encode_s']:>9.2f} "
+                  f"{row['read_p50_ms']:>8.1f}ms {row['read_p95_ms']:>8.1f}ms "
+                  f"{row['batch_ms_per_frame']:>10.1f}ms")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'memory': name, 'frames': len(chunks), 'gop': config.VIDEO_GOP_SIZE,
+                       'profiles': results}, f, indent=2)
+        print(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Build / refresh the federated Kre8VidMems index
+
+Merges the vectors of every memory in data/memories into one Annoy index
+(data/memories/federated/index.*), tagged with memory name, sport and
+category, so "search all memories" is a single ANN query.
+
+Run after creating or reloading memories (the NBA/NFL loader scripts).
+The search endpoint ignores the federated index while it is stale.
+
+Usage:
+    python scripts/build_federated_index.py           # rebuild only if stale
+    python scripts/build_federated_index.py --force   # always rebuild
+    python scripts/build_federated_index.py --check   # report staleness only
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, str(backend_dir / 'lib' / 'kre8vidmems'))
+
+from kre8vidmems.storage import FederatedIndex
+from kre8vidmems.config import FEDERATED_INDEX_DIRNAME
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the federated Kre8VidMems index')
+    parser.add_argument('--memories-dir', default=str(backend_dir / 'data' / 'memories'),
+                        help='Directory containing the per-memory .ann/.meta files')
+    parser.add_argument('--force', action='store_true', help='Rebuild even if the index is fresh')
+    parser.add_argument('--check', action='store_true', help='Only report whether a rebuild is needed')
+    args = parser.parse_args()
+
+    memories_dir = Path(args.memories_dir)
+    index_path = memories_dir / FEDERATED_INDEX_DIRNAME / 'index'
+
+    stale = True
+    if FederatedIndex.exists(str(index_path)):
+        stale = FederatedIndex.load(str(index_path), str(memories_dir)).is_stale()
+
+    if args.check:
+        print(f"Federated index {'is STALE' if stale else 'is up to date'}: {index_path}")
+        return 1 if stale else 0
+
+    if not stale and not args.force:
+        print(f"✓ Federated index is up to date: {index_path}")
+        return 0
+
+    print(f"🔗 Building federated index from {memories_dir}")
+    start = time.time()
+    fed = FederatedIndex.build(str(memories_dir), str(index_path))
+    elapsed = time.time() - start
+
+    print(f"\n✓ Federated index built in {elapsed:.1f}s")
+    print(f"   Memories: {len(fed.memories)}")
+    print(f"   Chunks: {fed.index.get_n_items()}")
+    print(f"   Index: {index_path}.ann")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
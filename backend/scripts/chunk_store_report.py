@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Report disk usage and chunk dedup for the Kre8VidMems memories
+
+Lists every memory in data/memories with its own files on disk, the chunk
+text it references and its share of the shared content-addressed chunk
+store (.chunk_store/). Memories saved before the store existed keep their
+own .chunks file; --migrate moves their text into the store and writes the
+BM25 index (.lex.npz) of memories saved before it existed, which searches
+otherwise rebuild in memory after every restart. --gc drops chunk text no
+memory references any more (left by deleted or rebuilt memories).
+
+Usage:
+    python scripts/chunk_store_report.py
+    python scripts/chunk_store_report.py --migrate
+    python scripts/chunk_store_report.py --gc
+    python scripts/chunk_store_report.py --json storage.json
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+sys.path.insert(0, str(backend_dir / 'lib' / 'kre8vidmems'))
+
+from kre8vidmems.storage.report import storage_report
+from kre8vidmems.storage.chunk_store import ChunkStore
+from kre8vidmems.config import CHUNK_STORE_DIRNAME
+from kre8vidmems.storage.federated_index import list_memories
+from kre8vidmems.storage.lexical_index import write_lexical_index
+from kre8vidmems.storage.metadata_store import move_to_chunk_store, SPANS_SUFFIX
+
+
+def kb(n):
+    return f"{n / 1024:.1f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Kre8VidMems disk usage and chunk dedup per memory')
+    parser.add_argument('--memories-dir', default=str(backend_dir / 'data' / 'memories'))
+    parser.add_argument('--migrate', action='store_true',
+                        help='Move the chunk text of memories not yet in the store into it '
+                             'and write missing BM25 indexes')
+    parser.add_argument('--gc', action='store_true',
+                        help='Rewrite the chunk store without chunks no memory references')
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args()
+
+    memories_dir = Path(args.memories_dir)
+    if args.migrate:
+        for name in list_memories(memories_dir):
+            base = memories_dir / name
+            if write_lexical_index(str(base)) is not None:
+                print(f"Indexed {name}: BM25 index written")
+            if base.with_suffix(SPANS_SUFFIX).exists():
+                continue
+            stats = move_to_chunk_store(str(base))
+            print(f"Migrated {name}: {stats['written']} new chunks, {stats['reused']} already stored")
+        print()
+    if args.gc and (memories_dir / CHUNK_STORE_DIRNAME).is_dir():
+        stats = ChunkStore(str(memories_dir / CHUNK_STORE_DIRNAME)).gc()
+        print(f"Collected chunk store: {stats['removed']} chunks removed ({kb(stats['removed_bytes'])} KB), "
+              f"{stats['chunks']} kept\n")
+
+    report = storage_report(memories_dir)
+    if not report['memories']:
+        print(f"No memories found in {memories_dir}")
+        return 1
+
+    print(f"{'memory':<45} {'chunks':>7} {'shared':>7} {'text KB':>9} {'charged KB':>11} {'dedup':>6} "
+          f"{'disk KB':>9}  store")
+    for name, row in report['memories'].items():
+        print(f"{name:<45} {row['chunks']:>7} {row['shared_chunks']:>7} {kb(row['text_bytes']):>9} "
+              f"{kb(row['attributed_bytes']):>11} {row['dedup_ratio']:>5.2f}x {kb(row['disk_bytes']):>9}  "
+              f"{'yes' if row['in_chunk_store'] else 'no'}")
+
+    total = report['total']
+    print(f"\n{total['memories']} memories, {total['chunks']} chunks ({total['distinct_chunks']} distinct)")
+    print(f"Chunk text: {kb(total['text_bytes'])} KB referenced, {kb(total['distinct_bytes'])} KB distinct "
+          f"({total['dedup_ratio']:.2f}x)")
+    print(f"Disk: {kb(total['disk_bytes'])} KB, of which chunk store {kb(total['chunk_store_bytes'])} KB "
+          f"({kb(total['unreferenced_bytes'])} KB unreferenced)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+List and promote versions in a model registry
+
+Usage:
+    python scripts/model_registry.py list --models-dir models/nfl
+    python scripts/model_registry.py promote 20251128_105035 --models-dir models/nfl
+    python scripts/model_registry.py remove 20251101_090000 --models-dir models/nba
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir))
+
+from src.core.model_registry import ModelRegistry
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and promote registered model versions')
+    parser.add_argument('command', choices=['list', 'promote', 'remove'])
+    parser.add_argument('version', nargs='?')
+    parser.add_argument('--models-dir', default=str(backend_dir / 'models' / 'nfl'))
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.models_dir)
+    if args.command != 'list':
+        if not args.version:
+            parser.error(f"{args.command} needs a version")
+        if args.command == 'promote':
+            registry.promote(args.version)
+            print(f"✅ Promoted {args.version}")
+        else:
+            registry.remove(args.version)
+            print(f"🗑️  Removed {args.version}")
+        return 0
+
+    manifest = registry.manifest()
+    if not manifest['versions']:
+        print(f"No registered versions in {registry.root}")
+        return 1
+    for version in registry.versions():
+        entry = manifest['versions'][version]
+        marker = '*' if version == manifest['current'] else ' '
+        print(f"{marker} {version}  ({entry['created_at']}, {len(entry['props'])} props)")
+        for prop_type, prop in entry['props'].items():
+            auc = prop['metrics'].get('auc')
+            auc = f"{auc:.3f}" if auc is not None else '-'
+            print(f"    {prop_type:<16} {prop['model']:<18} AUC {auc}  "
+                  f"{prop['n_features']} features [{prop['feature_schema']}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,14 +11,20 @@ from src.core.odds_calculator import (
     compare_odds
 )
 
-from src.core.correlations import CorrelationAnalyzer
+from src.core.correlations import CorrelationAnalyzer, PairCorrelationEngine, Leg
 
 from src.core.feature_engineering import FeatureEngineer
 
+from src.core.feature_store import FeatureStore
+
 from src.core.model_trainer import ModelTrainer
 
 from src.core.model_predictor import Predictor
 
+from src.core.model_registry import ModelRegistry
+
+from src.core.training_jobs import TrainingJobManager
+
 from src.core.parlay_builder import ParlayBuilder
 
 from src.core.ev_calculator import EVCalculator
@@ -30,9 +36,14 @@ __all__ = [
     'calculate_parlay_odds',
     'compare_odds',
     'CorrelationAnalyzer',
+    'PairCorrelationEngine',
+    'Leg',
     'FeatureEngineer',
+    'FeatureStore',
     'ModelTrainer',
     'Predictor',
+    'ModelRegistry',
+    'TrainingJobManager',
     'ParlayBuilder',
     'EVCalculator'
 ]
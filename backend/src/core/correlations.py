@@ -1,18 +1,238 @@
 """
 Correlation analysis for SGP predictions
 Calculates correlations between player performances
+
+Same-game pairs are built with vectorized self-merges on the game key
+(team + week/season for NFL, team + game date for NBA) instead of Python
+loops, so any position pair, stat and threshold - or a full matrix of
+legs - is computed in one pass over the frame.
 """
 
+from typing import NamedTuple, Optional, Sequence, Tuple, Union
+
 import pandas as pd
 import numpy as np
 
 
+# Column layout of each sport's player-game frame
+NFL_SCHEMA = {'team': 'recent_team', 'game': ('season', 'week'), 'position': 'position'}
+NBA_SCHEMA = {'team': 'TEAM', 'game': ('GAME_DATE',), 'position': None}
+
+
+class Leg(NamedTuple):
+    """
+    One side of a same-game pair: a player at ``position`` (None = any)
+    reaching ``threshold`` in ``stat`` (several stats are summed).
+    """
+    stat: Union[str, Tuple[str, ...]]
+    threshold: float
+    position: Optional[str] = None
+    name: Optional[str] = None
+
+    @property
+    def label(self):
+        if self.name:
+            return self.name
+        stat = '+'.join(self.stat) if isinstance(self.stat, tuple) else self.stat
+        return f"{self.position or 'ANY'}_{stat}_{self.threshold:g}+"
+
+
+def detect_schema(df):
+    """NFL_SCHEMA or NBA_SCHEMA, from the frame's columns"""
+    if 'recent_team' in df.columns:
+        return NFL_SCHEMA
+    if 'TEAM' in df.columns or 'MATCHUP' in df.columns:
+        return NBA_SCHEMA
+    raise ValueError("Unknown player data layout: expected NFL (recent_team) or NBA (MATCHUP/TEAM) columns")
+
+
+def pearson(x, y):
+    """
+    Pearson correlation from running sums (same value as np.corrcoef).
+
+    Returns 0.0 when either side has no variance or there are no pairs.
+    """
+    n = len(x)
+    if n == 0:
+        return 0.0
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    sx, sy = x.sum(), y.sum()
+    cov = n * np.dot(x, y) - sx * sy
+    var = (n * np.dot(x, x) - sx * sx) * (n * np.dot(y, y) - sy * sy)
+    return float(cov / np.sqrt(var)) if var > 0 else 0.0
+
+
+class PairCorrelationEngine:
+    """
+    Vectorized same-game pair correlations over a player-game frame.
+
+    Every row gets an integer game code for its (team, game) key once;
+    pairs for any two legs come from one merge on that code. Pairs of the
+    same leg are unordered (each teammate pair once, earlier row first),
+    pairs of different legs never pair a row with itself.
+    """
+
+    def __init__(self, df, schema=None):
+        self.schema = schema or detect_schema(df)
+        self.df = df.reset_index(drop=True)
+        team_col = self.schema['team']
+        if team_col not in self.df.columns and 'MATCHUP' in self.df.columns:
+            # NBA game logs: "LAL vs. BOS" / "LAL @ BOS" -> LAL
+            self.df[team_col] = self.df['MATCHUP'].str[:3]
+        keys = [team_col, *self.schema['game']]
+        # Rows with a missing key belong to no game (-1) and are never paired
+        game = self.df.groupby(keys, sort=False).ngroup()
+        self.game = game.fillna(-1).to_numpy(dtype=np.int64)
+        self.n_games = int(self.game.max()) + 1 if len(self.game) else 0
+
+    def values(self, stat):
+        """Stat column(s) as floats, summed if several (missing columns count as 0)"""
+        stats = stat if isinstance(stat, tuple) else (stat,)
+        total = np.zeros(len(self.df))
+        for column in stats:
+            if column in self.df.columns:
+                total += pd.to_numeric(self.df[column], errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+        return total
+
+    def mask(self, position):
+        """Rows at a position (all rows for None, or when the frame has no positions)"""
+        column = self.schema['position']
+        in_game = self.game >= 0
+        if position is None or column is None or column not in self.df.columns:
+            return in_game
+        return in_game & (self.df[column] == position).to_numpy()
+
+    def indicator(self, leg):
+        """(rows, 0/1 outcomes) for a leg"""
+        rows = np.flatnonzero(self.mask(leg.position))
+        hits = (self.values(leg.stat)[rows] >= leg.threshold).astype(np.int8)
+        return rows, hits
+
+    def _leg_frame(self, leg, index=0):
+        rows, hits = self.indicator(leg)
+        return pd.DataFrame({'game': self.game[rows], 'row': rows, 'leg': index, 'hit': hits})
+
+    def pairs(self, left, right):
+        """(left outcomes, right outcomes) for every same-game pair of players"""
+        left_frame = self._leg_frame(left)
+        right_frame = self._leg_frame(right)
+        merged = left_frame.merge(right_frame, on='game', suffixes=('_l', '_r'))
+        if left == right:
+            merged = merged[merged['row_l'] < merged['row_r']]
+        else:
+            merged = merged[merged['row_l'] != merged['row_r']]
+        return merged['hit_l'].to_numpy(), merged['hit_r'].to_numpy()
+
+    def correlation(self, left, right):
+        """Correlation of two legs over same-game pairs"""
+        x, y = self.pairs(left, right)
+        return {'correlation': pearson(x, y), 'n': len(x)}
+
+    def team_totals(self, stat):
+        """Per-game team totals of a stat, indexed by game code"""
+        in_game = self.game >= 0
+        return np.bincount(self.game[in_game], weights=self.values(stat)[in_game], minlength=self.n_games)
+
+    def team_correlation(self, leg, team_stat, team_threshold=None):
+        """
+        Correlation of a player leg with the team total of ``team_stat``
+        reaching ``team_threshold`` (None = the median team total).
+        """
+        stats = team_stat if isinstance(team_stat, tuple) else (team_stat,)
+        if not any(column in self.df.columns for column in stats):
+            return {'correlation': 0.0, 'n': 0}
+        totals = self.team_totals(team_stat)
+        if team_threshold is None:
+            team_threshold = float(np.median(totals)) if len(totals) else 0.0
+        rows, hits = self.indicator(leg)
+        team_hits = (totals[self.game[rows]] >= team_threshold).astype(np.int8)
+        return {'correlation': pearson(hits, team_hits), 'n': len(rows)}
+
+    def matrix(self, legs: Sequence[Leg]):
+        """
+        Full same-game correlation matrix of ``legs`` in one self-merge.
+
+        Returns (correlations, pair counts) as DataFrames labelled by leg.
+        Off-diagonal cells pair different players; a diagonal cell is the
+        correlation between teammates on the same leg (e.g. WR-WR).
+        """
+        k = len(legs)
+        labels = [leg.label for leg in legs]
+        long = pd.concat([self._leg_frame(leg, i) for i, leg in enumerate(legs)], ignore_index=True)
+        merged = long.merge(long, on='game', suffixes=('_a', '_b'))
+        leg_a = merged['leg_a'].to_numpy()
+        leg_b = merged['leg_b'].to_numpy()
+        row_a = merged['row_a'].to_numpy()
+        row_b = merged['row_b'].to_numpy()
+        keep = np.where(leg_a == leg_b, row_a < row_b, row_a != row_b)
+        cell = (leg_a * k + leg_b)[keep]
+        x = merged['hit_a'].to_numpy()[keep].astype(np.float64)
+        y = merged['hit_b'].to_numpy()[keep].astype(np.float64)
+
+        sums = {name: np.bincount(cell, weights=w, minlength=k * k)
+                for name, w in (('x', x), ('y', y), ('xy', x * y), ('xx', x * x), ('yy', y * y))}
+        n = np.bincount(cell, minlength=k * k).astype(np.float64)
+        cov = n * sums['xy'] - sums['x'] * sums['y']
+        var = (n * sums['xx'] - sums['x'] ** 2) * (n * sums['yy'] - sums['y'] ** 2)
+        corr = np.divide(cov, np.sqrt(np.maximum(var, 0)), out=np.zeros(k * k), where=var > 0)
+
+        correlations = pd.DataFrame(corr.reshape(k, k), index=labels, columns=labels)
+        counts = pd.DataFrame(n.reshape(k, k).astype(np.int64), index=labels, columns=labels)
+        return correlations, counts
+
+
+# Legs behind the named correlations
+QB_PASSING_250 = Leg('passing_yards', 250, 'QB')
+WR_RECEIVING_75 = Leg('receiving_yards', 75, 'WR')
+TE_RECEIVING_75 = Leg('receiving_yards', 75, 'TE')
+RB_TD = Leg(('rushing_tds', 'receiving_tds'), 1, 'RB')
+NBA_STAR_POINTS = Leg('PTS', 25, name='Star_25+_PTS')
+NBA_ASSISTS = Leg('AST', 8, name='8+_AST')
+NBA_REBOUNDS = Leg('REB', 10, name='10+_REB')
+NBA_POINTS = Leg('PTS', 20, name='20+_PTS')
+
+
 class CorrelationAnalyzer:
     """Calculate and manage SGP correlations"""
 
     def __init__(self):
         """Initialize correlation analyzer"""
         self.correlations = {}
+        self.matrix = None
+        self.pair_counts = None
+
+    def calculate_pair_correlation(self, df, left, right, schema=None):
+        """
+        Correlation between two legs over all same-game player pairs
+
+        Args:
+            df (pd.DataFrame): Player-game stats (NFL or NBA columns)
+            left (Leg): First leg, e.g. Leg('passing_yards', 250, 'QB')
+            right (Leg): Second leg
+
+        Returns:
+            dict: Correlation results with coefficient and sample size
+        """
+        return PairCorrelationEngine(df, schema).correlation(left, right)
+
+    def calculate_matrix(self, df, legs, schema=None):
+        """
+        Full correlation matrix between legs in one pass
+
+        Args:
+            df (pd.DataFrame): Player-game stats (NFL or NBA columns)
+            legs (list[Leg]): Legs to correlate
+
+        Returns:
+            pd.DataFrame: Correlations labelled by leg (pair counts in self.pair_counts)
+        """
+        self.matrix, self.pair_counts = PairCorrelationEngine(df, schema).matrix(legs)
+        return self.matrix
+
+    def _report(self, label, result):
+        print(f"  {label} correlation: {result['correlation']:.3f} (n={result['n']:,})")
+        return result
 
     def calculate_qb_wr_correlation(self, df):
         """
@@ -20,7 +240,6 @@ class CorrelationAnalyzer:
 
         Args:
             df (pd.DataFrame): Player stats with columns:
-                - player_display_name
                 - position
                 - recent_team
                 - week
@@ -32,158 +251,35 @@ class CorrelationAnalyzer:
             dict: Correlation results with coefficient and sample size
         """
         print("📊 Calculating QB-WR correlation...")
-
-        qb_wr_pairs = []
-
-        # Group by team, week, season
-        for (team, week, season), group in df.groupby(['recent_team', 'week', 'season']):
-            qbs = group[group['position'] == 'QB']
-            wrs = group[group['position'] == 'WR']
-
-            if len(qbs) > 0 and len(wrs) > 0:
-                for _, qb in qbs.iterrows():
-                    for _, wr in wrs.iterrows():
-                        qb_wr_pairs.append({
-                            'qb_passing_yards': qb.get('passing_yards', 0),
-                            'wr_receiving_yards': wr.get('receiving_yards', 0),
-                            'qb_passing_250+': 1 if qb.get('passing_yards', 0) >= 250 else 0,
-                            'wr_receiving_75+': 1 if wr.get('receiving_yards', 0) >= 75 else 0
-                        })
-
-        if not qb_wr_pairs:
+        result = self.calculate_pair_correlation(df, QB_PASSING_250, WR_RECEIVING_75)
+        if not result['n']:
             print("  ⚠️  No QB-WR pairs found")
-            return {'correlation': 0.0, 'n': 0}
-
-        pairs_df = pd.DataFrame(qb_wr_pairs)
-
-        # Calculate correlation on binary outcomes
-        correlation = np.corrcoef(
-            pairs_df['qb_passing_250+'],
-            pairs_df['wr_receiving_75+']
-        )[0, 1]
-
-        result = {
-            'correlation': correlation,
-            'n': len(pairs_df)
-        }
-
-        print(f"  QB-WR correlation: {correlation:.3f} (n={len(pairs_df):,})")
-
-        return result
+            return result
+        return self._report('QB-WR', result)
 
     def calculate_qb_te_correlation(self, df):
         """Calculate QB-TE same-team correlation"""
         print("📊 Calculating QB-TE correlation...")
-
-        qb_te_pairs = []
-
-        for (team, week, season), group in df.groupby(['recent_team', 'week', 'season']):
-            qbs = group[group['position'] == 'QB']
-            tes = group[group['position'] == 'TE']
-
-            if len(qbs) > 0 and len(tes) > 0:
-                for _, qb in qbs.iterrows():
-                    for _, te in tes.iterrows():
-                        qb_te_pairs.append({
-                            'qb_passing_250+': 1 if qb.get('passing_yards', 0) >= 250 else 0,
-                            'te_receiving_75+': 1 if te.get('receiving_yards', 0) >= 75 else 0
-                        })
-
-        if not qb_te_pairs:
-            return {'correlation': 0.0, 'n': 0}
-
-        pairs_df = pd.DataFrame(qb_te_pairs)
-        correlation = np.corrcoef(
-            pairs_df['qb_passing_250+'],
-            pairs_df['te_receiving_75+']
-        )[0, 1]
-
-        result = {
-            'correlation': correlation,
-            'n': len(pairs_df)
-        }
-
-        print(f"  QB-TE correlation: {correlation:.3f} (n={len(pairs_df):,})")
-
-        return result
+        return self._report('QB-TE', self.calculate_pair_correlation(df, QB_PASSING_250, TE_RECEIVING_75))
 
     def calculate_rb_team_tds_correlation(self, df):
         """Calculate RB touchdown correlation with team total TDs"""
         print("📊 Calculating RB-Team TDs correlation...")
-
-        rb_team_pairs = []
-
-        for (team, week, season), group in df.groupby(['recent_team', 'week', 'season']):
-            rbs = group[group['position'] == 'RB']
-
-            if 'touchdowns' in group.columns:
-                team_tds = group['touchdowns'].sum()
-
-                for _, rb in rbs.iterrows():
-                    rb_td = rb.get('rushing_tds', 0) + rb.get('receiving_tds', 0)
-                    rb_team_pairs.append({
-                        'rb_has_td': 1 if rb_td >= 1 else 0,
-                        'team_3+_tds': 1 if team_tds >= 3 else 0
-                    })
-
-        if not rb_team_pairs:
-            return {'correlation': 0.0, 'n': 0}
-
-        pairs_df = pd.DataFrame(rb_team_pairs)
-        correlation = np.corrcoef(
-            pairs_df['rb_has_td'],
-            pairs_df['team_3+_tds']
-        )[0, 1]
-
-        result = {
-            'correlation': correlation,
-            'n': len(pairs_df)
-        }
-
-        print(f"  RB-Team TDs correlation: {correlation:.3f} (n={len(pairs_df):,})")
-
-        return result
+        result = PairCorrelationEngine(df).team_correlation(RB_TD, 'touchdowns', 3)
+        return self._report('RB-Team TDs', result)
 
     def calculate_wr_wr_correlation(self, df):
         """Calculate WR-WR same-team correlation (usually negative - competing for targets)"""
         print("📊 Calculating WR-WR correlation...")
-
-        wr_wr_pairs = []
-
-        for (team, week, season), group in df.groupby(['recent_team', 'week', 'season']):
-            wrs = group[group['position'] == 'WR']
-
-            if len(wrs) >= 2:
-                wr_list = list(wrs.iterrows())
-                for i, (_, wr1) in enumerate(wr_list):
-                    for _, wr2 in wr_list[i+1:]:
-                        wr_wr_pairs.append({
-                            'wr1_receiving_75+': 1 if wr1.get('receiving_yards', 0) >= 75 else 0,
-                            'wr2_receiving_75+': 1 if wr2.get('receiving_yards', 0) >= 75 else 0
-                        })
-
-        if not wr_wr_pairs:
-            return {'correlation': 0.0, 'n': 0}
-
-        pairs_df = pd.DataFrame(wr_wr_pairs)
-        correlation = np.corrcoef(
-            pairs_df['wr1_receiving_75+'],
-            pairs_df['wr2_receiving_75+']
-        )[0, 1]
-
-        result = {
-            'correlation': correlation,
-            'n': len(pairs_df)
-        }
-
-        print(f"  WR-WR correlation: {correlation:.3f} (n={len(pairs_df):,})")
-
-        return result
+        return self._report('WR-WR', self.calculate_pair_correlation(df, WR_RECEIVING_75, WR_RECEIVING_75))
 
     def calculate_all(self, df):
         """
         Calculate all correlation types
 
+        Player-pair correlations come from one correlation matrix; NBA
+        frames (no positions) get the NBA correlation set instead.
+
         Args:
             df (pd.DataFrame): Player stats
 
@@ -192,12 +288,19 @@ class CorrelationAnalyzer:
         """
         print("\n📈 Calculating All Correlations...")
 
-        self.correlations = {
-            'QB_WR': self.calculate_qb_wr_correlation(df)['correlation'],
-            'QB_TE': self.calculate_qb_te_correlation(df)['correlation'],
-            'RB_Team_TDs': self.calculate_rb_team_tds_correlation(df)['correlation'],
-            'WR_WR': self.calculate_wr_wr_correlation(df)['correlation']
-        }
+        engine = PairCorrelationEngine(df)
+        if engine.schema is NBA_SCHEMA:
+            self.correlations = self._calculate_nba(engine)
+        else:
+            legs = [QB_PASSING_250, WR_RECEIVING_75, TE_RECEIVING_75]
+            self.matrix, self.pair_counts = engine.matrix(legs)
+            qb, wr, te = (leg.label for leg in legs)
+            self.correlations = {
+                'QB_WR': float(self.matrix.loc[qb, wr]),
+                'QB_TE': float(self.matrix.loc[qb, te]),
+                'RB_Team_TDs': engine.team_correlation(RB_TD, 'touchdowns', 3)['correlation'],
+                'WR_WR': float(self.matrix.loc[wr, wr])
+            }
 
         print("\n✅ Correlations calculated:")
         for corr_type, value in self.correlations.items():
@@ -205,6 +308,27 @@ class CorrelationAnalyzer:
 
         return self.correlations
 
+    def _calculate_nba(self, engine):
+        """NBA correlations (keys match NBASGPService's defaults)"""
+        legs = [NBA_STAR_POINTS, NBA_ASSISTS, NBA_REBOUNDS, NBA_POINTS]
+        self.matrix, self.pair_counts = engine.matrix(legs)
+
+        # Home games vs scoring at or above the player's own average
+        home_performance = 0.0
+        player_col = 'PLAYER_ID' if 'PLAYER_ID' in engine.df.columns else 'PLAYER_NAME'
+        if 'IS_HOME' in engine.df.columns and player_col in engine.df.columns:
+            points = pd.Series(engine.values('PTS'))
+            average = points.groupby(engine.df[player_col].to_numpy()).transform('mean')
+            home_performance = pearson(engine.values('IS_HOME'), (points >= average).to_numpy(dtype=np.int8))
+
+        return {
+            'Star_Team_Points': engine.team_correlation(NBA_STAR_POINTS, 'PTS')['correlation'],
+            'Guard_Team_Assists': engine.team_correlation(NBA_ASSISTS, 'AST')['correlation'],
+            'Center_Team_Rebounds': engine.team_correlation(NBA_REBOUNDS, 'REB')['correlation'],
+            'Teammate_Points': float(self.matrix.loc[NBA_POINTS.label, NBA_POINTS.label]),
+            'Home_Performance': home_performance
+        }
+
     def get_correlation(self, corr_type):
         """
         Get a specific correlation value
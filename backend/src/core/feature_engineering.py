@@ -18,6 +18,9 @@ class FeatureEngineer:
             'receiving_yards', 'receiving_tds', 'receptions', 'targets',
             'fantasy_points_ppr'
         ]
+        # Rolling windows in games; a row's features depend on at most
+        # max(rolling_windows) earlier games plus the earlier games of its season
+        self.rolling_windows = (3, 5, 10)
 
     def engineer_features(self, df):
         """
@@ -42,27 +45,10 @@ class FeatureEngineer:
         available_stats = [col for col in self.stat_cols if col in df.columns]
         print(f"  Creating features for {len(available_stats)} stats...")
 
-        # 1. ROLLING AVERAGES (multiple windows)
-        for window in [3, 5, 10]:
-            for stat in available_stats:
-                # Mean
-                df[f'{stat}_roll{window}_mean'] = df.groupby('player_display_name')[stat].transform(
-                    lambda x: x.rolling(window, min_periods=1).mean().shift(1)
-                )
-                # Max (peak performance)
-                df[f'{stat}_roll{window}_max'] = df.groupby('player_display_name')[stat].transform(
-                    lambda x: x.rolling(window, min_periods=1).max().shift(1)
-                )
-                # Std (consistency)
-                df[f'{stat}_roll{window}_std'] = df.groupby('player_display_name')[stat].transform(
-                    lambda x: x.rolling(window, min_periods=1).std().shift(1)
-                )
-
-        # 2. EXPANDING AVERAGES (season-long)
-        for stat in available_stats:
-            df[f'{stat}_season_mean'] = df.groupby(['player_display_name', 'season'])[stat].transform(
-                lambda x: x.expanding().mean().shift(1)
-            )
+        # 1. ROLLING AVERAGES (multiple windows) and 2. EXPANDING AVERAGES (season-long)
+        features = self._window_features(df, available_stats, self.rolling_windows)
+        df = pd.concat([df.drop(columns=[col for col in features if col in df.columns]),
+                        pd.DataFrame(features, index=df.index)], axis=1)
 
         # 3. TREND INDICATORS (is player improving or declining?)
         for stat in available_stats:
@@ -91,6 +77,97 @@ class FeatureEngineer:
 
         return df
 
+    def _window_features(self, df, stats, windows):
+        """
+        Rolling mean/max/std per player and expanding season means, as float32.
+
+        Same values as groupby(...).transform(lambda x: x.rolling(w,
+        min_periods=1).agg().shift(1)) for every window, stat and aggregate,
+        but computed for all stats at once: means and stds from cumulative
+        sums over each row's window within its player, maxima from one
+        running maximum over window offsets. df must be sorted by player,
+        season and week (players are contiguous).
+        """
+        columns = {}
+        if not stats:
+            return columns
+        values = df[stats].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        n = len(values)
+        idx = np.arange(n)
+
+        player = df['player_display_name'].to_numpy()
+        player_changed = self._changed(player)
+        player_start = np.maximum.accumulate(np.where(player_changed, idx, 0))
+        season_start = np.maximum.accumulate(
+            np.where(player_changed | self._changed(df['season'].to_numpy()), idx, 0))
+
+        # Centre each stat on its player's mean so sums of squares stay small
+        starts = np.flatnonzero(player_changed)
+        group = np.cumsum(player_changed) - 1
+        group_mean = np.add.reduceat(filled, starts, axis=0) / np.maximum(
+            np.add.reduceat(valid, starts, axis=0), 1)
+        centred = np.where(valid, filled - group_mean[group], 0.0)
+
+        def prefix(a):
+            out = np.zeros((n + 1,) + a.shape[1:])
+            np.cumsum(a, axis=0, out=out[1:])
+            return out
+
+        count_sum = prefix(valid.astype(np.float64))
+        raw_sum = prefix(filled)
+        centred_sum = prefix(centred)
+        square_sum = prefix(centred ** 2)
+
+        # Running max/min over the previous 1..max(windows) rows of the same player
+        running_max = np.full(values.shape, np.nan)
+        running_min = np.full(values.shape, np.nan)
+        window_max, window_min = {}, {}
+        for offset in range(1, max(windows) + 1):
+            source = np.maximum(idx - offset, 0)
+            shifted = np.where((idx - offset >= player_start)[:, None] & valid[source], values[source], np.nan)
+            running_max = np.fmax(running_max, shifted)
+            running_min = np.fmin(running_min, shifted)
+            if offset in windows:
+                window_max[offset], window_min[offset] = running_max.copy(), running_min.copy()
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for window in windows:
+                # Rows [begin, i): the rolling window ending one row earlier
+                begin = np.maximum(idx - window, player_start)
+                count = count_sum[idx] - count_sum[begin]
+                mean = (raw_sum[idx] - raw_sum[begin]) / count
+                total = centred_sum[idx] - centred_sum[begin]
+                var = (square_sum[idx] - square_sum[begin] - total ** 2 / count) / (count - 1)
+                # Constant windows have exactly zero spread (as in pandas)
+                var = np.where(window_max[window] == window_min[window], 0.0, np.maximum(var, 0.0))
+                var = np.where(count < 2, np.nan, var)
+                std = np.sqrt(var)
+                for j, stat in enumerate(stats):
+                    columns[f'{stat}_roll{window}_mean'] = mean[:, j]
+                    columns[f'{stat}_roll{window}_max'] = window_max[window][:, j]
+                    columns[f'{stat}_roll{window}_std'] = std[:, j]
+
+            count = count_sum[idx] - count_sum[season_start]
+            season_mean = (raw_sum[idx] - raw_sum[season_start]) / count
+            for j, stat in enumerate(stats):
+                columns[f'{stat}_season_mean'] = season_mean[:, j]
+
+        no_player = pd.isna(player)  # groupby leaves rows without a key as NaN
+        for name, column in columns.items():
+            column = column.astype(np.float32)
+            column[no_player] = np.nan
+            columns[name] = column
+        return columns
+
+    @staticmethod
+    def _changed(keys):
+        """True where a row starts a new run of keys"""
+        changed = np.ones(len(keys), dtype=bool)
+        changed[1:] = keys[1:] != keys[:-1]
+        return changed
+
     def _clean_features(self, df):
         """Clean NaN and infinity values"""
         # Fill NaN with 0
@@ -0,0 +1,245 @@
+"""
+Persisted feature store for engineered player features
+Features are computed once per player game and served from SQLite
+"""
+
+import json
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.core.feature_engineering import FeatureEngineer
+
+
+class FeatureStore:
+    """Engineered features keyed by player and game, updated incrementally"""
+
+    KEY_COLS = ['player_display_name', 'season', 'week']
+
+    def __init__(self, db_path, feature_engineer=None):
+        """
+        Initialize feature store
+
+        Args:
+            db_path (str): SQLite file holding the features
+            feature_engineer (FeatureEngineer, optional): Engineer used for new games
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.feature_engineer = feature_engineer or FeatureEngineer()
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS features (
+                    player TEXT NOT NULL,
+                    season INTEGER NOT NULL,
+                    week INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (player, season, week)
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS watermarks (
+                    player TEXT PRIMARY KEY,
+                    season INTEGER NOT NULL,
+                    week INTEGER NOT NULL,
+                    games INTEGER NOT NULL,
+                    updated_at TEXT NOT NULL
+                ) WITHOUT ROWID;
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                );
+            """)
+            row = conn.execute("SELECT value FROM meta WHERE key = 'columns'").fetchone()
+        finally:
+            conn.close()
+
+        # Feature column names, in the order vectors are stored
+        self.columns = json.loads(row[0]) if row else []
+
+    def update(self, df):
+        """
+        Engineer and store features for games newer than each player's watermark
+
+        df holds every known game of the players in it (raw stats plus
+        player_display_name, season and week). Only games after a player's
+        watermark are stored; they are engineered from the few earlier games
+        their features depend on (max(rolling_windows) games and the rest
+        of their season), not from the player's whole history. A player whose
+        stored games no longer match df is rebuilt from scratch.
+
+        Args:
+            df (pd.DataFrame): Raw player games
+
+        Returns:
+            dict: players updated, games added, players rebuilt
+        """
+        df = df[df['player_display_name'].notna()].copy()
+        df['player_display_name'] = df['player_display_name'].astype(str)
+        df = df.sort_values(self.KEY_COLS).reset_index(drop=True)
+        games = df
+        stats = {'players': 0, 'new_games': 0, 'rebuilt_players': 0}
+        if df.empty:
+            return stats
+
+        players = df['player_display_name']
+        position = df.groupby(players).cumcount()
+        season_start = position - df.groupby([players, df['season']]).cumcount()
+
+        # Games at or before each player's watermark must be exactly the stored ones
+        watermarks = self.watermarks()
+        mark = watermarks.reindex(players.to_numpy())
+        mark_season = mark['season'].to_numpy()
+        mark_week = mark['week'].to_numpy()
+        seen = ((df['season'].to_numpy() < mark_season) |
+                ((df['season'].to_numpy() == mark_season) & (df['week'].to_numpy() <= mark_week)))
+        last_seen = df[seen].groupby(players[seen])[['season', 'week']].last()
+        summary = pd.DataFrame({
+            'games': players.value_counts(),
+            'seen': pd.Series(seen).groupby(players).sum()
+        })
+        summary = summary.join(watermarks, rsuffix='_stored').join(last_seen, rsuffix='_seen')
+        summary['games_stored'] = summary['games_stored'].fillna(0).astype(int)
+        consistent = (summary['seen'] == summary['games_stored']) & (
+            (summary['games_stored'] == 0) |
+            ((summary['season_seen'] == summary['season']) & (summary['week_seen'] == summary['week'])))
+        summary['first_new'] = np.where(consistent, summary['games_stored'], 0)
+        rebuilt = summary.index[~consistent & (summary['games_stored'] > 0)]
+        summary = summary[summary['games'] > summary['first_new']]
+        if summary.empty:
+            return stats
+
+        # Context: the earlier games the new games' features look back on
+        df['_game_index'] = position
+        df['_first_new'] = players.map(summary['first_new'])
+        df = df[df['_first_new'].notna()]
+        first_rows = df[df['_game_index'] == df['_first_new']]
+        context_start = np.minimum(
+            (first_rows['_game_index'] - max(self.feature_engineer.rolling_windows)).clip(lower=0),
+            season_start[first_rows.index])
+        df['_context_start'] = df['player_display_name'].map(
+            pd.Series(context_start.to_numpy(), index=first_rows['player_display_name'].to_numpy()))
+        context = df[df['_game_index'] >= df['_context_start']]
+
+        engineered = self.feature_engineer.engineer_features(context)
+        # games_played counts from the player's first game, not the context's
+        engineered['games_played'] += engineered['_context_start']
+        engineered = engineered[engineered['_game_index'] >= engineered['_first_new']]
+        columns = self.feature_engineer.get_feature_columns(
+            engineered.drop(columns=['_game_index', '_context_start', '_first_new']))
+
+        if self.columns and columns != self.columns:
+            # Feature definitions changed: every stored vector is stale
+            self.clear()
+            return self.update(games)
+
+        vectors = engineered[columns].to_numpy(dtype=np.float32)
+        keys = engineered[self.KEY_COLS]
+        rows = [(player, int(season), int(week), vector.tobytes())
+                for (player, season, week), vector in zip(keys.itertuples(index=False), vectors)]
+        ends = keys.groupby('player_display_name').last()
+        now = datetime.now().isoformat()
+        marks = [(player, int(row.season), int(row.week), int(summary.at[player, 'games']), now)
+                 for player, row in ends.iterrows()]
+
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany("DELETE FROM features WHERE player = ?", [(p,) for p in rebuilt])
+            conn.executemany("INSERT OR REPLACE INTO features VALUES (?, ?, ?, ?)", rows)
+            conn.executemany("INSERT OR REPLACE INTO watermarks VALUES (?, ?, ?, ?, ?)", marks)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('columns', ?)", (json.dumps(columns),))
+            conn.commit()
+        finally:
+            conn.close()
+        self.columns = columns
+
+        stats.update(players=len(marks), new_games=len(rows), rebuilt_players=len(rebuilt))
+        return stats
+
+    def latest(self, player):
+        """
+        Feature vector of a player's most recent stored game (one indexed read)
+
+        Args:
+            player (str): Player key (player_display_name)
+
+        Returns:
+            pd.Series or None: Features named (player, season, week)
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            row = conn.execute(
+                "SELECT season, week, vector FROM features WHERE player = ? "
+                "ORDER BY season DESC, week DESC LIMIT 1", (str(player),)).fetchone()
+        finally:
+            conn.close()
+        if row is None:
+            return None
+        return pd.Series(np.frombuffer(row[2], dtype=np.float32), index=self.columns,
+                         name=(str(player), row[0], row[1]))
+
+    def load(self):
+        """
+        All stored features
+
+        Returns:
+            pd.DataFrame: KEY_COLS plus the feature columns
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            rows = conn.execute("SELECT player, season, week, vector FROM features").fetchall()
+        finally:
+            conn.close()
+        vectors = np.frombuffer(b''.join(r[3] for r in rows), dtype=np.float32).reshape(len(rows), len(self.columns))
+        df = pd.DataFrame(vectors, columns=self.columns)
+        keys = pd.DataFrame([r[:3] for r in rows], columns=self.KEY_COLS)
+        return pd.concat([keys, df], axis=1)
+
+    def join(self, df):
+        """
+        Raw games with their stored features, cleaned as engineer_features does
+
+        Args:
+            df (pd.DataFrame): Raw player games (as passed to update)
+
+        Returns:
+            pd.DataFrame: df sorted by player and game, feature columns added
+        """
+        df = df.copy()
+        df['player_display_name'] = df['player_display_name'].astype(str)
+        features = self.load()
+        features = features.drop(columns=[c for c in features.columns
+                                          if c in df.columns and c not in self.KEY_COLS])
+        df = df.merge(features, on=self.KEY_COLS, how='left')
+        df = df.sort_values(self.KEY_COLS).reset_index(drop=True)
+        return self.feature_engineer._clean_features(df)
+
+    def watermarks(self):
+        """
+        Last stored game per player
+
+        Returns:
+            pd.DataFrame: season, week, games and updated_at indexed by player
+        """
+        conn = sqlite3.connect(self.db_path)
+        try:
+            df = pd.read_sql_query("SELECT * FROM watermarks", conn)
+        finally:
+            conn.close()
+        return df.set_index('player')[['season', 'week', 'games', 'updated_at']]
+
+    def clear(self):
+        """Drop every stored feature and watermark"""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM features")
+            conn.execute("DELETE FROM watermarks")
+            conn.execute("DELETE FROM meta")
+            conn.commit()
+        finally:
+            conn.close()
+        self.columns = []
@@ -1,4 +1,7 @@
+import threading
+
 import xgboost as xgb
+import numpy as np
 import pandas as pd
 import joblib
 import os
@@ -6,47 +9,128 @@ from sklearn.model_selection import train_test_split
 
 MODEL_PATH = "xgboost_model.pkl"
 
+def fit_spread_model(df: pd.DataFrame):
+    X = df.drop('spread_margin', axis=1)
+    y = df['spread_margin']
+    
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    
+    model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, max_depth=3)
+    model.fit(X_train, y_train)
+    return model
+
+def save_model(model, path=MODEL_PATH):
+    """Write to a temp file and rename over the model, so readers never see a partial file"""
+    tmp_path = f"{path}.tmp"
+    joblib.dump(model, tmp_path)
+    os.replace(tmp_path, path)
+
+def train_spread_model(df: pd.DataFrame, report=None):
+    """Training job for TrainingJobManager: fit and save; the parent swaps the returned model in"""
+    if not isinstance(df, pd.DataFrame):
+        df = pd.DataFrame(df)
+    if report:
+        report('training', 0.1, f"Fitting on {len(df)} rows")
+    model = fit_spread_model(df)
+    if report:
+        report('saving', 0.9)
+    save_model(model)
+    return model
+
 class PredictionModel:
     def __init__(self):
-        self.model = None
+        # (model, version) swapped as one tuple so a prediction never mixes the two
+        self._serving = (None, 0)
+        # (model, explainer): rebuilt only when the model object changes
+        self._explainer = (None, None)
+        self._explainer_lock = threading.Lock()
         self.load_model()
 
+    @property
+    def model(self):
+        return self._serving[0]
+
+    @property
+    def version(self):
+        return self._serving[1]
+
     def load_model(self):
         if os.path.exists(MODEL_PATH):
-            self.model = joblib.load(MODEL_PATH)
+            self.set_model(joblib.load(MODEL_PATH))
             print("Model loaded successfully.")
         else:
             print("No model found. Please train the model first.")
 
+    def set_model(self, model):
+        """
+        Atomically serve a new model
+
+        Predictions already running finish on the model they started with;
+        its SHAP explainer is built on the next explained prediction.
+        """
+        self._serving = (model, self.version + 1)
+
     def train(self, df: pd.DataFrame):
-        X = df.drop('spread_margin', axis=1)
-        y = df['spread_margin']
-        
-        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-        
-        self.model = xgb.XGBRegressor(objective='reg:squarederror', n_estimators=100, max_depth=3)
-        self.model.fit(X_train, y_train)
-        
-        joblib.dump(self.model, MODEL_PATH)
+        model = fit_spread_model(df)
+        save_model(model)
+        self.set_model(model)
         print("Model trained and saved.")
         return {"status": "success", "message": "Model trained successfully"}
 
-    def predict(self, input_data: dict):
-        if not self.model:
-            return None, None
-        
-        df = pd.DataFrame([input_data])
-        prediction = self.model.predict(df)[0]
-        
-        # SHAP Explainability
+    def _get_explainer(self, model):
+        """TreeExplainer for this model, built once per model version"""
+        cached_model, explainer = self._explainer
+        if cached_model is model:
+            return explainer
+        with self._explainer_lock:
+            cached_model, explainer = self._explainer
+            if cached_model is not model:
+                import shap
+                explainer = shap.TreeExplainer(model)
+                self._explainer = (model, explainer)
+            return explainer
+
+    def _shap_values(self, model, df):
+        """SHAP values for every row of df, shape (rows, features)"""
         try:
-            import shap
-            explainer = shap.TreeExplainer(self.model)
-            shap_values = explainer.shap_values(df)
-            # Return the first (and only) row of SHAP values as a dict
-            shap_dict = dict(zip(df.columns, shap_values[0]))
-        except Exception as e:
-            print(f"SHAP Error: {e}")
-            shap_dict = {}
-
-        return float(prediction), shap_dict
+            return np.asarray(self._get_explainer(model).shap_values(df))
+        except ImportError:
+            # Same TreeSHAP values from XGBoost itself; the last column is the bias term
+            contribs = model.get_booster().predict(xgb.DMatrix(df), pred_contribs=True)
+            return contribs[:, :-1]
+
+    def predict(self, input_data: dict, explain: bool = True):
+        prediction, shap_dict = self.predict_batch([input_data], explain=explain)[0]
+        return prediction, shap_dict
+
+    def predict_batch(self, records: list, explain: bool = True):
+        """
+        Predict many inputs with one model call (and one SHAP call)
+
+        Args:
+            records (list): Input dicts with the training feature columns
+            explain (bool): Compute SHAP values; skip for lower latency
+
+        Returns:
+            list: (prediction, shap_dict) per record; shap_dict is {} when not explained.
+                  [(None, None), ...] if no model is loaded
+        """
+        model = self.model
+        if model is None:
+            return [(None, None)] * len(records)
+        if not records:
+            return []
+
+        df = pd.DataFrame(records)
+        predictions = model.predict(df)
+
+        shap_dicts = [{} for _ in records]
+        if explain:
+            # SHAP Explainability
+            try:
+                shap_values = self._shap_values(model, df)
+                shap_dicts = [dict(zip(df.columns, map(float, row))) for row in shap_values]
+            except Exception as e:
+                print(f"SHAP Error: {e}")
+
+        return [(float(prediction), shap_dict) for prediction, shap_dict in zip(predictions, shap_dicts)]
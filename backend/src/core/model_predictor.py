@@ -6,18 +6,23 @@ import pandas as pd
 import numpy as np
 import pickle
 import glob
+import threading
 from pathlib import Path
 
+from src.core.model_registry import ModelRegistry
+
 
 class Predictor:
     """Load trained models and make predictions"""
 
-    def __init__(self, models_dir=None):
+    def __init__(self, models_dir=None, compiled=True):
         """
         Initialize predictor
 
         Args:
             models_dir (str, optional): Directory with saved models
+            compiled (bool): Score registry models exported as tree node
+                arrays with NumPy (fast single rows) instead of unpickling them
         """
         if models_dir is None:
             self.models_dir = Path.cwd() / 'models'
@@ -26,11 +31,25 @@ class Predictor:
 
         self.models = {}
         self.correlations = {}
+        self.registry = ModelRegistry(self.models_dir)
+        self.compiled = compiled
+        self.version = None
+        self._swap_lock = threading.Lock()
 
     def load_latest_models(self):
-        """Load the most recently trained models"""
+        """
+        Load the models currently promoted in the registry
+
+        Props are loaded lazily on first use. Directories saved before the
+        registry existed fall back to the newest sgp_*.pkl files.
+        """
         print("📦 Loading trained models...")
 
+        if self.registry.exists():
+            self._load_registry_version()
+            print(f"  Serving registry version {self.version}: {len(self.models)} props (loaded on first use)")
+            return True
+
         model_files = list(self.models_dir.glob('sgp_*.pkl'))
 
         if not model_files:
@@ -79,6 +98,45 @@ class Predictor:
         print(f"\n  Total models loaded: {len(self.models)}")
         return True
 
+    def _load_registry_version(self, version=None, warm=False):
+        """Swap in a registry version (lazy; in-flight calls keep the old one)"""
+        manifest = self.registry.manifest()
+        version = version or manifest['current']
+        models = self.registry.load(version, compiled=self.compiled)
+        if warm:
+            for prop_type in models:
+                models[prop_type]
+        self.correlations = manifest['versions'].get(version, {}).get('correlations', {})
+        self.models = models
+        self.version = version
+
+    def _sync_registry(self):
+        """Follow a version promoted since the models were loaded"""
+        if self.registry.exists() and self.registry.current_version() != self.version:
+            # While another thread swaps versions, keep predicting with the current models
+            if self._swap_lock.acquire(blocking=False):
+                try:
+                    if self.registry.current_version() != self.version:
+                        self._load_registry_version()
+                finally:
+                    self._swap_lock.release()
+
+    def promote(self, version, warm=True):
+        """
+        Serve a registered version and make it the registry's current one
+
+        Every prop is loaded before the swap, so the first predictions on
+        the new version do not pay for loading it; predictions made during
+        the swap use the previous version.
+
+        Args:
+            version (str): Registered version, e.g. from ModelTrainer.save_models(promote=False)
+            warm (bool): Load every prop's artifact before swapping
+        """
+        with self._swap_lock:
+            self._load_registry_version(version, warm=warm)
+            self.registry.promote(version)
+
     def predict_single_player(self, player_features):
         """
         Make predictions for a single player
@@ -92,6 +150,7 @@ class Predictor:
         if isinstance(player_features, dict):
             player_features = pd.Series(player_features)
 
+        self._sync_registry()
         predictions = {}
 
         for prop_type, model_data in self.models.items():
@@ -127,21 +186,57 @@ class Predictor:
         """
         Make predictions for entire dataframe of players
 
+        Each prop's features are taken from the frame as one matrix, scaled
+        once and scored with a single predict_proba call; results are the
+        same as predict_single_player on each row.
+
         Args:
             df (pd.DataFrame): Player features
 
         Returns:
             dict: {player_name: predictions}
         """
-        all_predictions = {}
+        self._sync_registry()
+        probabilities = {}
+        for prop_type, model_data in self.models.items():
+            feature_cols = model_data['feature_cols']
+            available_features = [col for col in feature_cols if col in df.columns]
 
-        for idx, row in df.iterrows():
-            player_name = row.get('player_display_name', f'Player_{idx}')
-            predictions = self.predict_single_player(row)
+            if len(available_features) < len(feature_cols) * 0.8:  # Need at least 80% of features
+                probabilities[prop_type] = None
+                continue
+
+            if df.empty:
+                probabilities[prop_type] = np.empty(0)
+                continue
+
+            X_scaled = model_data['scaler'].transform(df[available_features].to_numpy())
+            probabilities[prop_type] = model_data['best_model'].predict_proba(X_scaled)[:, 1]
+
+        all_predictions = {}
+        missing = [None] * len(df)
+        names = (df['player_display_name'] if 'player_display_name' in df.columns
+                 else [f'Player_{idx}' for idx in df.index])
+        positions = df['position'] if 'position' in df.columns else missing
+        teams = df['recent_team'] if 'recent_team' in df.columns else missing
+
+        for i, (player_name, position, team) in enumerate(zip(names, positions, teams)):
+            predictions = {}
+            for prop_type, probs in probabilities.items():
+                if probs is None:
+                    predictions[prop_type] = {
+                        'probability': 0.0,
+                        'missing_features': True
+                    }
+                else:
+                    predictions[prop_type] = {
+                        'probability': probs[i],
+                        'missing_features': False
+                    }
 
             all_predictions[player_name] = {
-                'position': row.get('position'),
-                'team': row.get('recent_team'),
+                'position': position,
+                'team': team,
                 'predictions': predictions
             }
 
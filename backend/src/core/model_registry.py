@@ -0,0 +1,245 @@
+"""
+Model registry - versioned serving models with a manifest
+Only each prop's best model and scaler are stored, loaded lazily per prop;
+tree ensembles are also exported as NumPy node arrays served without sklearn
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+from src.core.tree_compiler import CompiledForest, CompiledScaler, compile_model
+
+
+def feature_schema_hash(feature_cols):
+    """Short hash of the ordered feature columns a model expects"""
+    return hashlib.sha256(json.dumps(list(feature_cols)).encode('utf-8')).hexdigest()[:16]
+
+
+class ModelRegistry:
+    """Versioned model store: <models_dir>/registry/manifest.json plus one directory per version"""
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, models_dir):
+        """
+        Initialize registry
+
+        Args:
+            models_dir (str): Models directory; the registry lives in its registry/ subdirectory
+        """
+        self.root = Path(models_dir) / 'registry'
+        self.manifest_path = self.root / self.MANIFEST
+        self._lock = threading.Lock()
+        self._manifest = None
+        self._manifest_mtime = None
+
+    def exists(self):
+        """True once a version has been registered"""
+        return self.manifest_path.exists()
+
+    def manifest(self):
+        """
+        Current manifest, re-read only when the file changes
+
+        Returns:
+            dict: {'current': version or None, 'versions': {version: entry}}
+        """
+        try:
+            mtime = self.manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {'current': None, 'versions': {}}
+        with self._lock:
+            if self._manifest is None or self._manifest_mtime != mtime:
+                with open(self.manifest_path, 'r') as f:
+                    self._manifest = json.load(f)
+                self._manifest_mtime = mtime
+            return self._manifest
+
+    def current_version(self):
+        """Version currently promoted for serving (None if none)"""
+        return self.manifest()['current']
+
+    def versions(self):
+        """All registered versions, oldest first"""
+        return sorted(self.manifest()['versions'])
+
+    def register(self, all_models, correlations=None, version=None, promote=True):
+        """
+        Store the serving parts of trained prop models as a new version
+
+        Args:
+            all_models (dict): {prop_type: model_data} as returned by ModelTrainer
+            correlations (dict, optional): Correlation values
+            version (str, optional): Version id (default: current timestamp)
+            promote (bool): Make this version the one served
+
+        Returns:
+            str: The new version
+        """
+        version = version or datetime.now().strftime('%Y%m%d_%H%M%S')
+        version_dir = self.root / version
+        version_dir.mkdir(parents=True, exist_ok=False)
+
+        props = {}
+        for prop_type, model_data in all_models.items():
+            best_model_name = next((name for name, model in model_data.get('models', {}).items()
+                                    if model is model_data['best_model']), type(model_data['best_model']).__name__)
+            filename = f"{prop_type}.joblib"
+            joblib.dump({
+                'best_model': model_data['best_model'],
+                'scaler': model_data['scaler'],
+                'feature_cols': model_data['feature_cols'],
+                'prop_type': prop_type,
+                'best_model_name': best_model_name,
+                'results': model_data.get('results', {})
+            }, version_dir / filename)
+            props[prop_type] = {
+                'file': filename,
+                'compiled': self._compile(model_data, version_dir / f"{prop_type}.trees.npz"),
+                'model': best_model_name,
+                'metrics': {k: float(v) for k, v in model_data.get('results', {}).get(best_model_name, {}).items()},
+                'feature_schema': feature_schema_hash(model_data['feature_cols']),
+                'n_features': len(model_data['feature_cols'])
+            }
+
+        with self._lock:
+            manifest = self._read_manifest()
+            manifest['versions'][version] = {
+                'created_at': datetime.now().isoformat(),
+                'props': props,
+                'correlations': correlations or {}
+            }
+            if promote or manifest['current'] is None:
+                manifest['current'] = version
+            self._write_manifest(manifest)
+
+        return version
+
+    @staticmethod
+    def _compile(model_data, path):
+        """Export the best model and scaler as node arrays; file name, or None if not a tree ensemble"""
+        try:
+            forest = compile_model(model_data['best_model'])
+        except ValueError:
+            return None
+        scaler = CompiledScaler.from_sklearn(model_data['scaler'])
+        forest.save(path, scaler_mean=scaler.mean, scaler_scale=scaler.scale,
+                    feature_cols=np.array(model_data['feature_cols'], dtype=str))
+        return path.name
+
+    def promote(self, version):
+        """
+        Atomically switch serving to a registered version
+
+        Predictors pick it up on their next prediction, without a restart.
+        """
+        with self._lock:
+            manifest = self._read_manifest()
+            if version not in manifest['versions']:
+                raise KeyError(f"Unknown model version: {version}")
+            manifest['current'] = version
+            self._write_manifest(manifest)
+
+    def remove(self, version):
+        """Delete a version that is not being served"""
+        with self._lock:
+            manifest = self._read_manifest()
+            if version == manifest['current']:
+                raise ValueError(f"Cannot remove the current version: {version}")
+            manifest['versions'].pop(version, None)
+            self._write_manifest(manifest)
+        shutil.rmtree(self.root / version, ignore_errors=True)
+
+    def load(self, version=None, compiled=True):
+        """
+        Serving models of a version (the current one by default), loaded lazily
+
+        Args:
+            version (str, optional): Version to load
+            compiled (bool): Serve exported node arrays where a prop has them
+                (scored with NumPy only) instead of unpickling the model
+
+        Returns:
+            LazyModels: {prop_type: model_data}; empty if nothing is registered
+        """
+        manifest = self.manifest()
+        version = version or manifest['current']
+        entry = manifest['versions'].get(version, {'props': {}})
+        return LazyModels(self.root / version if version else self.root, entry['props'], version, compiled)
+
+    def _read_manifest(self):
+        if not self.manifest_path.exists():
+            return {'current': None, 'versions': {}}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest):
+        """Write to a temp file and rename over the manifest (atomic on POSIX and Windows)"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.manifest-', suffix='.json')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(manifest, f, indent=2)
+            os.replace(tmp_path, self.manifest_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._manifest = None
+
+
+class LazyModels(Mapping):
+    """Read-only {prop_type: model_data} that loads each prop's artifact on first access"""
+
+    def __init__(self, version_dir, props, version, compiled=True):
+        self.version_dir = Path(version_dir)
+        self.props = props
+        self.version = version
+        self.compiled = compiled
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, prop_type):
+        model_data = self._loaded.get(prop_type)
+        if model_data is not None:
+            return model_data
+        entry = self.props[prop_type]
+        with self._lock:
+            if prop_type not in self._loaded:
+                if self.compiled and entry.get('compiled'):
+                    self._loaded[prop_type] = self._load_compiled(prop_type, entry)
+                else:
+                    # Arrays are memory-mapped from the file rather than read into fresh buffers
+                    self._loaded[prop_type] = joblib.load(self.version_dir / entry['file'], mmap_mode='r')
+            return self._loaded[prop_type]
+
+    def _load_compiled(self, prop_type, entry):
+        """model_data backed by a CompiledForest and CompiledScaler"""
+        forest, extra = CompiledForest.load(self.version_dir / entry['compiled'])
+        return {
+            'best_model': forest,
+            'scaler': CompiledScaler(extra['scaler_mean'], extra['scaler_scale']),
+            'feature_cols': extra['feature_cols'].tolist(),
+            'prop_type': prop_type,
+            'best_model_name': entry['model']
+        }
+
+    def __iter__(self):
+        return iter(self.props)
+
+    def __len__(self):
+        return len(self.props)
+
+    def loaded(self):
+        """Props whose artifacts have been loaded so far"""
+        return list(self._loaded)
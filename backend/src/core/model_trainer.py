@@ -3,10 +3,12 @@ Model training module
 Trains ensemble of ML models for prop predictions
 """
 
+import os
+import time
+import tempfile
 import pandas as pd
 import numpy as np
-import pickle
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier, StackingClassifier
 from sklearn.neural_network import MLPClassifier
@@ -14,6 +16,8 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, roc_auc_score, log_loss
 
+from src.core.model_registry import ModelRegistry
+
 try:
     from xgboost import XGBClassifier
     HAS_XGBOOST = True
@@ -27,15 +31,84 @@ except ImportError:
     HAS_LIGHTGBM = False
 
 
+def _model_names():
+    """Models fitted per prop, in training order"""
+    names = ['RandomForest']
+    if HAS_XGBOOST:
+        names.append('XGBoost')
+    if HAS_LIGHTGBM:
+        names.append('LightGBM')
+    names.extend(['GradientBoosting', 'NeuralNetwork'])
+    return names
+
+
+def _build_model(name, threads):
+    """Unfitted model by name; threads caps the models that parallelize internally"""
+    if name == 'RandomForest':
+        return RandomForestClassifier(n_estimators=200, max_depth=10, random_state=42, n_jobs=threads)
+    if name == 'XGBoost':
+        return XGBClassifier(n_estimators=200, max_depth=6, random_state=42, n_jobs=threads)
+    if name == 'LightGBM':
+        return LGBMClassifier(n_estimators=200, max_depth=6, random_state=42, verbose=-1, n_jobs=threads)
+    if name == 'GradientBoosting':
+        return GradientBoostingClassifier(n_estimators=200, max_depth=5, random_state=42)
+    if name == 'NeuralNetwork':
+        return MLPClassifier(hidden_layer_sizes=(128, 64, 32), max_iter=500, random_state=42)
+    raise ValueError(f"Unknown model: {name}")
+
+
+def _evaluate(model, X_test, y_test):
+    """Accuracy, AUC and log loss on the test split"""
+    y_pred = model.predict(X_test)
+    y_proba = model.predict_proba(X_test)[:, 1]
+    return {
+        'accuracy': accuracy_score(y_test, y_pred),
+        'auc': roc_auc_score(y_test, y_proba),
+        'log_loss': log_loss(y_test, y_proba)
+    }
+
+
+def _fit_job(job):
+    """
+    Fit and evaluate one (prop, model) job
+
+    Runs in a worker process. The feature matrix and targets are opened
+    memory-mapped from job['matrix'] / job['targets'], so every worker
+    shares the same pages instead of receiving a pickled copy.
+    """
+    start = time.perf_counter()
+    X = np.load(job['matrix'], mmap_mode='r')
+    y = np.load(job['targets'], mmap_mode='r')[:, job['target']]
+    X_train, X_test = X[job['train_idx']], X[job['test_idx']]
+    y_train, y_test = y[job['train_idx']], y[job['test_idx']]
+
+    if job['scaler'] is not None:
+        X_train = job['scaler'].transform(X_train)
+        X_test = job['scaler'].transform(X_test)
+
+    model = _build_model(job['model'], job['threads'])
+    model.fit(X_train, y_train)
+    return {
+        'prop_type': job['prop_type'],
+        'model_name': job['model'],
+        'model': model,
+        'results': _evaluate(model, X_test, y_test),
+        'seconds': time.perf_counter() - start,
+        'pid': os.getpid()
+    }
+
+
 class ModelTrainer:
     """Train ML models for prop predictions"""
 
-    def __init__(self, models_dir=None):
+    def __init__(self, models_dir=None, n_jobs=None):
         """
         Initialize trainer
 
         Args:
             models_dir (str, optional): Directory to save models
+            n_jobs (int, optional): CPU budget for training (default: all cores;
+                1 trains in this process)
         """
         if models_dir is None:
             self.models_dir = Path.cwd() / 'models'
@@ -43,6 +116,7 @@ class ModelTrainer:
             self.models_dir = Path(models_dir)
 
         self.models_dir.mkdir(parents=True, exist_ok=True)
+        self.n_jobs = n_jobs or os.cpu_count() or 1
 
         self.prop_types = [
             'passing_250+', 'passing_300+',
@@ -63,148 +137,155 @@ class ModelTrainer:
         Returns:
             dict: Trained models and metadata
         """
-        print(f"\n{'='*80}")
-        print(f"TRAINING: {prop_type}")
-        print('='*80)
-
-        # Prepare data
-        X = df[feature_cols].fillna(0)
-        y = df[prop_type]
-
-        # Train/test split
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y, test_size=0.2, random_state=42, stratify=y
-        )
-
-        print(f"  Training: {len(X_train):,} samples ({y_train.mean():.1%} hit rate)")
-        print(f"  Testing: {len(X_test):,} samples ({y_test.mean():.1%} hit rate)")
-
-        # Scale features
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-
-        # Train multiple models
-        models = {}
-        results = {}
-
-        # RandomForest
-        print("\n  Training RandomForest...")
-        rf = RandomForestClassifier(n_estimators=200, max_depth=10, random_state=42, n_jobs=-1)
-        rf.fit(X_train, y_train)
-        models['RandomForest'] = rf
-        results['RandomForest'] = self._evaluate_model(rf, X_test, y_test)
-
-        # XGBoost (if available)
-        if HAS_XGBOOST:
-            print("  Training XGBoost...")
-            xgb = XGBClassifier(n_estimators=200, max_depth=6, random_state=42)
-            xgb.fit(X_train, y_train)
-            models['XGBoost'] = xgb
-            results['XGBoost'] = self._evaluate_model(xgb, X_test, y_test)
-
-        # LightGBM (if available)
-        if HAS_LIGHTGBM:
-            print("  Training LightGBM...")
-            lgbm = LGBMClassifier(n_estimators=200, max_depth=6, random_state=42, verbose=-1)
-            lgbm.fit(X_train, y_train)
-            models['LightGBM'] = lgbm
-            results['LightGBM'] = self._evaluate_model(lgbm, X_test, y_test)
-
-        # GradientBoosting
-        print("  Training GradientBoosting...")
-        gb = GradientBoostingClassifier(n_estimators=200, max_depth=5, random_state=42)
-        gb.fit(X_train, y_train)
-        models['GradientBoosting'] = gb
-        results['GradientBoosting'] = self._evaluate_model(gb, X_test, y_test)
-
-        # Neural Network
-        print("  Training Neural Network...")
-        nn = MLPClassifier(hidden_layers=(128, 64, 32), max_iter=500, random_state=42)
-        nn.fit(X_train_scaled, y_train)
-        models['NeuralNetwork'] = nn
-        results['NeuralNetwork'] = self._evaluate_model(nn, X_test_scaled, y_test)
-
-        # Find best model
-        best_model_name = max(results, key=lambda k: results[k]['auc'])
-        best_model = models[best_model_name]
-
-        print(f"\n  Best Model: {best_model_name} (AUC: {results[best_model_name]['auc']:.3f})")
-
-        return {
-            'models': models,
-            'best_model': best_model,
-            'scaler': scaler,
-            'feature_cols': feature_cols,
-            'results': results,
-            'prop_type': prop_type
-        }
+        return self.train_all_props(df, feature_cols, prop_types=[prop_type])[prop_type]
 
     def _evaluate_model(self, model, X_test, y_test):
         """Evaluate model performance"""
-        y_pred = model.predict(X_test)
-        y_proba = model.predict_proba(X_test)[:, 1]
+        results = _evaluate(model, X_test, y_test)
+        print(f"    Accuracy: {results['accuracy']:.3f} | AUC: {results['auc']:.3f} | "
+              f"LogLoss: {results['log_loss']:.3f}")
+        return results
 
-        accuracy = accuracy_score(y_test, y_pred)
-        auc = roc_auc_score(y_test, y_proba)
-        logloss = log_loss(y_test, y_proba)
-
-        print(f"    Accuracy: {accuracy:.3f} | AUC: {auc:.3f} | LogLoss: {logloss:.3f}")
-
-        return {
-            'accuracy': accuracy,
-            'auc': auc,
-            'log_loss': logloss
-        }
-
-    def train_all_props(self, df, feature_cols):
+    def train_all_props(self, df, feature_cols, prop_types=None, on_job_done=None):
         """
         Train models for all prop types
 
+        Every (prop, model) pair is a separate job. Jobs run on a process
+        pool sized to the CPU budget (n_jobs), with the feature matrix and
+        targets shared through memory-mapped files. Results are
+        printed (and passed to on_job_done) as each job finishes.
+
         Args:
             df (pd.DataFrame): Training data
             feature_cols (list): Feature columns
+            prop_types (list, optional): Props to train (default: self.prop_types)
+            on_job_done (callable, optional): Called with a dict (prop_type,
+                model_name, results, seconds, done, total) per finished job
 
         Returns:
             dict: All trained models
         """
-        all_models = {}
+        prop_types = [p for p in (prop_types or self.prop_types) if p in df.columns]
+        if not prop_types:
+            return {}
 
-        for prop_type in self.prop_types:
-            if prop_type in df.columns:
-                model_data = self.train_prop_model(df, prop_type, feature_cols)
-                all_models[prop_type] = model_data
+        X = df[feature_cols].fillna(0)
+        props = {}
+        for target, prop_type in enumerate(prop_types):
+            y = df[prop_type]
+            train_idx, test_idx = train_test_split(
+                np.arange(len(df)), test_size=0.2, random_state=42, stratify=y
+            )
+            print(f"\n  {prop_type}: training {len(train_idx):,} samples ({y.iloc[train_idx].mean():.1%} hit rate), "
+                  f"testing {len(test_idx):,} ({y.iloc[test_idx].mean():.1%} hit rate)")
+            props[prop_type] = {
+                'target': target,
+                'train_idx': train_idx,
+                'test_idx': test_idx,
+                'scaler': StandardScaler().fit(X.iloc[train_idx])
+            }
+
+        model_names = _model_names()
+        jobs = [(prop_type, name) for name in model_names for prop_type in prop_types]
+        workers = max(1, min(self.n_jobs, len(jobs)))
+        threads = max(1, self.n_jobs // workers)
+        print(f"\n  Training {len(jobs)} models for {len(prop_types)} props "
+              f"({workers} workers x {threads} threads)")
+
+        fitted = {prop_type: {} for prop_type in prop_types}
+        with tempfile.TemporaryDirectory(prefix='train_') as temp_dir:
+            matrix_path = os.path.join(temp_dir, 'features.npy')
+            targets_path = os.path.join(temp_dir, 'targets.npy')
+            np.save(matrix_path, X.to_numpy(dtype=np.float64))
+            np.save(targets_path, df[prop_types].to_numpy())
+
+            job_args = [{
+                'matrix': matrix_path,
+                'targets': targets_path,
+                'target': props[prop_type]['target'],
+                'train_idx': props[prop_type]['train_idx'],
+                'test_idx': props[prop_type]['test_idx'],
+                'scaler': props[prop_type]['scaler'] if name == 'NeuralNetwork' else None,
+                'prop_type': prop_type,
+                'model': name,
+                'threads': threads
+            } for prop_type, name in jobs]
+
+            if workers == 1:
+                finished = (_fit_job(job) for job in job_args)
+                self._collect(finished, fitted, len(jobs), on_job_done)
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = [pool.submit(_fit_job, job) for job in job_args]
+                    finished = (future.result() for future in as_completed(futures))
+                    self._collect(finished, fitted, len(jobs), on_job_done)
+
+        all_models = {}
+        for prop_type in prop_types:
+            models = {name: fitted[prop_type][name][0] for name in model_names}
+            results = {name: fitted[prop_type][name][1] for name in model_names}
+
+            # Find best model
+            best_model_name = max(results, key=lambda k: results[k]['auc'])
+            print(f"  Best Model for {prop_type}: {best_model_name} (AUC: {results[best_model_name]['auc']:.3f})")
+
+            all_models[prop_type] = {
+                'models': models,
+                'best_model': models[best_model_name],
+                'scaler': props[prop_type]['scaler'],
+                'feature_cols': feature_cols,
+                'results': results,
+                'prop_type': prop_type
+            }
 
         return all_models
 
-    def save_models(self, all_models, correlations=None):
+    def _collect(self, finished, fitted, total, on_job_done):
+        """Record finished jobs as they arrive and report each one"""
+        for done, job in enumerate(finished, start=1):
+            fitted[job['prop_type']][job['model_name']] = (job['model'], job['results'])
+            results = job['results']
+            print(f"  [{done}/{total}] {job['prop_type']} {job['model_name']}: "
+                  f"Accuracy {results['accuracy']:.3f} | AUC {results['auc']:.3f} | "
+                  f"LogLoss {results['log_loss']:.3f} ({job['seconds']:.1f}s)")
+            if on_job_done:
+                on_job_done({
+                    'prop_type': job['prop_type'],
+                    'model_name': job['model_name'],
+                    'results': results,
+                    'seconds': job['seconds'],
+                    'done': done,
+                    'total': total
+                })
+
+    def save_models(self, all_models, correlations=None, promote=True):
         """
-        Save all models to disk
+        Save all models to the model registry
+
+        Only each prop's best model, scaler and feature columns are kept,
+        under a new version listed in the registry manifest.
 
         Args:
             all_models (dict): Trained models
             correlations (dict, optional): Correlation values
+            promote (bool): Serve the new version right away
+
+        Returns:
+            str: Registered version
         """
         print("\n" + "="*80)
-        print("SAVING MODELS TO DISK")
+        print("SAVING MODELS TO REGISTRY")
         print("="*80)
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        registry = ModelRegistry(self.models_dir)
+        version = registry.register(all_models, correlations, promote=promote)
 
         for prop_type, model_data in all_models.items():
-            filename = f"sgp_{prop_type}_{timestamp}.pkl"
-            filepath = self.models_dir / filename
-
-            with open(filepath, 'wb') as f:
-                pickle.dump(model_data, f)
-
-            print(f"  ✅ Saved {prop_type} → {filename}")
+            print(f"  ✅ Saved {prop_type} → registry/{version}/{prop_type}.joblib")
 
-        # Save correlations
         if correlations:
-            corr_file = self.models_dir / f"correlations_{timestamp}.pkl"
-            with open(corr_file, 'wb') as f:
-                pickle.dump(correlations, f)
-            print(f"  ✅ Saved correlations → correlations_{timestamp}.pkl")
+            print("  ✅ Saved correlations in manifest")
 
-        print(f"\n  📁 All models saved in /{self.models_dir.name} directory")
+        status = "promoted" if registry.current_version() == version else "not promoted"
+        print(f"\n  📁 Version {version} ({status}) in /{self.models_dir.name}/registry")
+        return version
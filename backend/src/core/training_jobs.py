@@ -0,0 +1,177 @@
+"""
+Training job manager - run training in a separate process with progress
+Concurrent triggers for the same job key share one job; the result is
+swapped into the serving models by the parent once the process finishes
+"""
+
+import uuid
+import queue
+import threading
+import traceback
+import multiprocessing
+from datetime import datetime
+
+
+def _run_in_child(results, target, args, kwargs):
+    """Process entry point: run target, streaming progress and the outcome back"""
+    def report(stage, progress=None, message=None):
+        results.put(('progress', {'stage': stage, 'progress': progress, 'message': message}))
+
+    try:
+        results.put(('result', target(*args, report=report, **kwargs)))
+    except Exception as e:
+        traceback.print_exc()
+        results.put(('error', f"{type(e).__name__}: {e}"))
+
+
+class TrainingJobManager:
+    """
+    Background training jobs, one process each
+
+    Job targets must be importable module-level functions that accept a
+    report(stage, progress=None, message=None) keyword argument; their
+    arguments and return value are pickled across the process boundary.
+    Processes are spawned rather than forked, so the API's threads and
+    open connections are never copied into them.
+    """
+
+    ACTIVE = ('queued', 'running', 'swapping')
+
+    def __init__(self, max_history=50, poll_seconds=1.0):
+        """
+        Initialize manager
+
+        Args:
+            max_history (int): Finished jobs kept for the status endpoint
+            poll_seconds (float): How often a watcher checks that its process is alive
+        """
+        self.max_history = max_history
+        self.poll_seconds = poll_seconds
+        self._context = multiprocessing.get_context('spawn')
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key, target, args=(), kwargs=None, on_success=None):
+        """
+        Start a job unless one with the same key is already queued or running
+
+        Args:
+            key (str): Dedup key, e.g. 'nba_train:2023-24'
+            target (callable): Module-level function run in the child process
+            args (tuple): Positional arguments for target
+            kwargs (dict, optional): Keyword arguments for target
+            on_success (callable, optional): Called in this process with the
+                target's return value, e.g. to swap in the new model
+
+        Returns:
+            dict: Job status; 'deduplicated' is True if an existing job was returned
+        """
+        with self._lock:
+            job_id = self._active.get(key)
+            if job_id is not None:
+                return dict(self._jobs[job_id], deduplicated=True)
+
+            job_id = uuid.uuid4().hex[:12]
+            self._jobs[job_id] = {
+                'job_id': job_id,
+                'key': key,
+                'status': 'queued',
+                'stage': 'queued',
+                'progress': 0.0,
+                'message': None,
+                'result': None,
+                'error': None,
+                'created_at': datetime.now().isoformat(),
+                'started_at': None,
+                'finished_at': None
+            }
+            self._active[key] = job_id
+            self._trim_history()
+            job = dict(self._jobs[job_id], deduplicated=False)
+
+        threading.Thread(target=self._watch, args=(job_id, target, args, kwargs or {}, on_success),
+                         name=f"training-{key}", daemon=True).start()
+        return job
+
+    def get(self, job_id):
+        """Status of one job (None if unknown)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def list(self):
+        """Status of all known jobs, newest first"""
+        with self._lock:
+            return [dict(job) for job in reversed(self._jobs.values())]
+
+    def active(self, key):
+        """Status of the queued or running job for a key (None if idle)"""
+        with self._lock:
+            job_id = self._active.get(key)
+            return dict(self._jobs[job_id]) if job_id else None
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+
+    def _watch(self, job_id, target, args, kwargs, on_success):
+        """Start the child process and relay its progress until it finishes"""
+        results = self._context.Queue()
+        try:
+            process = self._context.Process(target=_run_in_child, args=(results, target, args, kwargs))
+            process.start()
+            self._update(job_id, status='running', stage='starting', started_at=datetime.now().isoformat())
+
+            kind, payload = self._wait(job_id, process, results)
+            process.join()
+            if kind == 'error':
+                self._finish(job_id, 'failed', error=payload)
+                return
+
+            if on_success:
+                self._update(job_id, status='swapping', stage='swapping', message='Swapping in the new model')
+                on_success(payload)
+            self._finish(job_id, 'succeeded', result=self._summary(payload), progress=1.0)
+        except Exception as e:
+            traceback.print_exc()
+            self._finish(job_id, 'failed', error=f"{type(e).__name__}: {e}")
+        finally:
+            results.close()
+
+    def _wait(self, job_id, process, results):
+        """Relay progress messages; return the final ('result' | 'error', payload)"""
+        while True:
+            try:
+                kind, payload = results.get(timeout=self.poll_seconds)
+            except queue.Empty:
+                if process.is_alive():
+                    continue
+                # The process may have exited just after queuing its outcome
+                try:
+                    kind, payload = results.get(timeout=self.poll_seconds)
+                except queue.Empty:
+                    return 'error', f"Training process exited with code {process.exitcode}"
+            if kind != 'progress':
+                return kind, payload
+            fields = {key: value for key, value in payload.items() if value is not None}
+            self._update(job_id, **fields)
+
+    def _finish(self, job_id, status, **fields):
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(fields, status=status, stage=status, finished_at=datetime.now().isoformat())
+            if self._active.get(job['key']) == job_id:
+                del self._active[job['key']]
+        print(f"{'✅' if status == 'succeeded' else '❌'} Training job {job['key']} {status}"
+              + (f": {job['error']}" if job['error'] else ''))
+
+    @staticmethod
+    def _summary(payload):
+        """JSON-friendly result for the status endpoint (models themselves are not returned)"""
+        return payload if isinstance(payload, dict) else None
+
+    def _trim_history(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job['status'] not in self.ACTIVE]
+        for job_id in finished[:max(0, len(self._jobs) - self.max_history)]:
+            del self._jobs[job_id]
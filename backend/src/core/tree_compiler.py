@@ -0,0 +1,283 @@
+"""
+Compiled tree ensembles - flat NumPy node arrays scored without sklearn
+Exports RandomForest, GradientBoosting, XGBoost and LightGBM binary classifiers
+"""
+
+import json
+
+import numpy as np
+
+
+class CompiledForest:
+    """
+    Tree ensemble as flat node arrays with a vectorized evaluator
+
+    All trees share one set of node arrays; roots holds each tree's first
+    node. Leaves point to themselves, so every row walks max_depth steps
+    and ends on its leaf in every tree at once. The score is either the
+    mean leaf value (RandomForest probabilities) or a margin
+    base + scale * sum(leaf values) passed through a sigmoid (boosting).
+    """
+
+    ARRAYS = ['feature', 'threshold', 'left', 'right', 'default_left', 'value', 'roots']
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots,
+                 kind, base=0.0, scale=1.0, strict=False, input_dtype='float32', n_features=None):
+        self.feature = np.asarray(feature, dtype=np.int32)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int32)
+        self.right = np.asarray(right, dtype=np.int32)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.kind = kind              # 'mean' or 'sigmoid'
+        self.base = float(base)
+        self.scale = float(scale)
+        self.strict = bool(strict)    # x < threshold goes left (XGBoost) instead of x <= threshold
+        self.input_dtype = np.dtype(input_dtype)
+        self.n_features_in_ = int(n_features if n_features is not None else self.feature.max() + 1)
+        self.max_depth = self._depth()
+        # (right, left) pairs: a node's next node is _children[2 * node + went_left]
+        self._children = np.stack([self.right, self.left], axis=1).ravel().astype(np.intp)
+
+    def _depth(self):
+        """Longest root-to-leaf path over all trees"""
+        depth = 0
+        frontier = self.roots.copy()
+        while True:
+            is_leaf = self.left[frontier] == frontier
+            frontier = np.unique(np.concatenate([self.left[frontier[~is_leaf]], self.right[frontier[~is_leaf]]]))
+            if frontier.size == 0:
+                return depth
+            depth += 1
+
+    def apply(self, X):
+        """Leaf node of every tree for every row, shape (rows, trees)"""
+        X = np.ascontiguousarray(X, dtype=self.input_dtype)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        rows, n_features = X.shape
+        flat = X.ravel()
+        row_offsets = (np.arange(rows, dtype=np.intp) * n_features)[:, None]
+        node = np.broadcast_to(self.roots.astype(np.intp), (rows, self.roots.size)).copy()
+        for _ in range(self.max_depth):
+            x = flat.take(row_offsets + self.feature.take(node))
+            threshold = self.threshold.take(node)
+            go_left = x < threshold if self.strict else x <= threshold
+            missing = np.isnan(x)
+            if missing.any():
+                go_left = np.where(missing, self.default_left.take(node), go_left)
+            np.take(self._children, node * 2 + go_left, out=node)
+        return node
+
+    def predict_proba(self, X):
+        """Class probabilities, shape (rows, 2) like sklearn's predict_proba"""
+        leaf_values = self.value[self.apply(X)]
+        if self.kind == 'mean':
+            positive = leaf_values.mean(axis=1)
+        else:
+            positive = 1.0 / (1.0 + np.exp(-(self.base + self.scale * leaf_values.sum(axis=1))))
+        return np.column_stack([1.0 - positive, positive])
+
+    def save(self, path, **extra):
+        """Write the node arrays (plus any extra arrays) to an .npz file"""
+        meta = {'kind': self.kind, 'base': self.base, 'scale': self.scale, 'strict': self.strict,
+                'input_dtype': self.input_dtype.name, 'n_features': self.n_features_in_}
+        np.savez(path, meta=np.array(json.dumps(meta)),
+                 **{name: getattr(self, name) for name in self.ARRAYS}, **extra)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read a forest written by save()
+
+        Returns:
+            tuple: (CompiledForest, dict of the extra arrays)
+        """
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            forest = cls(*(data[name] for name in cls.ARRAYS), **meta)
+            extra = {name: data[name] for name in data.files if name not in cls.ARRAYS and name != 'meta'}
+        return forest, extra
+
+
+class CompiledScaler:
+    """StandardScaler.transform from its mean_ and scale_ arrays"""
+
+    def __init__(self, mean, scale):
+        self.mean = np.asarray(mean, dtype=np.float64)
+        self.scale = np.asarray(scale, dtype=np.float64)
+
+    @classmethod
+    def from_sklearn(cls, scaler):
+        n = scaler.n_features_in_
+        mean = scaler.mean_ if scaler.mean_ is not None and scaler.with_mean else np.zeros(n)
+        scale = scaler.scale_ if scaler.scale_ is not None and scaler.with_std else np.ones(n)
+        return cls(mean, scale)
+
+    def transform(self, X):
+        X = np.array(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        X -= self.mean
+        X /= self.scale
+        return X
+
+
+def compile_model(model):
+    """
+    Export a fitted binary tree ensemble to a CompiledForest
+
+    Supports RandomForestClassifier, ExtraTreesClassifier,
+    GradientBoostingClassifier, XGBClassifier (binary:logistic) and
+    LGBMClassifier (binary). Raises ValueError for anything else.
+    """
+    name = type(model).__name__
+    if name in ('RandomForestClassifier', 'ExtraTreesClassifier'):
+        return _compile_sklearn_forest(model)
+    if name == 'GradientBoostingClassifier':
+        return _compile_sklearn_boosting(model)
+    if name == 'XGBClassifier':
+        return _compile_xgboost(model)
+    if name == 'LGBMClassifier':
+        return _compile_lightgbm(model)
+    raise ValueError(f"Cannot compile {name}: not a supported tree ensemble")
+
+
+class _Builder:
+    """Accumulates trees into shared node arrays"""
+
+    def __init__(self):
+        self.parts = {name: [] for name in ['feature', 'threshold', 'left', 'right', 'default_left', 'value']}
+        self.roots = []
+        self.size = 0
+
+    def add(self, feature, threshold, left, right, default_left, value, is_leaf):
+        n = len(feature)
+        own = np.arange(n) + self.size
+        self.parts['feature'].append(np.where(is_leaf, 0, feature))
+        self.parts['threshold'].append(np.where(is_leaf, 0.0, threshold))
+        self.parts['left'].append(np.where(is_leaf, own, np.asarray(left) + self.size))
+        self.parts['right'].append(np.where(is_leaf, own, np.asarray(right) + self.size))
+        self.parts['default_left'].append(np.asarray(default_left, dtype=bool))
+        self.parts['value'].append(np.where(is_leaf, value, 0.0))
+        self.roots.append(self.size)
+        self.size += n
+
+    def build(self, **kwargs):
+        arrays = {name: np.concatenate(parts) for name, parts in self.parts.items()}
+        return CompiledForest(roots=self.roots, **arrays, **kwargs)
+
+
+def _check_binary(model):
+    if len(getattr(model, 'classes_', [])) != 2:
+        raise ValueError(f"Cannot compile {type(model).__name__}: only binary classifiers are supported")
+
+
+def _add_sklearn_tree(builder, tree, value):
+    is_leaf = tree.children_left == -1
+    # Trees fitted on data with NaNs record where missing values go (sklearn >= 1.3)
+    default_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=np.uint8)).astype(bool)
+    builder.add(tree.feature, tree.threshold, tree.children_left, tree.children_right,
+                default_left, value, is_leaf)
+
+
+def _compile_sklearn_forest(model):
+    _check_binary(model)
+    builder = _Builder()
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        counts = tree.value[:, 0, :]
+        # Normalise: older sklearn stores class counts, newer stores fractions
+        value = counts[:, 1] / counts.sum(axis=1)
+        _add_sklearn_tree(builder, tree, value)
+    return builder.build(kind='mean', input_dtype='float32', n_features=model.n_features_in_)
+
+
+def _compile_sklearn_boosting(model):
+    _check_binary(model)
+    if getattr(model, 'loss', 'log_loss') not in ('log_loss', 'deviance'):
+        raise ValueError(f"Cannot compile GradientBoostingClassifier with loss={model.loss}")
+    builder = _Builder()
+    for estimator in model.estimators_[:, 0]:
+        _add_sklearn_tree(builder, estimator.tree_, estimator.tree_.value[:, 0, 0])
+    # Constant initial raw prediction (log-odds of the class prior by default)
+    base = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0]
+    return builder.build(kind='sigmoid', base=base, scale=model.learning_rate,
+                         input_dtype='float32', n_features=model.n_features_in_)
+
+
+def _compile_xgboost(model):
+    _check_binary(model)
+    booster = model.get_booster()
+    dump = json.loads(booster.save_raw(raw_format='json'))
+    learner = dump['learner']
+    objective = learner['objective']['name']
+    if objective != 'binary:logistic':
+        raise ValueError(f"Cannot compile XGBClassifier with objective {objective}")
+
+    base_score = float(str(learner['learner_model_param']['base_score']).strip('[]'))
+    trees = learner['gradient_booster']['model']['trees']
+    best_iteration = getattr(model, 'best_iteration', None)
+    if best_iteration is not None:
+        trees = trees[:best_iteration + 1]
+
+    builder = _Builder()
+    for tree in trees:
+        left = np.asarray(tree['left_children'])
+        is_leaf = left == -1
+        builder.add(tree['split_indices'], np.asarray(tree['split_conditions'], dtype=np.float32),
+                    left, tree['right_children'], tree['default_left'],
+                    np.asarray(tree['split_conditions'], dtype=np.float32), is_leaf)
+    margin = np.log(base_score / (1.0 - base_score))
+    return builder.build(kind='sigmoid', base=margin, strict=True, input_dtype='float32',
+                         n_features=int(learner['learner_model_param']['num_feature']))
+
+
+def _compile_lightgbm(model):
+    _check_binary(model)
+    dump = model.booster_.dump_model()
+    objective = dump.get('objective', '')
+    if not objective.startswith('binary'):
+        raise ValueError(f"Cannot compile LGBMClassifier with objective {objective}")
+    sigmoid = 1.0
+    for part in objective.split():
+        if part.startswith('sigmoid:'):
+            sigmoid = float(part.split(':', 1)[1])
+
+    builder = _Builder()
+    for info in dump['tree_info']:
+        nodes = []
+        _flatten_lightgbm(info['tree_structure'], nodes)
+        index = {id(node): i for i, node in enumerate(nodes)}
+        is_leaf = np.array(['leaf_value' in node for node in nodes])
+        builder.add(
+            [node.get('split_feature', 0) for node in nodes],
+            [node.get('threshold', 0.0) for node in nodes],
+            [index[id(node['left_child'])] if 'left_child' in node else -1 for node in nodes],
+            [index[id(node['right_child'])] if 'right_child' in node else -1 for node in nodes],
+            [_lightgbm_default_left(node) for node in nodes],
+            [node.get('leaf_value', 0.0) for node in nodes],
+            is_leaf)
+    return builder.build(kind='sigmoid', scale=sigmoid, input_dtype='float64',
+                         n_features=dump['max_feature_idx'] + 1)
+
+
+def _lightgbm_default_left(node):
+    """Where NaN goes: the recorded default, or where 0.0 goes if the split had no missing values"""
+    if node.get('missing_type') == 'NaN':
+        return bool(node.get('default_left', False))
+    return 0.0 <= node.get('threshold', 0.0)
+
+
+def _flatten_lightgbm(node, nodes):
+    """Pre-order list of a LightGBM tree's nodes"""
+    if 'leaf_value' not in node:
+        if node.get('decision_type', '<=') != '<=':
+            raise ValueError("Cannot compile LightGBM categorical splits")
+        if node.get('missing_type') == 'Zero':
+            raise ValueError("Cannot compile LightGBM zero-as-missing splits")
+    nodes.append(node)
+    if 'leaf_value' not in node:
+        _flatten_lightgbm(node['left_child'], nodes)
+        _flatten_lightgbm(node['right_child'], nodes)
@@ -3,31 +3,33 @@ import json
 import cv2
 import random
 import subprocess
+from fnmatch import fnmatch
 from pathlib import Path
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 # Use Kre8VidMems directly - no more FAISS crashes!
-from kre8vidmems import Kre8VidMemory
+from kre8vidmems import Kre8VidMemory, SegmentedMemory, FederatedIndex, get_registry
+from kre8vidmems.config import FEDERATED_INDEX_DIRNAME, CHUNK_STORE_DIRNAME
+from kre8vidmems.storage.federated_index import list_memories
+from kre8vidmems.storage.report import storage_report
+from kre8vidmems.storage.chunk_store import get_chunk_store, HASHES_SUFFIX
 print("✅ Using Kre8VidMems directly (no FAISS!)")
 
 # Load environment variables
 load_dotenv()
 
-VIDEO_PATH = "knowledge_base.mp4" # Renamed from portfolio.mp4
-INDEX_PATH = "knowledge_base_index.json"
+MEMORY_NAME = "knowledge_base" # Renamed from portfolio; stored as knowledge_base.segments/
 
 class KnowledgeBaseService:
     def __init__(self):
-        self.memory = None
-        if os.path.exists(VIDEO_PATH):
-            try:
-                # Load existing memory
-                base_path = Path(VIDEO_PATH).stem
-                self.memory = Kre8VidMemory.load(base_path)
-            except:
-                # Create new memory if loading fails
-                self.memory = Kre8VidMemory()
+        # Segmented so each recorded item only encodes itself, not the whole KB
+        self.memory = SegmentedMemory(MEMORY_NAME)
+        # Loaded memories are kept warm across searches (shared embedding model)
+        self.registry = get_registry()
+        # Optional single index over all memories (refreshed by a script)
+        self._federated = None
+        self._federated_mtime = None
 
     def ingest_video(self, file_path: str):
         """
@@ -108,8 +110,8 @@ class KnowledgeBaseService:
         items.append(item_data)
         self._save_local_items(items)
 
-        # Rebuild Kre8VidMems
-        self._rebuild_kre8vidmems(items)
+        # Append to Kre8VidMems (delta segment)
+        self._append_to_kre8vidmems(items, [item_data])
 
         return {"status": "success", "message": f"{item_type} recorded in Knowledge Base", "id": item_data['id']}
 
@@ -135,19 +137,20 @@ class KnowledgeBaseService:
             dict with status and message
         """
         items = self._load_local_items()
-        updated = False
+        updated = None
 
         for item in items:
             # Try both 'id' (new) and 'game_id' (legacy) for backward compatibility
             if (item.get('id') == bet_id or item.get('game_id') == bet_id) and item.get('type') == 'BET':
                 item['status'] = outcome.upper()  # Ensure uppercase for consistency
                 item['resolved_at'] = datetime.now().isoformat()
-                updated = True
+                updated = item
                 break
 
         if updated:
             self._save_local_items(items)
-            self._rebuild_kre8vidmems(items)
+            # The resolved copy supersedes the pending one (same key)
+            self._append_to_kre8vidmems(items, [updated])
             return {"status": "success", "message": f"Bet {bet_id} resolved as {outcome.upper()}"}
 
         return {"status": "error", "message": "Bet not found"}
@@ -185,11 +188,28 @@ class KnowledgeBaseService:
                 training_data.append((features, label))
         return training_data
 
-    def _rebuild_kre8vidmems(self, items):
-        chunks = [json.dumps(i) for i in items]
-        self.encoder = MemvidEncoder()
-        self.encoder.add_chunks(chunks)
-        self.encoder.build_video(VIDEO_PATH, INDEX_PATH)
+    def _append_to_kre8vidmems(self, items, new_items):
+        """
+        Append new/updated items as a small delta segment.
+
+        kb_backup.json stays the source of truth, so a failed append (e.g. no
+        FFmpeg) is logged rather than failing the request. The first append
+        after an upgrade seeds the memory with every existing item.
+        """
+        if len(self.memory) == 0:
+            new_items = items
+        try:
+            self.memory.append(
+                [json.dumps(i) for i in new_items],
+                keys=[self._item_key(i) for i in new_items]
+            )
+        except Exception as e:
+            print(f"⚠ Knowledge Base memory append failed: {e}")
+
+    @staticmethod
+    def _item_key(item):
+        key = item.get('id') or item.get('game_id')
+        return str(key) if key is not None else None
 
     def _load_local_items(self):
         if os.path.exists("kb_backup.json"):
@@ -224,8 +244,8 @@ class KnowledgeBaseService:
             if not docs_path.exists():
                 return {"status": "error", "message": f"Directory not found: {docs_dir}"}
 
-            # Read all text files
-            text_files = list(docs_path.glob("*.txt")) + list(docs_path.glob("*.md"))
+            # Find all text files
+            text_files = sorted(docs_path.glob("*.txt")) + sorted(docs_path.glob("*.md"))
             if not text_files:
                 return {"status": "error", "message": f"No .txt or .md files found in {docs_dir}"}
 
@@ -236,13 +256,10 @@ class KnowledgeBaseService:
 
             memory = Kre8VidMemory()
 
-            # Add each file as a chunk to the memory
+            # Stream each file into chunks (files are never read whole);
+            # chunks keep their source file and byte range
             for file_path in text_files:
-                with open(file_path, 'r') as f:
-                    content = f.read()
-                    # Split content into reasonable chunks and add each
-                    # For SGP picks, each file can be a single chunk
-                    memory.add(content)
+                memory.add_file(str(file_path))
 
             memory.save(str(memories_dir / full_memory_name))
 
@@ -261,7 +278,7 @@ class KnowledgeBaseService:
 
         Args:
             query: Search query string
-            memories: List of memory names to search (None = all)
+            memories: Memory names or patterns like "nfl-*" to search (None = all)
             top_k: Number of results to return
 
         Returns:
@@ -269,37 +286,12 @@ class KnowledgeBaseService:
         """
         try:
             memories_dir = Path("data/memories")
-
-            if memories is None or len(memories) == 0:
-                # Get all available memories
-                memory_files = list(memories_dir.glob("*.ann"))
-                memories = [f.stem for f in memory_files]
+            memories = self._resolve_memory_names(memories_dir, memories, self._knowledge_base_names())
 
             if not memories:
                 return {"status": "error", "message": "No memories found"}
 
-            all_results = []
-
-            for memory_name in memories:
-                try:
-                    # Load memory and search
-                    memory = Kre8VidMemory.load(str(memories_dir / memory_name))
-                    results = memory.search(query, top_k=top_k)
-
-                    for result in results:
-                        all_results.append({
-                            "memory": memory_name,
-                            "text": result.get("text", ""),
-                            "score": result.get("score", 0.0),
-                            "chunk_id": result.get("chunk_id", 0)
-                        })
-                except Exception as e:
-                    # Skip memories that fail to load
-                    continue
-
-            # Sort by score and limit to top_k
-            all_results.sort(key=lambda x: x["score"], reverse=True)
-            all_results = all_results[:top_k]
+            all_results = self._search_embedded([query], memories_dir, memories, top_k)[0]
 
             return {
                 "status": "success",
@@ -311,6 +303,145 @@ class KnowledgeBaseService:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def search_memories_batch(self, queries: list, memories: list = None, top_k: int = 5):
+        """
+        Run several searches over the same memories in one call.
+
+        All queries are embedded in a single batched forward pass; the ANN
+        lookups then run back to back. Results are grouped per query.
+
+        Args:
+            queries: List of search query strings
+            memories: Memory names or patterns like "nfl-*" to search (None = all)
+            top_k: Number of results to return per query
+
+        Returns:
+            dict with one result group per query
+        """
+        try:
+            memories_dir = Path("data/memories")
+            memories = self._resolve_memory_names(memories_dir, memories, self._knowledge_base_names())
+
+            if not memories:
+                return {"status": "error", "message": "No memories found"}
+
+            grouped = self._search_embedded(queries, memories_dir, memories, top_k)
+
+            return {
+                "status": "success",
+                "memories_searched": memories,
+                "results": [
+                    {"query": query, "results": results, "total_results": len(results)}
+                    for query, results in zip(queries, grouped)
+                ],
+                "total_queries": len(queries)
+            }
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def _search_embedded(self, queries: list, memories_dir: Path, memories: list, top_k: int):
+        """
+        Embed queries once and return the merged top_k results for each.
+
+        Every path fuses vector and BM25 scores on the same scale: per-memory
+        searches with search_hybrid, the federated index with a BM25 pass
+        over its ANN candidates.
+        """
+        query_embeddings = self.registry.vectorizer.encode_queries(list(queries))
+        grouped = [[] for _ in queries]
+
+        if MEMORY_NAME in memories:
+            # Recorded bets and observations (latest version of each item)
+            memories = [name for name in memories if name != MEMORY_NAME]
+            for all_results, query, query_embedding in zip(grouped, queries, query_embeddings):
+                for result in self.memory.search_hybrid(query, query_embedding, top_k=top_k):
+                    all_results.append({
+                        "memory": MEMORY_NAME,
+                        "text": result.get("text", ""),
+                        "score": result.get("score", 0.0),
+                        "vector_score": result.get("vector_score", 0.0),
+                        "chunk_id": result.get("chunk_id", 0)
+                    })
+
+        federated = self._get_federated_index(memories_dir) if memories else None
+        if federated is not None:
+            # One ANN query over every memory, filtered by name
+            for all_results, query, query_embedding in zip(grouped, queries, query_embeddings):
+                for result in federated.search_hybrid(query, query_embedding, top_k, memories=memories):
+                    all_results.append({
+                        "memory": result["memory"],
+                        "text": result["text"],
+                        "score": result["score"],
+                        "vector_score": result["vector_score"],
+                        "chunk_id": result["chunk_id"]
+                    })
+        else:
+            for memory_name in memories:
+                try:
+                    # Fetch from the registry (loads only on first use or file change)
+                    memory = self.registry.get(memories_dir / memory_name)
+                    for all_results, query, query_embedding in zip(grouped, queries, query_embeddings):
+                        for result in memory.search_hybrid(query, query_embedding, top_k=top_k):
+                            all_results.append({
+                                "memory": memory_name,
+                                "text": result.get("text", ""),
+                                "score": result.get("score", 0.0),
+                                "vector_score": result.get("vector_score", 0.0),
+                                "chunk_id": result.get("chunk_id", 0)
+                            })
+                except Exception as e:
+                    # Skip memories that fail to load
+                    continue
+
+        # Sort by score and limit to top_k
+        for i, all_results in enumerate(grouped):
+            all_results.sort(key=lambda x: x["score"], reverse=True)
+            grouped[i] = all_results[:top_k]
+        return grouped
+
+    def _knowledge_base_names(self):
+        """The KB memory is searchable once it holds any items"""
+        return [MEMORY_NAME] if len(self.memory) else []
+
+    @staticmethod
+    def _resolve_memory_names(memories_dir: Path, memories: list = None, extra: list = ()):
+        """
+        Expand a memory filter into names. None/empty means all memories;
+        entries may be exact names or patterns such as "nfl-*". extra names
+        (memories kept outside memories_dir) are matched the same way.
+        """
+        available = list_memories(memories_dir) + list(extra)
+        if not memories:
+            return available
+
+        resolved = []
+        for name in memories:
+            if any(c in name for c in "*?["):
+                matches = [n for n in available if fnmatch(n, name)]
+            else:
+                matches = [name]
+            resolved.extend(n for n in matches if n not in resolved)
+        return resolved
+
+    def _get_federated_index(self, memories_dir: Path):
+        """
+        Return the federated index (scripts/build_federated_index.py) if it
+        exists and is up to date with the per-memory files, else None.
+        """
+        index_path = memories_dir / FEDERATED_INDEX_DIRNAME / "index"
+        if not FederatedIndex.exists(str(index_path)):
+            self._federated = None
+            return None
+
+        manifest_mtime = index_path.with_suffix(".fed.json").stat().st_mtime_ns
+        if self._federated is None or self._federated_mtime != manifest_mtime:
+            self._federated = FederatedIndex.load(str(index_path), str(memories_dir))
+            self._federated_mtime = manifest_mtime
+
+        if self._federated.is_stale():
+            return None
+        return self._federated
+
     def list_all_memories(self):
         """List all available memories."""
         try:
@@ -318,12 +449,10 @@ class KnowledgeBaseService:
             if not memories_dir.exists():
                 return {"status": "success", "memories": []}
 
-            # Find all .ann files (Kre8VidMems memory indexes)
-            memory_files = list(memories_dir.glob("*.ann"))
+            # Find all Kre8VidMems memory indexes (.ann or .vectors.npy)
             memories = []
 
-            for mem_file in memory_files:
-                memory_name = mem_file.stem
+            for memory_name in list_memories(memories_dir):
                 meta_file = memories_dir / f"{memory_name}.meta"
 
                 memory_info = {"name": memory_name}
@@ -333,7 +462,8 @@ class KnowledgeBaseService:
                     try:
                         with open(meta_file, 'r') as f:
                             meta = json.load(f)
-                            memory_info["chunks"] = len(meta.get("metadata", []))
+                            # Array-backed headers carry a count; legacy files list every chunk
+                            memory_info["chunks"] = meta.get("count", len(meta.get("metadata", [])))
                     except:
                         pass
 
@@ -347,6 +477,21 @@ class KnowledgeBaseService:
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def memory_storage_report(self):
+        """
+        Disk usage and dedup ratio per memory.
+
+        Chunk text shared between memories is stored once in the
+        content-addressed chunk store; each memory is charged its share.
+        """
+        try:
+            memories_dir = Path("data/memories")
+            if not memories_dir.exists():
+                return {"status": "success", "memories": {}, "total": {}}
+            return {"status": "success", **storage_report(memories_dir)}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
     def delete_memory(self, memory_name: str):
         """
         Delete a Kre8VidMems memory and all its files.
@@ -359,7 +504,9 @@ class KnowledgeBaseService:
         """
         try:
             memories_dir = Path("data/memories")
-            extensions = [".ann", ".meta", ".mp4", ".idx"]
+            extensions = [".ann", ".vectors.npy", ".q8.npy", ".full.npy", ".meta", ".mp4", ".kf.json", ".idx", ".ids.npy", ".offsets.npy", ".chunks", ".spans.npy", ".hashes.npy", ".lex.npz", ".sources.json"]
+
+            self.registry.invalidate(memories_dir / memory_name)
 
             deleted_files = []
             for ext in extensions:
@@ -369,11 +516,15 @@ class KnowledgeBaseService:
                     deleted_files.append(str(file_path))
 
             if deleted_files:
-                return {
+                result = {
                     "status": "success",
                     "message": f"Memory '{memory_name}' deleted successfully",
                     "deleted_files": deleted_files
                 }
+                if str(memories_dir / f"{memory_name}{HASHES_SUFFIX}") in deleted_files:
+                    # Drop its chunk text from the shared store unless another memory uses it
+                    result["chunk_store"] = get_chunk_store(str(memories_dir / CHUNK_STORE_DIRNAME)).gc()
+                return result
             else:
                 return {
                     "status": "error",
@@ -898,18 +898,23 @@ class NBADataService:
 
     def search_schedule(self, query: str) -> List[Dict]:
         """
-        Search schedule using Memvid semantic search (if available).
+        Search schedule using Kre8VidMems (if available).
+
+        Games matching every query term (e.g. "Lakers December") come from a
+        posting-list intersection over the schedule's lexical index; other
+        queries use hybrid BM25 + semantic search.
 
         Args:
             query: Search query (e.g., "Lakers games in December")
 
         Returns:
-            List of relevant games from semantic search
+            List of relevant games
         """
         try:
             if self.schedule_retriever:
-                results = self.schedule_retriever.query(query, top_k=10)
-                print(f"✓ Memvid search returned {len(results)} results")
+                results = (self.schedule_retriever.lookup(query, top_k=50)
+                           or self.schedule_retriever.search(query, top_k=10))
+                print(f"✓ Kre8VidMems search returned {len(results)} results")
                 return results
             else:
                 print("⚠ Schedule Memvid retriever not available - falling back to text search")
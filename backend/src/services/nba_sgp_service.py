@@ -4,7 +4,7 @@ Integrates core modules for NBA SGP prediction and analysis
 """
 
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 import sqlite3
 import pandas as pd
 import json
@@ -12,6 +12,7 @@ import json
 from src.core.odds_calculator import calculate_ev, calculate_parlay_odds, compare_odds
 from src.core.correlations import CorrelationAnalyzer
 from src.core.feature_engineering import FeatureEngineer
+from src.core.feature_store import FeatureStore
 from src.core.model_trainer import ModelTrainer
 from src.core.model_predictor import Predictor
 from src.core.parlay_builder import ParlayBuilder
@@ -50,10 +51,12 @@ class NBASGPService:
         # Database paths
         self.player_stats_db = self.data_dir / 'nba_player_stats.db'
         self.sgp_combos_db = self.data_dir / 'nba_sgp_combos.db'
+        self.feature_store_db = self.data_dir / 'nba_feature_store.db'
 
         # Initialize core components (reuse from backend)
         self.correlation_analyzer = CorrelationAnalyzer()
         self.feature_engineer = FeatureEngineer()
+        self.feature_store = FeatureStore(self.feature_store_db, self.feature_engineer)
         self.parlay_builder = ParlayBuilder()
         self.ev_calculator = EVCalculator()
 
@@ -100,27 +103,38 @@ class NBASGPService:
         }
         print(f"✅ Using default NBA correlations: {self.loaded_correlations}")
 
-    def download_season_data(self, season: str = '2023-24', force: bool = False) -> Dict:
+    def download_season_data(self, season: str = '2023-24', force: bool = False,
+                             progress: Optional[Callable] = None) -> Dict:
         """
         Download NBA data for a season
 
         Args:
             season: NBA season (e.g., '2023-24')
             force: Force re-download even if data exists
+            progress: Optional progress(stage, progress, message) callback
 
         Returns:
             Dict with download status
         """
         print(f"\n🏀 Downloading NBA data for {season}")
+        progress = progress or (lambda *args: None)
 
         try:
+            progress('downloading', 0.0, f"Downloading {season} game logs")
             player_df, sgp_df = self.data_downloader.download_all(season)
 
+            # Engineer features for the newly arrived games only
+            feature_stats = {}
+            if player_df is not None and not player_df.empty:
+                progress('features', 0.8, f"Engineering features for {len(player_df):,} player games")
+                feature_stats = self.feature_store.update(self._feature_frame(player_df))
+
             return {
                 "status": "success",
                 "season": season,
                 "player_games": len(player_df) if player_df is not None else 0,
-                "sgp_combos": len(sgp_df) if sgp_df is not None else 0
+                "sgp_combos": len(sgp_df) if sgp_df is not None else 0,
+                "features": feature_stats
             }
         except Exception as e:
             return {
@@ -128,17 +142,22 @@ class NBASGPService:
                 "message": str(e)
             }
 
-    def train_models(self, season: str = '2023-24') -> Dict:
+    def train_models(self, season: str = '2023-24', promote: bool = True,
+                     progress: Optional[Callable] = None) -> Dict:
         """
         Train NBA SGP models
 
         Args:
             season: Season to train on
+            promote: Serve the new version right away; background jobs pass
+                False and let serve_models() swap it in once it is loaded
+            progress: Optional progress(stage, progress, message) callback
 
         Returns:
             Dict with training results
         """
         print(f"\n🎯 Training NBA SGP models for {season}")
+        progress = progress or (lambda *args: None)
 
         if not self.player_stats_db.exists():
             return {
@@ -148,16 +167,22 @@ class NBASGPService:
 
         try:
             # Load data
+            progress('loading', 0.0, "Loading player games")
             conn = sqlite3.connect(self.player_stats_db)
             df = pd.read_sql_query("SELECT * FROM NBA_Player_Data", conn)
             conn.close()
 
-            # Engineer features
-            print("  Engineering features...")
-            df = self.feature_engineer.engineer_features(df)
+            # Engineer features for games not yet in the feature store
+            print("  Updating feature store...")
+            progress('features', 0.05, "Updating feature store")
+            df = self._feature_frame(df)
+            feature_stats = self.feature_store.update(df)
+            print(f"  ✅ {feature_stats['new_games']} new games for {feature_stats['players']} players")
+            df = self.feature_store.join(df)
 
             # Calculate correlations
             print("  Calculating correlations...")
+            progress('correlations', 0.15, "Calculating correlations")
             correlations = self.correlation_analyzer.calculate_all(df)
 
             # Get feature columns
@@ -166,17 +191,25 @@ class NBASGPService:
             # Train models
             print("  Training models...")
             trainer = ModelTrainer(models_dir=str(self.models_dir))
-            trained_models = trainer.train_all_props(df, feature_cols)
+            trained_models = trainer.train_all_props(
+                df, feature_cols,
+                on_job_done=lambda job: progress(
+                    'training', 0.2 + 0.7 * job['done'] / job['total'],
+                    f"{job['prop_type']} {job['model_name']} ({job['done']}/{job['total']})"
+                )
+            )
 
             # Save models and correlations
             print("  Saving models...")
-            trainer.save_models(trained_models, correlations)
+            progress('saving', 0.9, "Saving models")
+            version = trainer.save_models(trained_models, correlations, promote=promote)
 
             # Update loaded correlations
             self.loaded_correlations = correlations
 
             return {
                 "status": "success",
+                "version": version,
                 "models_trained": len(trained_models),
                 "correlations_calculated": len(correlations),
                 "prop_types": list(trained_models.keys())
@@ -188,6 +221,19 @@ class NBASGPService:
                 "message": str(e)
             }
 
+    def serve_models(self, version: str):
+        """
+        Swap a newly trained version into the predictor
+
+        The version is fully loaded first; predictions running meanwhile
+        keep using the previous models.
+        """
+        if self.predictor is None:
+            self.predictor = Predictor(models_dir=str(self.models_dir))
+        self.predictor.promote(version)
+        if self.predictor.correlations:
+            self.loaded_correlations = self.predictor.correlations
+
     def predict_player_props(self, player_id: str, game_id: str) -> Dict:
         """
         Get prop predictions for a player in a specific game
@@ -206,40 +252,28 @@ class NBASGPService:
             }
 
         try:
-            # Load player game data
-            conn = sqlite3.connect(self.player_stats_db)
-            query = f"""
-                SELECT * FROM NBA_Player_Data
-                WHERE PLAYER_ID = '{player_id}'
-                ORDER BY GAME_NUM DESC
-                LIMIT 20
-            """
-            df = pd.read_sql_query(query, conn)
-            conn.close()
+            # Latest stored feature vector; no feature engineering per request
+            features = self.feature_store.latest(player_id)
 
-            if df.empty:
+            if features is None:
                 return {
                     "status": "error",
-                    "message": f"No data found for player {player_id}"
+                    "message": f"No features stored for player {player_id}. Please download or train first."
                 }
 
-            # Engineer features
-            df = self.feature_engineer.engineer_features(df)
-
             # Get predictions from models
+            model_predictions = self.predictor.predict_single_player(features)
             predictions = {}
             for prop_type in self.PROP_TYPES:
-                try:
-                    prob = self.predictor.predict_single(df.iloc[-1:], prop_type)
+                if prop_type in model_predictions:
                     predictions[prop_type] = {
-                        "probability": round(prob, 3),
+                        "probability": round(float(model_predictions[prop_type]['probability']), 3),
                         "confidence": "pending"  # Add uncertainty quantification later
                     }
-                except Exception as e:
-                    print(f"⚠️  Could not predict {prop_type}: {e}")
+                else:
                     predictions[prop_type] = {
                         "probability": None,
-                        "error": str(e)
+                        "error": f"No trained model for {prop_type}"
                     }
 
             return {
@@ -255,6 +289,21 @@ class NBASGPService:
                 "message": str(e)
             }
 
+    def _feature_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        NBA game logs keyed the way FeatureEngineer and FeatureStore expect
+
+        player_display_name is the player ID (the key predictions look up),
+        season the year the season started and week the game's day number,
+        so rest_indicator counts days between games.
+        """
+        df = df.copy()
+        game_date = pd.to_datetime(df['GAME_DATE'], format='mixed')
+        df['player_display_name'] = df['PLAYER_ID'].astype(str)
+        df['season'] = game_date.dt.year - (game_date.dt.month < 7).astype(int)
+        df['week'] = (game_date - pd.Timestamp('1970-01-01')).dt.days
+        return df
+
     def build_parlays(self, game_id: str, max_legs: int = 10, min_ev: float = 0.05) -> List[Dict]:
         """
         Build optimal NBA parlays for a game
@@ -331,3 +380,21 @@ class NBASGPService:
             "correlations": self.loaded_correlations,
             "description": "NBA-specific correlation coefficients for SGP fair odds"
         }
+
+
+# Training job targets (run in a separate process by TrainingJobManager)
+
+def run_download_job(base_dir: Path, season: str, force: bool = False, report: Optional[Callable] = None) -> Dict:
+    """Download a season in a child process; raises so the job is marked failed"""
+    result = NBASGPService(base_dir).download_season_data(season, force, progress=report)
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("message"))
+    return result
+
+
+def run_train_job(base_dir: Path, season: str, report: Optional[Callable] = None) -> Dict:
+    """Train and register (without promoting) a version; the parent promotes it via serve_models()"""
+    result = NBASGPService(base_dir).train_models(season, promote=False, progress=report)
+    if result.get("status") == "error":
+        raise RuntimeError(result.get("message"))
+    return result
@@ -81,14 +81,14 @@ class NFLDataService:
         """Initialize Kre8VidMems memories for NFL data."""
         try:
             # Load NFL teams memory
-            if Path("nfl-teams.ann").exists():
+            if Kre8VidMemory.exists("nfl-teams"):
                 self.teams_memory = Kre8VidMemory.load("nfl-teams")
                 print("✓ NFL Teams Kre8VidMems memory loaded")
             else:
                 print("⚠ NFL Teams memory not found")
 
             # Load NFL players memory
-            if Path("nfl-players.ann").exists():
+            if Kre8VidMemory.exists("nfl-players"):
                 self.players_memory = Kre8VidMemory.load("nfl-players")
                 print("✓ NFL Players Kre8VidMems memory loaded")
             else:
@@ -149,10 +149,11 @@ class NFLDataService:
         ]
 
     def search_teams(self, query: str, top_k: int = 5) -> List[Dict]:
-        """Search teams using Kre8VidMems."""
+        """Search teams using Kre8VidMems (exact name lookup, then hybrid search)."""
         if self.teams_memory:
             try:
-                results = self.teams_memory.search(query, top_k=top_k)
+                results = (self.teams_memory.lookup(query, top_k=top_k)
+                           or self.teams_memory.search(query, top_k=top_k))
                 teams = []
                 for result in results:
                     if isinstance(result, dict):
@@ -184,10 +185,11 @@ class NFLDataService:
         return results
 
     def search_players(self, query: str, top_k: int = 10) -> List[Dict]:
-        """Search players using Kre8VidMems."""
+        """Search players using Kre8VidMems (exact name lookup, then hybrid search)."""
         if self.players_memory:
             try:
-                results = self.players_memory.search(query, top_k=top_k)
+                results = (self.players_memory.lookup(query, top_k=top_k)
+                           or self.players_memory.search(query, top_k=top_k))
                 players = []
                 for result in results:
                     if isinstance(result, dict):
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+ChunkStore: garbage collection of chunks no memory references
+
+Run with pytest or directly: python tests/test_chunk_store.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir / 'lib' / 'kre8vidmems'))
+
+from kre8vidmems import Kre8VidMemory
+from kre8vidmems.config import CHUNK_STORE_DIRNAME
+from kre8vidmems.storage.chunk_store import get_chunk_store
+from kre8vidmems.storage.report import storage_report
+
+
+def save_memory(path, chunks):
+    memory = Kre8VidMemory()
+    memory.add_chunks(chunks)
+    memory.save(str(path), show_progress=False, use_chunk_store=True, build_video=False)
+
+
+def test_gc_drops_unreferenced_chunks():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        shared = "Bet: Chiefs -3.5 at Arrowhead"
+        save_memory(root / 'nfl-a', ["Bet: Bills total over 47.5", shared])
+        save_memory(root / 'nfl-b', [shared, "Bet: Eagles moneyline at home"])
+        assert storage_report(root)['total']['unreferenced_bytes'] == 0
+
+        for path in root.glob('nfl-a.*'):
+            path.unlink()
+        removed = len("Bet: Bills total over 47.5")
+        assert storage_report(root)['total']['unreferenced_bytes'] == removed
+
+        store = get_chunk_store(str(root / CHUNK_STORE_DIRNAME))
+        stats = store.gc()
+        assert stats['removed'] == 1 and stats['removed_bytes'] == removed
+        assert stats['chunks'] == 2 and len(store) == 2
+        assert storage_report(root)['total']['unreferenced_bytes'] == 0
+
+        # Spans were remapped: the surviving memory still reads its text
+        memory = Kre8VidMemory.load(str(root / 'nfl-b'), retrieval_mode='text')
+        texts = [m['text'] for m in memory.vector_store.metadata]
+        assert texts == [shared, "Bet: Eagles moneyline at home"]
+
+        # Nothing left to collect; new saves still dedup against the store
+        assert store.gc()['removed_bytes'] == 0
+        save_memory(root / 'nfl-c', [shared])
+        assert storage_report(root)['total']['distinct_chunks'] == 2
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
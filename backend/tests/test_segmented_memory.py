@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+SegmentedMemory: concurrent appends and compaction
+
+Run with pytest or directly: python tests/test_segmented_memory.py
+"""
+
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+backend_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(backend_dir / 'lib' / 'kre8vidmems'))
+
+from kre8vidmems import SegmentedMemory
+
+
+def run_appends(memory, threads=8, per_thread=2):
+    """Append from several threads at once, one chunk per append"""
+    barrier = threading.Barrier(threads)
+    errors = []
+
+    def worker(worker_id):
+        barrier.wait()
+        try:
+            for i in range(per_thread):
+                memory.append([f"Bet {worker_id}-{i}: Chiefs -3.5 at Arrowhead"], keys=[f"bet-{worker_id}-{i}"])
+        except Exception as e:
+            errors.append(e)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert not errors, errors
+
+
+def test_concurrent_appends_get_distinct_segments():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        memory = SegmentedMemory(str(Path(temp_dir) / 'kb'), max_deltas=1000)
+        run_appends(memory)
+
+        names = [entry['name'] for entry in memory._manifest['segments']]
+        assert len(names) == 16
+        assert len(set(names)) == len(names), names
+        assert len(memory) == 16
+
+        reloaded = SegmentedMemory(str(Path(temp_dir) / 'kb'))
+        assert len(reloaded) == 16
+        assert len(reloaded.search("Chiefs Arrowhead", top_k=20)) == 16
+
+
+def test_appends_during_compaction():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        memory = SegmentedMemory(str(Path(temp_dir) / 'kb'), max_deltas=3, background=True)
+        run_appends(memory)
+        memory.wait_for_compaction()
+        memory.compact()
+
+        names = [entry['name'] for entry in memory._manifest['segments']]
+        assert len(set(names)) == len(names), names
+        assert len(memory) == 16
+        assert len(memory.search("Chiefs Arrowhead", top_k=20)) == 16
+        # Merged segments are gone from disk, text included
+        on_disk = {path.name.split('.')[0] for path in memory.root.glob('seg-*')}
+        assert on_disk == set(names)
+        assert not (memory.root / '.chunk_store').exists()
+        assert not list(memory.root.glob('*.mp4'))  # segments are saved without video
+
+
+def test_search_during_compaction():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        name = str(Path(temp_dir) / 'kb')
+        writer = SegmentedMemory(name, max_deltas=1000)
+        run_appends(writer, threads=4, per_thread=3)
+
+        # A fresh instance (as after a restart) has no segments loaded yet
+        memory = SegmentedMemory(name, max_deltas=1000, background=True)
+        stop = threading.Event()
+        errors, counts = [], []
+
+        def searcher():
+            while not stop.is_set():
+                try:
+                    counts.append(len(memory.search("Chiefs Arrowhead", top_k=20)))
+                except Exception as e:
+                    errors.append(e)
+
+        searchers = [threading.Thread(target=searcher) for _ in range(4)]
+        for thread in searchers:
+            thread.start()
+        memory.compact(wait=False)
+        memory.wait_for_compaction()
+        stop.set()
+        for thread in searchers:
+            thread.join()
+
+        assert not errors, errors
+        assert counts and set(counts) == {12}, set(counts)
+        assert len(memory._manifest['segments']) == 1
+
+
+def test_scores_match_memory_search():
+    with tempfile.TemporaryDirectory() as temp_dir:
+        memory = SegmentedMemory(str(Path(temp_dir) / 'kb'), max_deltas=1000)
+        memory.append(["Bet: Chiefs -3.5 at Arrowhead", "Bet: Lakers moneyline vs Celtics"], keys=['a', 'b'])
+        results = memory.search("Lakers Celtics", top_k=2)
+        assert results[0]['key'] == 'b'
+        # Fused cosine/BM25 scale, as in Kre8VidMemory.search_hybrid
+        assert results[0]['lexical_score'] > 0
+        assert 'vector_score' in results[0]
+        assert results[0]['score'] <= 1.0
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
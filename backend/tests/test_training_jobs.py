@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+TrainingJobManager: training in a child process, dedup and hot swap
+
+Run with pytest or directly: python tests/test_training_jobs.py
+"""
+
+import os
+import sys
+import time
+import tempfile
+import contextlib
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.core.data_service import DataService
+from src.core.model import PredictionModel, train_spread_model
+from src.core.training_jobs import TrainingJobManager
+
+
+@contextlib.contextmanager
+def in_temp_dir():
+    """The spread model is saved to the working directory"""
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        os.chdir(temp_dir)
+        try:
+            yield Path(temp_dir)
+        finally:
+            os.chdir(cwd)
+
+
+def wait(manager, job_id, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in ('succeeded', 'failed'):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"Job {job_id} did not finish: {manager.get(job_id)}")
+
+
+def test_train_dedup_and_swap():
+    with in_temp_dir() as temp_dir:
+        service = PredictionModel()
+        assert service.model is None
+        manager = TrainingJobManager(poll_seconds=0.2)
+        df = DataService().get_mock_training_data()
+
+        first = manager.submit('spread_model', train_spread_model, args=(df,), on_success=service.set_model)
+        second = manager.submit('spread_model', train_spread_model, args=(df,), on_success=service.set_model)
+        assert not first['deduplicated']
+        assert second['deduplicated'] and second['job_id'] == first['job_id']
+
+        job = wait(manager, first['job_id'])
+        assert job['status'] == 'succeeded', job
+        assert job['progress'] == 1.0
+        assert service.model is not None and service.version == 1
+        assert (temp_dir / 'xgboost_model.pkl').exists()
+        prediction, _ = service.predict({'team_strength': 90, 'opponent_strength': 70, 'home_advantage': 1},
+                                        explain=False)
+        assert prediction is not None
+
+        # Finished jobs no longer block new ones
+        third = manager.submit('spread_model', train_spread_model, args=(df,), on_success=service.set_model)
+        assert third['job_id'] != first['job_id']
+        wait(manager, third['job_id'])
+        assert service.version == 2
+
+
+def test_failure_is_reported():
+    with in_temp_dir():
+        manager = TrainingJobManager(poll_seconds=0.2)
+        swapped = []
+        job = manager.submit('broken', train_spread_model, args=([{'team_strength': 1}],),
+                             on_success=swapped.append)
+        job = wait(manager, job['job_id'])
+        assert job['status'] == 'failed'
+        assert 'spread_margin' in job['error']
+        assert not swapped
+        assert manager.active('broken') is None
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)
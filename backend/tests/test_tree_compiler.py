@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Parity test: compiled tree ensembles vs. the models they were exported from
+
+Run with pytest or directly: python tests/test_tree_compiler.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sklearn.ensemble import RandomForestClassifier, GradientBoostingClassifier
+from sklearn.neural_network import MLPClassifier
+from sklearn.preprocessing import StandardScaler
+
+from src.core.tree_compiler import CompiledForest, CompiledScaler, compile_model
+
+
+def make_data(seed=0, rows=2000, features=30):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(rows, features))
+    X[:, 3] = rng.integers(0, 5, rows)  # integer feature: rows land exactly on thresholds
+    y = ((X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(size=rows) * 0.5) > 0).astype(int)
+    return X, y
+
+
+def models():
+    """Every supported model type that is installed"""
+    found = [
+        RandomForestClassifier(n_estimators=50, max_depth=10, random_state=42),
+        GradientBoostingClassifier(n_estimators=50, max_depth=5, random_state=42),
+    ]
+    try:
+        from xgboost import XGBClassifier
+        found.append(XGBClassifier(n_estimators=50, max_depth=6, random_state=42))
+    except ImportError:
+        pass
+    try:
+        from lightgbm import LGBMClassifier
+        found.append(LGBMClassifier(n_estimators=50, max_depth=6, random_state=42, verbose=-1))
+    except ImportError:
+        pass
+    return found
+
+
+def test_probability_parity():
+    X, y = make_data()
+    X_eval, _ = make_data(seed=1, rows=500)
+    for model in models():
+        model.fit(X, y)
+        expected = model.predict_proba(X_eval)
+        actual = compile_model(model).predict_proba(X_eval)
+        # XGBoost sums leaf values in float32; the others match to rounding
+        tolerance = 1e-6 if type(model).__name__ == 'XGBClassifier' else 1e-12
+        assert np.abs(expected - actual).max() < tolerance, type(model).__name__
+
+
+def test_missing_values_follow_default_direction():
+    X, y = make_data()
+    X_eval, _ = make_data(seed=2, rows=500)
+    X_eval[np.random.default_rng(3).random(X_eval.shape) < 0.05] = np.nan
+    for model in models():
+        if type(model).__name__ == 'GradientBoostingClassifier':
+            continue  # rejects NaN input
+        model.fit(X, y)
+        tolerance = 1e-6 if type(model).__name__ == 'XGBClassifier' else 1e-12
+        assert np.abs(model.predict_proba(X_eval) - compile_model(model).predict_proba(X_eval)).max() < tolerance
+
+
+def test_single_row_and_save_load():
+    X, y = make_data()
+    model = RandomForestClassifier(n_estimators=20, max_depth=8, random_state=42).fit(X, y)
+    forest = compile_model(model)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / 'forest.npz'
+        forest.save(path, feature_cols=np.array([f'f{i}' for i in range(X.shape[1])]))
+        loaded, extra = CompiledForest.load(path)
+    assert extra['feature_cols'].tolist()[:2] == ['f0', 'f1']
+    assert np.array_equal(loaded.predict_proba(X[:1]), forest.predict_proba(X[0]))
+    assert np.abs(loaded.predict_proba(X[:1]) - model.predict_proba(X[:1])).max() < 1e-12
+
+
+def test_scaler_parity():
+    X, _ = make_data()
+    scaler = StandardScaler().fit(X)
+    assert np.array_equal(CompiledScaler.from_sklearn(scaler).transform(X[:10]), scaler.transform(X[:10]))
+
+
+def test_unsupported_model_rejected():
+    X, y = make_data(rows=200)
+    model = MLPClassifier(hidden_layer_sizes=(4,), max_iter=50, random_state=42).fit(X, y)
+    try:
+        compile_model(model)
+    except ValueError:
+        return
+    raise AssertionError("MLPClassifier should not compile")
+
+
+if __name__ == "__main__":
+    failed = 0
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            try:
+                test()
+                print(f"✅ {name}")
+            except AssertionError as e:
+                failed += 1
+                print(f"❌ {name}: {e}")
+    sys.exit(1 if failed else 0)